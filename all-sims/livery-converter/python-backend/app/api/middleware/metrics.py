@@ -0,0 +1,83 @@
+"""ASGI middleware recording per-route latency, size and in-flight metrics."""
+
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import SIZE_BUCKETS, MetricsRegistry, registry as default_registry
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _route_template(scope: Scope) -> str:
+    """Resolve the matched route's path template to keep label cardinality bounded.
+
+    Included routers may report only their inner path, so any router prefix is
+    recovered from the concrete request path.
+    """
+    route = scope.get("route")
+    if route is None:
+        endpoint = scope.get("endpoint")
+        route = next(
+            (
+                candidate
+                for candidate in getattr(scope.get("app"), "routes", ())
+                if endpoint is not None and getattr(candidate, "endpoint", None) is endpoint
+            ),
+            None,
+        )
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return UNMATCHED_ROUTE
+
+    path = scope["path"]
+    try:
+        rendered = path_format.format(**{key: str(value) for key, value in scope.get("path_params", {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + path_format
+    return path_format
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware; avoids ``BaseHTTPMiddleware`` so streaming stays cheap."""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry | None = None) -> None:
+        self.app = app
+        self.registry = registry or default_registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        state: dict[str, Any] = {"status": 500, "request_bytes": 0, "response_bytes": 0}
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                state["request_bytes"] += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        registry.add_gauge("http_requests_in_flight")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.add_gauge("http_requests_in_flight", amount=-1.0)
+            labels = (("method", scope["method"]), ("route", _route_template(scope)))
+            registry.observe("http_request_duration_seconds", elapsed, labels)
+            registry.observe("http_request_size_bytes", state["request_bytes"], labels, SIZE_BUCKETS)
+            registry.observe("http_response_size_bytes", state["response_bytes"], labels, SIZE_BUCKETS)
+            registry.inc("http_requests_total", labels + (("status", str(state["status"])),))
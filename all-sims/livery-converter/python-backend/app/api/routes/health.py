@@ -1,7 +1,11 @@
 """Health endpoints to support monitoring."""
 
+from typing import Any
+
 from fastapi import APIRouter
 
+from app.services.device_probe import device_probe
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 
@@ -9,3 +13,9 @@ router = APIRouter(prefix="/health", tags=["health"])
 async def health_check() -> dict[str, str]:
     """Return a static payload that signals availability."""
     return {"status": "ok"}
+
+
+@router.get("/device")
+async def device_info() -> dict[str, Any]:
+    """Return cached GPU/CPU capabilities without probing on the request path."""
+    return device_probe.snapshot()
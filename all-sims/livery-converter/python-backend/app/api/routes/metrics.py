@@ -0,0 +1,14 @@
+"""Prometheus-style metrics endpoint."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import registry
+
+router = APIRouter(prefix="/metrics", tags=["monitoring"])
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose request and pipeline-stage metrics in text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
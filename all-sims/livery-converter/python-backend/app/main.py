@@ -1,12 +1,53 @@
 """FastAPI entry point for the SimVox AI Livery Designer backend."""
 
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import health, generation, upload
+from app.api.middleware.admission import AdmissionController, AdmissionMiddleware, RoutePolicy
+from app.api.middleware.metrics import RequestMetricsMiddleware
+from app.api.routes import health, generation, metrics, upload
+from app.services.device_probe import device_probe
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Probe devices in the background so startup never waits on torch."""
+    device_probe.start()
+    yield
+    device_probe.stop()
+
 
-app = FastAPI(title="SimVox AI Livery Designer API", version="0.1.0")
+app = FastAPI(title="SimVox AI Livery Designer API", version="0.1.0", lifespan=lifespan)
+
+MB = 1024 * 1024
+
+# Each 4K texture pipeline holds hundreds of MB; bound concurrent jobs and
+# their combined working set so bursts are shed with 429 instead of OOMing.
+admission = AdmissionController(
+    policies={
+        "/api/generate-livery": RoutePolicy(
+            max_concurrency=int(os.environ.get("ADMISSION_GENERATE_CONCURRENCY", "2")),
+            max_queue=int(os.environ.get("ADMISSION_GENERATE_QUEUE", "8")),
+            working_set_bytes=768 * MB,
+            default_job_seconds=30.0,
+        ),
+        "/api/upload-photo": RoutePolicy(
+            max_concurrency=int(os.environ.get("ADMISSION_UPLOAD_CONCURRENCY", "4")),
+            max_queue=int(os.environ.get("ADMISSION_UPLOAD_QUEUE", "16")),
+            working_set_bytes=128 * MB,
+            bytes_per_request_byte=24.0,
+            default_job_seconds=2.0,
+        ),
+    },
+    memory_budget_bytes=int(os.environ.get("ADMISSION_MEMORY_BUDGET_MB", "4096")) * MB,
+)
+app.state.admission = admission
 
+app.add_middleware(AdmissionMiddleware, controller=admission)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -14,8 +55,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(upload.router, prefix="/api")
 app.include_router(generation.router, prefix="/api")
 
@@ -1,21 +1,144 @@
-"""Wrapper around AUV-Net style architecture (placeholder)."""
+"""Wrapper around AUV-Net style architecture (placeholder).
 
+Weights are memory-mapped read-only from either a ``.safetensors`` file or a
+directory of ``.npy`` arrays. Every uvicorn worker maps the same file, so the
+operating system keeps a single physical copy in the page cache instead of
+one private copy per process.
+"""
+
+import json
+import struct
+import threading
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from app.services.image_processing import load_image
+from app.utils.metrics import stage_timer
+
+_SAFETENSORS_DTYPES: dict[str, np.dtype] = {
+    "F64": np.dtype("<f8"),
+    "F32": np.dtype("<f4"),
+    "F16": np.dtype("<f2"),
+    "I64": np.dtype("<i8"),
+    "I32": np.dtype("<i4"),
+    "I16": np.dtype("<i2"),
+    "I8": np.dtype("i1"),
+    "U8": np.dtype("u1"),
+    "BOOL": np.dtype("?"),
+}
+
+_shared_weights: dict[Path, dict[str, np.ndarray]] = {}
+_shared_lock = threading.Lock()
+
+
+def _map_safetensors(path: Path) -> dict[str, np.ndarray]:
+    """Map a safetensors file without copying tensor data."""
+    with path.open("rb") as handle:
+        (header_size,) = struct.unpack("<Q", handle.read(8))
+        header = json.loads(handle.read(header_size))
+    header.pop("__metadata__", None)
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    data_start = 8 + header_size
+    tensors: dict[str, np.ndarray] = {}
+    for name, info in header.items():
+        dtype = _SAFETENSORS_DTYPES.get(info["dtype"])
+        if dtype is None:
+            raise ValueError(f"Unsupported safetensors dtype {info['dtype']} for {name}")
+        begin, end = info["data_offsets"]
+        raw = buffer[data_start + begin : data_start + end]
+        tensors[name] = raw.view(dtype).reshape(info["shape"])
+    return tensors
+
+
+def _map_npy_dir(path: Path) -> dict[str, np.ndarray]:
+    """Map every ``<name>.npy`` file in a directory read-only."""
+    return {item.stem: np.load(item, mmap_mode="r") for item in sorted(path.glob("*.npy"))}
+
+
+def map_weights(model_path: str | Path) -> dict[str, np.ndarray]:
+    """Return read-only weight arrays, shared by all models in this process."""
+    path = Path(model_path).resolve()
+    with _shared_lock:
+        weights = _shared_weights.get(path)
+        if weights is None:
+            if path.is_dir():
+                weights = _map_npy_dir(path)
+            elif path.suffix == ".safetensors" and path.is_file():
+                weights = _map_safetensors(path)
+            else:
+                raise FileNotFoundError(f"No .safetensors file or .npy directory at {path}")
+            _shared_weights[path] = weights
+    return weights
+
+
+def save_safetensors(weights: dict[str, np.ndarray], path: str | Path) -> None:
+    """Write arrays in safetensors layout so they can be memory-mapped later."""
+    names = {dtype: name for name, dtype in _SAFETENSORS_DTYPES.items()}
+    header: dict[str, Any] = {}
+    offset = 0
+    arrays = []
+    for name, array in weights.items():
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        dtype = names.get(array.dtype)
+        if dtype is None:
+            raise ValueError(f"Unsupported dtype {array.dtype} for {name}")
+        header[name] = {"dtype": dtype, "shape": list(array.shape), "data_offsets": [offset, offset + array.nbytes]}
+        offset += array.nbytes
+        arrays.append(array)
+
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    encoded += b" " * (-len(encoded) % 8)  # keep tensor data 8-byte aligned
+    with Path(path).open("wb") as handle:
+        handle.write(struct.pack("<Q", len(encoded)))
+        handle.write(encoded)
+        for array in arrays:
+            handle.write(array.tobytes())
+
 
 class AUVNetModel:
     """Stub for loading and running the neural UV correspondence network."""
 
-    def __init__(self, model_path: str) -> None:
+    def __init__(self, model_path: str, input_size: int = 256) -> None:
         self.model_path = model_path
-        self._model: Any | None = None
+        self.input_size = input_size
+        self._model: dict[str, np.ndarray] | None = None
+
+    @property
+    def weights(self) -> dict[str, np.ndarray]:
+        if self._model is None:
+            raise RuntimeError("Model not loaded")
+        return self._model
 
     def load(self) -> None:
-        """Load network weights (to be implemented)."""
-        self._model = f"loaded:{self.model_path}"
+        """Memory-map network weights read-only (shared across workers)."""
+        self._model = map_weights(self.model_path)
 
-    def infer(self, image_bytes: bytes) -> dict[str, Any]:
-        """Run inference and return placeholder UV map."""
+    def preprocess(self, image_bytes: bytes) -> np.ndarray:
+        """Decode and resize one image to an ``HxWx3`` float32 array in [0, 1]."""
+        image = load_image(image_bytes)
+        with stage_timer("preprocess"):
+            image = image.resize((self.input_size, self.input_size))
+            return np.asarray(image, dtype=np.float32) / 255.0
+
+    def _forward(self, batch: np.ndarray) -> list[list[Any]]:
+        """Run the network once over an ``NxHxWx3`` batch (placeholder output)."""
+        return [[] for _ in range(batch.shape[0])]
+
+    def infer_many(self, images: list[bytes]) -> list[dict[str, Any]]:
+        """Run inference over several images in a single forward pass."""
         if self._model is None:
             raise RuntimeError("Model not loaded")
-        return {"uv_map": [], "metadata": {"source": self.model_path}}
+        if not images:
+            return []
+        batch = np.stack([self.preprocess(image_bytes) for image_bytes in images])
+        with stage_timer("inference"):
+            uv_maps = self._forward(batch)
+        return [{"uv_map": uv_map, "metadata": {"source": self.model_path}} for uv_map in uv_maps]
+
+    def infer(self, image_bytes: bytes) -> dict[str, Any]:
+        """Run inference and return placeholder UV map."""
+        return self.infer_many([image_bytes])[0]
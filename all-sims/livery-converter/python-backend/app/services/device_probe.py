@@ -0,0 +1,186 @@
+"""Cached GPU/CPU capability probe kept off the request path."""
+
+import logging
+import os
+import platform
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ISA_FEATURES = ("SSE4_2", "AVX", "AVX2", "FMA3", "AVX512F", "AVX512BW", "AVX512_VNNI", "AVX512_BF16")
+
+# /proc/cpuinfo flag and NumPy feature-table spellings for ISA_FEATURES.
+_CPUINFO_FLAGS = {
+    "SSE4_2": "sse4_2",
+    "AVX": "avx",
+    "AVX2": "avx2",
+    "FMA3": "fma",
+    "AVX512F": "avx512f",
+    "AVX512BW": "avx512bw",
+    "AVX512_VNNI": "avx512_vnni",
+    "AVX512_BF16": "avx512_bf16",
+}
+_NUMPY_FLAGS = {"AVX512_VNNI": "AVX512VNNI", "AVX512_BF16": "AVX512BF16"}
+
+
+def _cpu_flags_from_proc() -> set[str] | None:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as handle:
+            for line in handle:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return None
+
+
+def _cpu_flags_from_numpy() -> dict[str, bool] | None:
+    try:
+        from numpy._core._multiarray_umath import __cpu_features__
+    except ImportError:
+        try:
+            from numpy.core._multiarray_umath import __cpu_features__
+        except ImportError:
+            return None
+    return dict(__cpu_features__)
+
+
+def detect_isa_features() -> list[str]:
+    """Return the subset of ``ISA_FEATURES`` supported by the host CPU."""
+    proc_flags = _cpu_flags_from_proc()
+    if proc_flags is not None:
+        return [name for name in ISA_FEATURES if _CPUINFO_FLAGS[name] in proc_flags]
+    numpy_flags = _cpu_flags_from_numpy()
+    if numpy_flags is not None:
+        return [name for name in ISA_FEATURES if numpy_flags.get(_NUMPY_FLAGS.get(name, name), False)]
+    return []
+
+
+def _memory_from_proc() -> tuple[float, float] | None:
+    """Return (total, available) bytes from /proc/meminfo, including reclaimable cache."""
+    fields: dict[str, float] = {}
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as handle:
+            for line in handle:
+                key, _, value = line.partition(":")
+                fields[key] = float(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    if "MemTotal" not in fields or "MemAvailable" not in fields:
+        return None
+    return fields["MemTotal"], fields["MemAvailable"]
+
+
+def probe_cpu() -> dict[str, Any]:
+    """Collect core count, RAM and SIMD support for worker-pool sizing."""
+    logical_cores = os.cpu_count() or 1
+    try:
+        usable_cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - Windows/macOS
+        usable_cores = logical_cores
+
+    total_ram_gb: float | None = None
+    available_ram_gb: float | None = None
+    memory = _memory_from_proc()
+    if memory is not None:
+        total_ram_gb = round(memory[0] / 1e9, 2)
+        available_ram_gb = round(memory[1] / 1e9, 2)
+    elif hasattr(os, "sysconf") and "SC_AVPHYS_PAGES" in os.sysconf_names:
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        total_ram_gb = round(os.sysconf("SC_PHYS_PAGES") * page_size / 1e9, 2)
+        available_ram_gb = round(os.sysconf("SC_AVPHYS_PAGES") * page_size / 1e9, 2)
+
+    return {
+        "architecture": platform.machine(),
+        "logical_cores": logical_cores,
+        "usable_cores": usable_cores,
+        "total_ram_gb": total_ram_gb,
+        "available_ram_gb": available_ram_gb,
+        "isa_features": detect_isa_features(),
+    }
+
+
+def probe_gpu() -> dict[str, Any]:
+    """Query CUDA through torch; slow on first call, so only run off-thread."""
+    try:
+        import torch
+    except Exception as exc:  # pragma: no cover - diagnostic path
+        logger.warning("Failed to probe CUDA availability: %s", exc)
+        return {"available": False}
+
+    if not torch.cuda.is_available():
+        return {"available": False}
+    props = torch.cuda.get_device_properties(0)
+    return {
+        "available": True,
+        "name": props.name,
+        "memory_gb": round(props.total_memory / 1e9, 2),
+        "cuda_version": torch.version.cuda,
+        "device_count": torch.cuda.device_count(),
+    }
+
+
+class DeviceProbe:
+    """Probe devices in a background thread and serve cached snapshots."""
+
+    def __init__(self, refresh_seconds: float = 300.0) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._snapshot: dict[str, Any] = {
+            "status": "pending",
+            "probed_at": None,
+            "gpu": {"available": False},
+            "cpu": None,
+        }
+
+    def refresh(self) -> dict[str, Any]:
+        """Probe synchronously and replace the cached snapshot."""
+        snapshot = {
+            "status": "ready",
+            "probed_at": time.time(),
+            "gpu": probe_gpu(),
+            "cpu": probe_cpu(),
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        self._ready.set()
+        return snapshot
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the cached snapshot without probing."""
+        with self._lock:
+            return self._snapshot
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="device-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as exc:  # pragma: no cover - diagnostic path
+                logger.warning("Device probe failed: %s", exc)
+            if not self.refresh_seconds:
+                break
+            self._stop.wait(self.refresh_seconds)
+
+
+device_probe = DeviceProbe(refresh_seconds=float(os.environ.get("DEVICE_PROBE_REFRESH_SECONDS", "300")))
@@ -3,7 +3,10 @@
 from PIL import Image
 from io import BytesIO
 
+from app.utils.metrics import stage_timer
+
 
 def load_image(image_bytes: bytes) -> Image.Image:
     """Load an image from raw bytes for downstream processing."""
-    return Image.open(BytesIO(image_bytes)).convert("RGB")
+    with stage_timer("decode"):
+        return Image.open(BytesIO(image_bytes)).convert("RGB")
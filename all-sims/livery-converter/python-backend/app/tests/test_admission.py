@@ -0,0 +1,160 @@
+"""Tests for admission control and 429 backpressure."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.middleware.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    AdmissionRejected,
+    RoutePolicy,
+)
+from app.utils.metrics import MetricsRegistry
+
+MB = 1024 * 1024
+
+
+def _controller(**policy: float) -> AdmissionController:
+    return AdmissionController(
+        {"/job": RoutePolicy(**{"max_concurrency": 1, "working_set_bytes": 100 * MB, **policy})},
+        memory_budget_bytes=250 * MB,
+        registry=MetricsRegistry(),
+    )
+
+
+def test_queued_job_starts_when_slot_frees() -> None:
+    async def scenario() -> list[str]:
+        controller = _controller(max_queue=2)
+        order: list[str] = []
+        await controller.acquire("/job", 100 * MB)
+
+        async def queued() -> None:
+            await controller.acquire("/job", 100 * MB)
+            order.append("queued-started")
+
+        task = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+        assert controller.stats()["routes"]["/job"]["queued"] == 1
+        order.append("releasing")
+        controller.release("/job", 100 * MB, elapsed_seconds=4.0)
+        await task
+        return order
+
+    assert asyncio.run(scenario()) == ["releasing", "queued-started"]
+
+
+def test_memory_budget_and_queue_limits_shed_load() -> None:
+    async def scenario() -> AdmissionController:
+        controller = _controller(max_concurrency=5, max_queue=0)
+        await controller.acquire("/job", 100 * MB)
+        await controller.acquire("/job", 100 * MB)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire("/job", 100 * MB)  # 300 MB > 250 MB budget
+        assert exc_info.value.reason == "queue_full"
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire("/job", 300 * MB)
+        assert exc_info.value.reason == "too_large"
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.stats()["routes"]["/job"]["shed"] == {"queue_full": 1, "too_large": 1}
+    assert 'admission_shed_total{route="/job",reason="queue_full"} 1' in controller.registry.render()
+
+
+def test_queue_timeout_sheds_waiter() -> None:
+    async def scenario() -> None:
+        controller = _controller(max_queue=1, queue_timeout_seconds=0.01)
+        await controller.acquire("/job", 100 * MB)
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await controller.acquire("/job", 100 * MB)
+        assert exc_info.value.reason == "queue_timeout"
+        assert controller.stats()["routes"]["/job"]["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_tracks_observed_job_time() -> None:
+    async def scenario() -> AdmissionController:
+        controller = _controller(max_queue=0, default_job_seconds=1.0)
+        await controller.acquire("/job", 10 * MB)
+        controller.release("/job", 10 * MB, elapsed_seconds=12.0)
+        return controller
+
+    assert asyncio.run(scenario()).retry_after("/job") == 12
+
+
+def test_middleware_fast_fails_with_retry_after_header() -> None:
+    controller = _controller(max_queue=0, default_job_seconds=7.0)
+    asyncio.run(controller.acquire("/job", 100 * MB))
+
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.post("/job")
+    async def job() -> dict[str, str]:
+        return {"status": "done"}
+
+    @app.post("/other")
+    async def other() -> dict[str, str]:
+        return {"status": "done"}
+
+    client = TestClient(app)
+    response = client.post("/job")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "7"
+    assert response.json()["reason"] == "queue_full"
+    assert client.post("/other").status_code == 200
+
+    controller.release("/job", 100 * MB, elapsed_seconds=1.0)
+    assert client.post("/job").status_code == 200
+
+
+def test_queued_waiter_does_not_block_idle_route() -> None:
+    async def scenario() -> AdmissionController:
+        controller = AdmissionController(
+            {
+                "/generate": RoutePolicy(max_concurrency=2, working_set_bytes=200 * MB),
+                "/process": RoutePolicy(max_concurrency=1, working_set_bytes=20 * MB, queue_timeout_seconds=0.01),
+            },
+            memory_budget_bytes=250 * MB,
+            registry=MetricsRegistry(),
+        )
+        await controller.acquire("/generate", 200 * MB)
+        waiting = asyncio.create_task(controller.acquire("/generate", 200 * MB))
+        await asyncio.sleep(0)
+        assert controller.stats()["routes"]["/generate"]["queued"] == 1
+
+        # Idle route with free budget is admitted immediately despite the queued generate job.
+        await controller.acquire("/process", 20 * MB)
+        assert controller.stats()["routes"]["/process"]["active"] == 1
+
+        controller.release("/process", 20 * MB, elapsed_seconds=0.1)
+        controller.release("/generate", 200 * MB, elapsed_seconds=1.0)
+        await waiting
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.stats()["routes"]["/generate"]["active"] == 1
+    assert controller.stats()["routes"]["/process"]["shed"] == {}
+
+
+def test_timed_out_head_wakes_waiters_behind_it() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController(
+            {"/job": RoutePolicy(max_concurrency=3, working_set_bytes=100 * MB, queue_timeout_seconds=0.05)},
+            memory_budget_bytes=250 * MB,
+            registry=MetricsRegistry(),
+        )
+        await controller.acquire("/job", 200 * MB)
+        head = asyncio.create_task(controller.acquire("/job", 200 * MB))  # never fits while the first runs
+        await asyncio.sleep(0)
+        behind = asyncio.create_task(controller.acquire("/job", 40 * MB))  # fits, but queued behind the head
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected):
+            await head
+        await asyncio.wait_for(behind, 0.01)  # granted as soon as the head left the queue
+
+    asyncio.run(scenario())
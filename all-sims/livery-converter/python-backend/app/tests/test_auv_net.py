@@ -0,0 +1,73 @@
+"""Tests for memory-mapped AUV-Net weights and batched inference."""
+
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.models.auv_net import AUVNetModel, save_safetensors
+
+
+def _png_bytes(color: tuple[int, int, int], size: int = 32) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (size, size), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _weights() -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    return {
+        "enc.weight": rng.standard_normal((4, 3, 3, 3)).astype(np.float32),
+        "enc.bias": np.arange(4, dtype=np.int64),
+        "mask": np.array([True, False]),
+    }
+
+
+def test_safetensors_weights_are_shared_read_only_maps(tmp_path: Path) -> None:
+    path = tmp_path / "auv.safetensors"
+    save_safetensors(_weights(), path)
+
+    first = AUVNetModel(str(path))
+    second = AUVNetModel(str(path))
+    first.load()
+    second.load()
+
+    for name, expected in _weights().items():
+        np.testing.assert_array_equal(first.weights[name], expected)
+        assert not first.weights[name].flags.writeable
+    assert first.weights["enc.weight"] is second.weights["enc.weight"]
+
+
+def test_npy_directory_weights_are_memory_mapped(tmp_path: Path) -> None:
+    for name, array in _weights().items():
+        np.save(tmp_path / f"{name}.npy", array)
+
+    model = AUVNetModel(str(tmp_path))
+    model.load()
+
+    assert isinstance(model.weights["enc.weight"], np.memmap)
+    np.testing.assert_array_equal(model.weights["enc.bias"], np.arange(4))
+
+
+def test_infer_many_runs_single_forward_pass(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "auv.safetensors"
+    save_safetensors(_weights(), path)
+    model = AUVNetModel(str(path), input_size=16)
+    model.load()
+
+    batches: list[tuple[int, ...]] = []
+    original = model._forward
+    monkeypatch.setattr(model, "_forward", lambda batch: batches.append(batch.shape) or original(batch))
+
+    results = model.infer_many([_png_bytes((255, 0, 0)), _png_bytes((0, 255, 0)), _png_bytes((0, 0, 255))])
+
+    assert batches == [(3, 16, 16, 3)]
+    assert len(results) == 3
+    assert results[0]["metadata"]["source"] == str(path)
+
+
+def test_infer_requires_loaded_model() -> None:
+    with pytest.raises(RuntimeError):
+        AUVNetModel("missing.safetensors").infer(_png_bytes((0, 0, 0)))
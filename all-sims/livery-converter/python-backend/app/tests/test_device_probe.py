@@ -0,0 +1,27 @@
+"""Tests for the cached device probe."""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.device_probe import ISA_FEATURES, DeviceProbe, device_probe
+
+
+def test_probe_starts_pending_and_caches_refresh() -> None:
+    probe = DeviceProbe(refresh_seconds=0)
+    assert probe.snapshot()["status"] == "pending"
+
+    snapshot = probe.refresh()
+    assert snapshot["status"] == "ready"
+    assert probe.snapshot() is snapshot
+    assert snapshot["cpu"]["logical_cores"] >= 1
+    assert set(snapshot["cpu"]["isa_features"]) <= set(ISA_FEATURES)
+
+
+def test_background_probe_populates_device_endpoint() -> None:
+    with TestClient(app) as client:
+        assert device_probe.wait_ready(timeout=60)
+        response = client.get("/health/device")
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["status"] == "ready"
+    assert "available" in payload["gpu"]
@@ -0,0 +1,38 @@
+"""Tests for request timing middleware and the /metrics endpoint."""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils.metrics import MetricsRegistry, record_stage
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    local = MetricsRegistry()
+    for value in (0.001, 0.02, 0.02, 3.0):
+        local.observe("latency_seconds", value, (("route", "/x"),))
+
+    text = local.render()
+    assert 'latency_seconds_bucket{route="/x",le="0.005"} 1' in text
+    assert 'latency_seconds_bucket{route="/x",le="0.025"} 3' in text
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/x"} 4' in text
+
+
+def test_metrics_endpoint_reports_routes_sizes_and_stages() -> None:
+    client.get("/health")
+    client.post("/api/generate-livery", json={"photo_id": "p", "car_id": "c"})
+    client.get("/does-not-exist")
+    record_stage("decode", 0.004)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/health"}' in text
+    assert 'route="/api/generate-livery",status="202"' in text
+    assert 'route="<unmatched>",status="404"' in text
+    assert 'http_request_size_bytes_sum{method="POST",route="/api/generate-livery"}' in text
+    assert 'pipeline_stage_duration_seconds_count{stage="decode"}' in text
+    assert "http_requests_in_flight 1" in text  # the /metrics request itself
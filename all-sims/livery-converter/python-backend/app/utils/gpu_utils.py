@@ -1,16 +1,15 @@
 """GPU detection helpers."""
 
-import logging
-
-logger = logging.getLogger(__name__)
+from app.services.device_probe import device_probe
 
 
 def detect_cuda() -> bool:
-    """Return True if CUDA appears available (placeholder implementation)."""
-    try:
-        import torch
-
-        return bool(torch.cuda.is_available())
-    except Exception as exc:  # pragma: no cover - diagnostic path
-        logger.warning("Failed to probe CUDA availability: %s", exc)
-        return False
+    """Return True if CUDA appears available, using the cached device probe.
+
+    The first call probes synchronously when the background probe has not
+    finished yet; later calls only read the cache.
+    """
+    snapshot = device_probe.snapshot()
+    if snapshot["status"] == "pending":
+        snapshot = device_probe.refresh()
+    return bool(snapshot["gpu"]["available"])
@@ -0,0 +1,134 @@
+"""In-process latency/size metrics rendered in Prometheus text format."""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 16_384, 131_072, 1_048_576, 8_388_608, 33_554_432, 134_217_728)
+
+Labels = tuple[tuple[str, str], ...]
+
+_LE_INF = 'le="+Inf"'
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``observe`` is a bisect plus two adds."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _format_number(value: float) -> str:
+    """Exact exposition formatting (``:g`` would round byte-sized bounds)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Thread-safe store for request and pipeline-stage metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._gauges: dict[str, dict[Labels, float]] = {}
+        self._help: dict[str, tuple[str, str]] = {}
+
+    def describe(self, name: str, kind: str, text: str) -> None:
+        self._help[name] = (kind, text)
+
+    def observe(self, name: str, value: float, labels: Labels = (), bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(bounds)
+            histogram.observe(value)
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def add_gauge(self, name: str, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[labels] = value
+
+    def render(self) -> str:
+        """Serialise every series in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, "counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+            for name, series in sorted(self._gauges.items()):
+                self._header(lines, name, "gauge")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds, histogram.counts):
+                        cumulative += count
+                        le = f'le="{_format_number(bound)}"'
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, _LE_INF)} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list[str], name: str, default_kind: str) -> None:
+        kind, text = self._help.get(name, (default_kind, ""))
+        if text:
+            lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+registry = MetricsRegistry()
+registry.describe("http_request_duration_seconds", "histogram", "Request latency by route.")
+registry.describe("http_request_size_bytes", "histogram", "Request body size by route.")
+registry.describe("http_response_size_bytes", "histogram", "Response body size by route.")
+registry.describe("http_requests_total", "counter", "Completed requests by route and status.")
+registry.describe("http_requests_in_flight", "gauge", "Requests currently being handled.")
+registry.describe("pipeline_stage_duration_seconds", "histogram", "Service pipeline stage latency.")
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record one pipeline stage timing (decode, preprocess, inference, encode)."""
+    registry.observe("pipeline_stage_duration_seconds", seconds, (("stage", stage),))
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time the enclosed block as a pipeline stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
@@ -0,0 +1,104 @@
+"""Benchmark the POC 3 blur/sharpen filtering backends.
+
+Compares every ``poc_03_augmentation.filter2d`` backend against the original
+per-pixel reference loop: wall time per image, speed-up, and the maximum
+absolute difference (must stay within float32 tolerance).
+
+Usage
+-----
+python benchmark_augmentation_filters.py --size 512 --batch 8 --output poc_results/filter_benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+
+from poc_03_augmentation import cv2, filter2d
+
+KERNELS: Dict[str, np.ndarray] = {
+    "blur3": np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]], dtype=np.float32) / 16.0,
+    "sharpen3": np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32),
+    "box5": np.full((5, 5), 1.0 / 25.0, dtype=np.float32),
+}
+
+
+def reference_convolve(arr: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """The original interpreted per-pixel loop (HxWxC, square kernel)."""
+
+    pad = kernel.shape[0] // 2
+    arr_padded = np.pad(arr, ((pad, pad), (pad, pad), (0, 0)), mode="reflect")
+    out = np.zeros_like(arr)
+    for y in range(arr.shape[0]):
+        for x in range(arr.shape[1]):
+            region = arr_padded[y : y + kernel.shape[0], x : x + kernel.shape[1]]
+            out[y, x] = (region * kernel[..., None]).sum(axis=(0, 1))
+    return out
+
+
+def _time(fn: Callable[[], np.ndarray], repeats: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark vectorised augmentation filters")
+    parser.add_argument("--size", type=int, default=512, help="Square image edge in pixels")
+    parser.add_argument("--batch", type=int, default=8, help="Images per batched call")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--reference-images", type=int, default=1,
+                        help="Images to run through the slow reference loop")
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--output", type=Path, default=Path("poc_results/filter_benchmark.json"))
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    batch = rng.random((args.batch, args.size, args.size, 3), dtype=np.float32)
+    backends = ["taps", "separable"] + (["cv2"] if cv2 is not None else [])
+
+    report: Dict[str, Dict] = {}
+    for name, kernel in KERNELS.items():
+        reference_start = time.perf_counter()
+        expected = np.stack([reference_convolve(img, kernel) for img in batch[: args.reference_images]])
+        reference_seconds = (time.perf_counter() - reference_start) / args.reference_images
+
+        results: Dict[str, Dict] = {"reference_seconds_per_image": reference_seconds}
+        for backend in backends:
+            try:
+                actual = filter2d(batch[: args.reference_images], kernel, backend=backend)
+            except ValueError:  # e.g. sharpen kernel is not separable
+                continue
+            seconds = _time(lambda: filter2d(batch, kernel, backend=backend), args.repeats) / args.batch
+            results[backend] = {
+                "seconds_per_image": seconds,
+                "speedup": reference_seconds / seconds,
+                "max_abs_diff": float(np.abs(actual - expected).max()),
+            }
+        report[name] = results
+
+        print(f"\n{name}: reference {reference_seconds * 1000:.1f} ms/image")
+        for backend in backends:
+            if backend in results:
+                row = results[backend]
+                print(f"  {backend:<10} {row['seconds_per_image'] * 1000:8.3f} ms/image  "
+                      f"x{row['speedup']:8.1f}  max|diff| {row['max_abs_diff']:.2e}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w", encoding="utf-8") as f:
+        json.dump({"size": args.size, "batch": args.batch, "kernels": report}, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
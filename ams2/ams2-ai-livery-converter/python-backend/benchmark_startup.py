@@ -0,0 +1,182 @@
+"""Cold-start benchmark for the AMS2 livery backend.
+
+Measures two things in fresh interpreters so results are comparable across
+releases:
+
+1. Import profile of ``main`` (``python -X importtime``), including which heavy
+   libraries (torch, cv2, diffusers, transformers) got pulled in.
+2. Time from process launch to the first successful ``GET /health``.
+
+Usage
+-----
+python benchmark_startup.py --runs 5 --output poc_results/startup_benchmark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent
+HEAVY_MODULES = ["torch", "cv2", "diffusers", "transformers"]
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_seconds": elapsed, "heavy_loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse ``-X importtime`` output into per-module records (microseconds)."""
+
+    records: List[Dict] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us = int(fields[0].strip())
+            cumulative_us = int(fields[1].strip())
+        except ValueError:
+            continue
+        name = fields[2].rstrip()
+        records.append(
+            {
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_us": self_us,
+                "cumulative_us": cumulative_us,
+            }
+        )
+    return records
+
+
+def profile_import(top: int) -> Dict:
+    """Import ``main`` in a fresh interpreter and profile module import times."""
+
+    cmd = [sys.executable, "-X", "importtime", "-c", _IMPORT_PROBE.format(heavy=HEAVY_MODULES)]
+    result = subprocess.run(cmd, cwd=BACKEND_DIR, capture_output=True, text=True, check=False)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing main failed:\n{result.stderr[-2000:]}")
+
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    records = parse_importtime(result.stderr)
+    slowest = sorted(records, key=lambda rec: rec["cumulative_us"], reverse=True)[:top]
+    summary["modules_imported"] = len(records)
+    summary["slowest_imports"] = slowest
+    return summary
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_health(timeout: float, poll_interval: float) -> float:
+    """Launch uvicorn and return seconds until ``/health`` answers 200."""
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning"]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                stderr = proc.stderr.read().decode("utf-8", errors="replace") if proc.stderr else ""
+                raise RuntimeError(f"Server exited with code {proc.returncode}:\n{stderr[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=poll_interval) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                pass
+            time.sleep(poll_interval)
+        raise TimeoutError(f"/health did not respond within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _git_commit() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=False)
+    return result.stdout.strip() or None
+
+
+def _describe(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark backend import time and time to first /health")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-process repetitions per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to report")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for /health per run")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--skip-server", action="store_true", help="Only profile imports")
+    parser.add_argument("--output", type=Path, default=Path("poc_results/startup_benchmark.json"))
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    profiles = [profile_import(args.top) for _ in range(args.runs)]
+    import_seconds = [profile["import_seconds"] for profile in profiles]
+
+    report: Dict = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "import_main_seconds": _describe(import_seconds),
+        "heavy_modules_loaded": profiles[-1]["heavy_loaded"],
+        "modules_imported": profiles[-1]["modules_imported"],
+        "slowest_imports": profiles[-1]["slowest_imports"],
+    }
+
+    if not args.skip_server:
+        health_seconds = [time_to_first_health(args.timeout, args.poll_interval) for _ in range(args.runs)]
+        report["first_health_seconds"] = _describe(health_seconds)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"import main        : {report['import_main_seconds']['median'] * 1000:.1f} ms (median)")
+    if "first_health_seconds" in report:
+        print(f"first /health      : {report['first_health_seconds']['median'] * 1000:.1f} ms (median)")
+    print(f"heavy modules      : {', '.join(report['heavy_modules_loaded']) or 'none'}")
+    print(f"Report written to  : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
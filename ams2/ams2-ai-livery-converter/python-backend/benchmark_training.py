@@ -0,0 +1,300 @@
+"""Training throughput benchmark for the POC 5 UV predictor + renderer.
+
+Runs the exact ``poc_05_training_multiview.compute_losses`` step for a few
+warm-up iterations and then a fixed number of timed ones, on synthetic
+batches or a real (PNG or sharded) dataset. Reports samples/sec, the time
+split between data loading, forward, backward and optimizer step, and peak
+memory, as JSON so runs can be compared across commits.
+
+Usage
+-----
+python benchmark_training.py --batch-size 6 --image-size 128 --threads 4 \
+    --warmup 3 --iters 10 --output poc_results/training_benchmark.json
+
+python benchmark_training.py --image-size 128 --compile   # also times an eager baseline
+
+python benchmark_training.py --dataset poc_results/augmented_dataset_ginetta_shards --num-workers 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import torch
+from torch.utils.data import DataLoader
+
+from loader_utils import EpochRandomSampler, loader_options
+from mixed_precision import TrainPrecision, add_precision_args
+from model_compile import add_compile_args, compile_models
+from poc_03_pack_shards import is_sharded
+from poc_05_training_multiview import (
+    MultiViewDataset,
+    Renderer,
+    ShardedMultiViewDataset,
+    UVPredictor,
+    compute_losses,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parent
+PHASES = ("data", "forward", "backward", "optimizer")
+DEFAULT_WEIGHTS = {"cycle": 0.30, "uv_recon": 0.25, "direct": 0.30, "cross": 0.15}
+
+
+def synthetic_batches(batch_size: int, image_size: int, seed: int) -> Iterator[Dict[str, torch.Tensor]]:
+    """Endless stream of random batches shaped like ``MultiViewDataset`` output."""
+
+    generator = torch.Generator().manual_seed(seed)
+    shape = (batch_size, 3, image_size, image_size)
+    while True:
+        yield {
+            "uv_gt": torch.rand(shape, generator=generator) * 2 - 1,
+            "view_a": torch.rand(shape, generator=generator) * 2 - 1,
+            "view_b": torch.rand(shape, generator=generator) * 2 - 1,
+            "mask_a": (torch.rand((batch_size, 1, image_size, image_size), generator=generator) > 0.3).float(),
+            "mask_b": (torch.rand((batch_size, 1, image_size, image_size), generator=generator) > 0.3).float(),
+        }
+
+
+def dataset_batches(dataset_path: Path, args: argparse.Namespace) -> Iterator[Dict[str, torch.Tensor]]:
+    """Cycle a DataLoader over a real dataset, advancing the epoch on each pass."""
+
+    if is_sharded(dataset_path):
+        dataset = ShardedMultiViewDataset(dataset_path, image_size=args.image_size, seed=args.seed)
+    else:
+        dataset = MultiViewDataset(dataset_path, image_size=args.image_size, seed=args.seed,
+                                   cache_bytes=args.cache_mb * 1024 * 1024)
+    sampler = EpochRandomSampler(len(dataset), seed=args.seed)
+    loader = DataLoader(dataset, batch_size=args.batch_size, sampler=sampler, drop_last=True,
+                        **loader_options(args.num_workers, args.seed))
+    epoch = 0
+    while True:
+        sampler.set_epoch(epoch)
+        dataset.set_epoch(epoch)
+        yield from loader
+        epoch += 1
+
+
+def _sync(device: torch.device) -> None:
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def peak_memory_bytes(device: torch.device) -> Dict[str, Optional[int]]:
+    """Peak CUDA allocation (if any) and peak process RSS."""
+
+    peak_rss: Optional[int] = None
+    try:
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss = rss if sys.platform == "darwin" else rss * 1024  # bytes on macOS, KiB elsewhere
+    except ImportError:  # Windows
+        try:
+            import psutil
+
+            peak_rss = getattr(psutil.Process().memory_info(), "peak_wset", None)
+        except ImportError:
+            pass
+    return {
+        "peak_rss_bytes": peak_rss,
+        "peak_cuda_allocated_bytes": torch.cuda.max_memory_allocated(device) if device.type == "cuda" else None,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def time_training(args: argparse.Namespace, device: torch.device, compile_models_first: bool) -> Dict:
+    """Build fresh models and time ``args.warmup`` + ``args.iters`` training steps."""
+
+    torch.manual_seed(args.seed)
+    precision = TrainPrecision.from_args(args, device)
+    model_uv = precision.prepare_model(UVPredictor())
+    model_renderer = precision.prepare_model(Renderer())
+    compiled: Optional[Dict] = None
+    if compile_models_first:
+        example = precision.to_device(torch.zeros(args.batch_size, 3, args.image_size, args.image_size))
+        compiled = compile_models([model_uv, model_renderer], example, args.compile_cache)
+    model_uv.train()
+    model_renderer.train()
+    optim_uv = torch.optim.Adam(model_uv.parameters(), lr=2e-4, betas=(0.5, 0.999))
+    optim_renderer = torch.optim.Adam(model_renderer.parameters(), lr=2e-4, betas=(0.5, 0.999))
+
+    batches = (
+        dataset_batches(args.dataset, args) if args.dataset is not None
+        else synthetic_batches(args.batch_size, args.image_size, args.seed)
+    )
+
+    totals = {phase: 0.0 for phase in PHASES}
+    warmup_seconds = 0.0
+    samples = 0
+    for step in range(args.warmup + args.iters):
+        if step == args.warmup and device.type == "cuda":
+            torch.cuda.reset_peak_memory_stats(device)
+        timed = step >= args.warmup
+
+        start = time.perf_counter()
+        batch = {key: precision.to_device(value) for key, value in next(batches).items()}
+        _sync(device)
+        loaded = time.perf_counter()
+
+        losses = compute_losses(batch, model_uv, model_renderer, device, DEFAULT_WEIGHTS, precision,
+                                args.fused_step)
+        _sync(device)
+        forwarded = time.perf_counter()
+
+        optim_uv.zero_grad(set_to_none=True)
+        optim_renderer.zero_grad(set_to_none=True)
+        precision.backward(losses["total"])
+        _sync(device)
+        backwarded = time.perf_counter()
+
+        precision.step(optim_uv, optim_renderer)
+        _sync(device)
+        stepped = time.perf_counter()
+
+        if timed:
+            totals["data"] += loaded - start
+            totals["forward"] += forwarded - loaded
+            totals["backward"] += backwarded - forwarded
+            totals["optimizer"] += stepped - backwarded
+            samples += batch["view_a"].shape[0]
+        else:
+            warmup_seconds += stepped - start
+
+    return {"totals": totals, "samples": samples, "warmup_seconds": warmup_seconds, "compiled": compiled}
+
+
+def compile_tradeoff(compiled_run: Dict, eager_run: Dict, iters: int) -> Dict:
+    """One-off compile cost against the steady-state gain per iteration."""
+
+    compiled_step = sum(compiled_run["totals"].values()) / iters
+    eager_step = sum(eager_run["totals"].values()) / iters
+    one_off = (compiled_run["compiled"]["setup_seconds"] + compiled_run["warmup_seconds"]
+               - eager_run["warmup_seconds"])
+    saving = eager_step - compiled_step
+    return {
+        "backend": compiled_run["compiled"]["backend"],
+        "fallback_reason": compiled_run["compiled"]["error"],
+        "setup_seconds": compiled_run["compiled"]["setup_seconds"],
+        "warmup_seconds": compiled_run["warmup_seconds"],
+        "eager_warmup_seconds": eager_run["warmup_seconds"],
+        "eager_seconds_per_iteration": eager_step,
+        "speedup": eager_step / compiled_step if compiled_step else 0.0,
+        "break_even_iterations": math.ceil(one_off / saving) if saving > 0 else None,
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict:
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    device = torch.device(args.device)
+
+    run = time_training(args, device, compile_models_first=args.compile)
+    memory = peak_memory_bytes(device)
+    compile_report = None
+    if args.compile:
+        compile_report = compile_tradeoff(run, time_training(args, device, compile_models_first=False), args.iters)
+
+    totals = run["totals"]
+    elapsed = sum(totals.values())
+    return {
+        "git_commit": git_commit(),
+        "label": args.label,
+        "config": {
+            "batch_size": args.batch_size,
+            "image_size": args.image_size,
+            "threads": torch.get_num_threads(),
+            "warmup": args.warmup,
+            "iters": args.iters,
+            "device": str(device),
+            "data": str(args.dataset) if args.dataset is not None else "synthetic",
+            "num_workers": args.num_workers if args.dataset is not None else 0,
+            "seed": args.seed,
+            "amp": args.amp,
+            "channels_last": args.channels_last,
+            "compile": args.compile,
+            "fused_step": args.fused_step,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cuda_device": torch.cuda.get_device_name(device) if device.type == "cuda" else None,
+        },
+        "samples_per_sec": run["samples"] / elapsed if elapsed else 0.0,
+        "seconds_per_iteration": elapsed / args.iters if args.iters else 0.0,
+        "warmup_seconds": run["warmup_seconds"],
+        "phase_seconds": {phase: totals[phase] / args.iters for phase in PHASES},
+        "phase_fraction": {phase: totals[phase] / elapsed if elapsed else 0.0 for phase in PHASES},
+        "memory": memory,
+        "compile": compile_report,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark POC 5 training throughput")
+    parser.add_argument("--batch-size", type=int, default=6)
+    parser.add_argument("--image-size", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed iterations before measuring")
+    parser.add_argument("--iters", type=int, default=10, help="Timed iterations")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--dataset", type=Path, default=None,
+                        help="Augmented dataset or shard directory (default: synthetic batches)")
+    parser.add_argument("--num-workers", type=int, default=0, help="Loader workers with --dataset")
+    parser.add_argument("--cache-mb", type=int, default=1024, help="Tensor cache cap with a PNG --dataset")
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--fused-step", action="store_true", help="Time the fused forward passes")
+    add_precision_args(parser)
+    add_compile_args(parser)
+    parser.add_argument("--label", default=None, help="Free-form tag stored in the report")
+    parser.add_argument("--output", type=Path, default=Path("poc_results/training_benchmark.json"))
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = run_benchmark(args)
+
+    fractions = report["phase_fraction"]
+    print(f"{report['samples_per_sec']:.2f} samples/s "
+          f"({report['seconds_per_iteration'] * 1000:.1f} ms/iter, batch {args.batch_size}, "
+          f"{args.image_size}px, {report['config']['threads']} threads, {report['config']['device']}, "
+          f"amp={args.amp}{', channels_last' if args.channels_last else ''})")
+    print("  " + "  ".join(f"{phase} {fractions[phase] * 100:.1f}%" for phase in PHASES))
+    compiled = report["compile"]
+    if compiled is not None:
+        break_even = compiled["break_even_iterations"]
+        print(f"  {compiled['backend']}: {compiled['speedup']:.2f}x vs eager, "
+              f"{compiled['setup_seconds'] + compiled['warmup_seconds']:.1f}s setup+warm-up "
+              f"(eager {compiled['eager_warmup_seconds']:.1f}s), "
+              f"break-even after {break_even if break_even is not None else 'never'} iterations")
+    memory = report["memory"]
+    if memory["peak_cuda_allocated_bytes"] is not None:
+        print(f"  peak CUDA allocated {memory['peak_cuda_allocated_bytes'] / 1e6:.1f} MB")
+    if memory["peak_rss_bytes"] is not None:
+        print(f"  peak RSS {memory['peak_rss_bytes'] / 1e6:.1f} MB")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with args.output.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Background checkpoint writer for the POC training scripts.
+
+``CheckpointManager.save`` copies the state to CPU on the calling thread.
+That is the only blocking part. A single writer thread then serialises it
+to ``<name>.tmp`` and renames it into place, so a crash never leaves a
+truncated checkpoint. Writes happen in submission order. Periodic
+snapshots beyond ``keep_last`` are deleted once a newer one is on disk.
+
+Each checkpoint can carry a ``<stem>.metrics.json`` sidecar with its
+metrics and per-epoch history. Tools such as the autorunner read the
+sidecar instead of unpickling both networks' weights. A sidecar is
+renamed into place only after its checkpoint, so it always refers to a
+complete file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+
+METRICS_SUFFIX = ".metrics.json"
+
+
+def metrics_path(checkpoint_path: Path) -> Path:
+    return checkpoint_path.with_suffix(METRICS_SUFFIX)
+
+
+def write_metrics_sidecar(checkpoint_path: Path, payload: str) -> Path:
+    """Atomically write the JSON ``payload`` next to ``checkpoint_path``."""
+
+    path = metrics_path(checkpoint_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(payload, encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def to_cpu(obj: Any) -> Any:
+    """Deep copy of nested containers with every tensor cloned onto the CPU.
+
+    Clones even CPU tensors: training keeps updating parameters and
+    optimizer state in place while the writer thread is serialising.
+    """
+
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {key: to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(to_cpu(value) for value in obj)
+    return obj
+
+
+def capture_rng_state() -> Dict[str, Any]:
+    state = {
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def restore_rng_state(state: Dict[str, Any]) -> None:
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+class CheckpointManager:
+    """Async, atomic checkpoint writes plus retention of periodic snapshots."""
+
+    def __init__(self, directory: Path, stem: str, keep_last: int = 3):
+        self.directory = directory
+        self.stem = stem
+        self.keep_last = keep_last
+        self._pattern = re.compile(rf"^{re.escape(stem)}_epoch(\d+)\.pt$")
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self._pending: List[Future] = []
+
+    def snapshot_path(self, epoch: int) -> Path:
+        return self.directory / f"{self.stem}_epoch{epoch:03d}.pt"
+
+    def snapshots(self) -> List[Path]:
+        """Complete periodic snapshots on disk, oldest first."""
+
+        if not self.directory.is_dir():
+            return []
+        found = []
+        for path in self.directory.iterdir():
+            match = self._pattern.match(path.name)
+            if match:
+                found.append((int(match.group(1)), path))
+        return [path for _, path in sorted(found)]
+
+    def latest_snapshot(self) -> Optional[Path]:
+        snapshots = self.snapshots()
+        return snapshots[-1] if snapshots else None
+
+    def save(self, state: Dict[str, Any], path: Path, metrics: Optional[Dict[str, Any]] = None) -> Path:
+        """Queue ``state`` for writing to ``path``; returns once it is copied.
+
+        ``metrics`` (JSON-serialisable; ``Path`` values become strings) is
+        written to the ``.metrics.json`` sidecar.
+        """
+
+        return self._submit(state, path, metrics, prune=False)
+
+    def save_snapshot(self, state: Dict[str, Any], epoch: int,
+                      metrics: Optional[Dict[str, Any]] = None) -> Path:
+        """Queue a periodic snapshot, pruning older ones beyond ``keep_last``."""
+
+        return self._submit(state, self.snapshot_path(epoch), metrics, prune=True)
+
+    def _submit(self, state: Dict[str, Any], path: Path, metrics: Optional[Dict[str, Any]],
+                prune: bool) -> Path:
+        self._raise_failures()
+        # Serialise the sidecar now: the caller keeps mutating its history.
+        payload = json.dumps(metrics, indent=2, default=str) if metrics is not None else None
+        self._pending.append(self._executor.submit(self._write, to_cpu(state), path, payload, prune))
+        return path
+
+    def _write(self, state: Dict[str, Any], path: Path, payload: Optional[str], prune: bool) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, path)
+        if payload is not None:
+            write_metrics_sidecar(path, payload)
+        if prune and self.keep_last > 0:
+            for old in self.snapshots()[:-self.keep_last]:
+                old.unlink(missing_ok=True)
+                metrics_path(old).unlink(missing_ok=True)
+        return path
+
+    def _raise_failures(self) -> None:
+        done = [future for future in self._pending if future.done()]
+        self._pending = [future for future in self._pending if future not in done]
+        for future in done:
+            future.result()  # re-raise a failed write on the training thread
+
+    def wait(self) -> None:
+        """Block until every queued write is on disk (re-raising failures)."""
+
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
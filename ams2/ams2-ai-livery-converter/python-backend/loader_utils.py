@@ -0,0 +1,82 @@
+"""DataLoader helpers for reproducible multi-worker training in the POC scripts.
+
+Datasets derive all per-sample randomness from (seed, epoch, index), so the
+result does not depend on which worker loads a sample or on how many
+workers there are. ``SharedEpoch`` keeps the epoch in shared memory so that
+persistent workers see ``set_epoch`` calls made by the training loop.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterator
+
+import numpy as np
+import torch
+from torch.utils.data import Sampler
+
+
+class SharedEpoch:
+    """Epoch counter visible to DataLoader workers, including persistent ones."""
+
+    def __init__(self, epoch: int = 0):
+        self._value = torch.full((), epoch, dtype=torch.int64).share_memory_()
+
+    def set(self, epoch: int) -> None:
+        self._value.fill_(epoch)
+
+    def get(self) -> int:
+        return int(self._value)
+
+
+class EpochRandomSampler(Sampler[int]):
+    """Shuffling sampler whose order depends only on (seed, epoch).
+
+    ``shuffle=True`` draws the order from the loader generator, which
+    DataLoader also uses for worker seeds -- once per epoch normally, but only
+    once overall with persistent workers -- so the order would change with
+    the worker settings.
+    """
+
+    def __init__(self, num_samples: int, seed: int = 1337):
+        self.num_samples = num_samples
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(np.random.default_rng([self.seed, self.epoch]).permutation(self.num_samples).tolist())
+
+
+def seed_worker(worker_id: int) -> None:
+    """``worker_init_fn``: derive Python/NumPy seeds from the per-worker torch seed.
+
+    DataLoader gives each worker ``base_seed + worker_id`` with ``base_seed``
+    drawn from the (seeded) main-process generator, so any library RNG used
+    inside a worker is distinct per worker yet reproducible across runs.
+    """
+
+    seed = torch.initial_seed() % 2**32
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def loader_options(num_workers: int, seed: int, persistent_workers: bool = True,
+                   prefetch_factor: int = 2, pin_memory: bool = False) -> Dict[str, Any]:
+    """Keyword arguments for ``DataLoader`` shared by the training scripts."""
+
+    options: Dict[str, Any] = {
+        "num_workers": num_workers,
+        "worker_init_fn": seed_worker,
+        "generator": torch.Generator().manual_seed(seed),
+        "pin_memory": pin_memory,
+    }
+    if num_workers > 0:
+        options["persistent_workers"] = persistent_workers
+        options["prefetch_factor"] = prefetch_factor
+    return options
@@ -7,15 +7,19 @@ Port: 8002 (to avoid conflicts with POC-08 on 8001)
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
+import asyncio
 import sys
 import os
-import torch
 
 # Add services to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'services'))
 
+from services.admission import AdmissionController, AdmissionMiddleware, RoutePolicy
+from services.device_probe import DeviceProbe
+from services.metrics import RequestMetricsMiddleware, registry as metrics_registry
+
 # Import services (will create these)
 # from services.image_processor import ImageProcessor
 # from services.ai_generator import AIGenerator
@@ -23,6 +27,29 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'services'))
 
 app = FastAPI(title="AMS2 AI Livery Designer Backend", version="0.1.0")
 
+# Admission control: each 4K texture pipeline holds hundreds of MB, so bound
+# concurrent jobs and their combined working set; overload gets 429 + Retry-After
+MB = 1024 * 1024
+admission = AdmissionController(
+    policies={
+        "/api/generate-livery": RoutePolicy(
+            max_concurrency=int(os.environ.get("ADMISSION_GENERATE_CONCURRENCY", "1")),
+            max_queue=int(os.environ.get("ADMISSION_GENERATE_QUEUE", "4")),
+            working_set_bytes=1536 * MB,  # SDXL 1024px latents + 4K UV projection buffers
+            default_job_seconds=60.0,
+        ),
+        "/api/process-image": RoutePolicy(
+            max_concurrency=int(os.environ.get("ADMISSION_PROCESS_CONCURRENCY", "4")),
+            max_queue=int(os.environ.get("ADMISSION_PROCESS_QUEUE", "16")),
+            working_set_bytes=256 * MB,
+            bytes_per_request_byte=24.0,  # JPEG -> float32 RGB expansion
+            default_job_seconds=5.0,
+        ),
+    },
+    memory_budget_bytes=int(os.environ.get("ADMISSION_MEMORY_BUDGET_MB", "6144")) * MB,
+)
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 # Enable CORS for Tauri frontend
 app.add_middleware(
     CORSMiddleware,
@@ -33,19 +60,36 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Check GPU availability
-def check_gpu():
-    """Check if CUDA GPU is available"""
-    if torch.cuda.is_available():
-        gpu_name = torch.cuda.get_device_name(0)
-        gpu_memory = torch.cuda.get_device_properties(0).total_memory / 1e9  # GB
-        return {
-            "available": True,
-            "name": gpu_name,
-            "memory_gb": round(gpu_memory, 2),
-            "cuda_version": torch.version.cuda
-        }
-    return {"available": False}
+# Per-route latency/size metrics, served on /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
+# Device capabilities are probed in the background and cached, so /health
+# never touches torch on the request path
+DEVICE_PROBE_REFRESH_SECONDS = float(os.environ.get("DEVICE_PROBE_REFRESH_SECONDS", "300"))
+
+
+async def report_devices():
+    """Print the device summary once the first background probe completes"""
+    loop = asyncio.get_running_loop()
+    # Bounded wait: a failed probe must not leave an executor thread blocked at shutdown
+    if not await loop.run_in_executor(None, device_probe.wait_ready, 120.0):
+        print("⚠️  Device probe has not completed; see /device-info later")
+        return
+    snapshot = device_probe.snapshot()
+    gpu_info = snapshot["gpu"]
+    cpu_info = snapshot["cpu"]
+    if gpu_info["available"]:
+        print(f"✅ GPU: {gpu_info['name']}")
+        print(f"✅ VRAM: {gpu_info['memory_gb']} GB")
+        print(f"✅ CUDA: {gpu_info['cuda_version']}")
+    else:
+        print("⚠️  No GPU detected - AI generation will be slow")
+    print(f"✅ CPU: {cpu_info['usable_cores']} cores, "
+          f"{cpu_info['available_ram_gb']} GB RAM free, "
+          f"ISA: {', '.join(cpu_info['isa_features']) or 'baseline'}")
+
+
+device_probe = DeviceProbe(refresh_seconds=DEVICE_PROBE_REFRESH_SECONDS)
 
 @app.get("/")
 async def root():
@@ -57,6 +101,9 @@ async def root():
         "endpoints": {
             "health": "/health",
             "gpu_info": "/gpu-info",
+            "device_info": "/device-info",
+            "metrics": "/metrics",
+            "admission": "/admission",
             "process_image": "/api/process-image (Week 5-6)",
             "generate_livery": "/api/generate-livery (Week 5-6)",
             "export_dds": "/api/export-dds (Week 5-6)"
@@ -66,17 +113,33 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    gpu_info = check_gpu()
+    snapshot = device_probe.snapshot()
     return {
         "status": "ok",
-        "gpu_available": gpu_info["available"],
+        "gpu_available": snapshot["gpu"]["available"],
+        "device_probe": snapshot["status"],
         "service": "AMS2 AI Livery Designer"
     }
 
 @app.get("/gpu-info")
 async def gpu_info():
-    """Get detailed GPU information"""
-    return check_gpu()
+    """Get detailed GPU information (cached)"""
+    return device_probe.snapshot()["gpu"]
+
+@app.get("/device-info")
+async def device_info():
+    """Get cached GPU + CPU capabilities for worker pool sizing"""
+    return device_probe.snapshot()
+
+@app.get("/admission")
+async def admission_stats():
+    """Active/queued jobs, reserved memory and shed-load counts per route"""
+    return admission.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus-style request and pipeline stage metrics"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 # Placeholder endpoints for Week 5-6 implementation
 @app.post("/api/process-image")
@@ -110,19 +173,24 @@ async def startup_event():
     print("AMS2 AI Livery Designer - Python Backend")
     print("=" * 60)
     
-    # Check GPU
-    gpu_info = check_gpu()
-    if gpu_info["available"]:
-        print(f"✅ GPU: {gpu_info['name']}")
-        print(f"✅ VRAM: {gpu_info['memory_gb']} GB")
-        print(f"✅ CUDA: {gpu_info['cuda_version']}")
-    else:
-        print("⚠️  No GPU detected - AI generation will be slow")
+    # Probe GPU/CPU in the background; summary prints when ready
+    device_probe.start()
+    # Keep a reference: the event loop only holds tasks weakly
+    app.state.device_report_task = asyncio.create_task(report_devices())
+    print("⏳ Probing devices in background...")
     
     print("=" * 60)
     print(f"Server running on http://127.0.0.1:8002")
     print("=" * 60)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background services"""
+    report_task = getattr(app.state, "device_report_task", None)
+    if report_task is not None and not report_task.done():
+        report_task.cancel()
+    device_probe.stop()
+
 if __name__ == "__main__":
     uvicorn.run(
         app,
@@ -0,0 +1,90 @@
+"""Mixed-precision and memory-format settings shared by the POC training scripts.
+
+``--amp bf16`` runs the forward passes under ``torch.autocast`` in bfloat16
+(CPU and CUDA); ``--amp fp16`` uses float16 plus a ``GradScaler`` so small
+gradients do not underflow. Loss terms are always computed in fp32 on the
+upcast outputs. ``--channels-last`` stores conv weights and 4-D inputs as
+NHWC, which the cuDNN/oneDNN conv kernels prefer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+from typing import ContextManager, Dict, Optional
+
+import torch
+import torch.nn as nn
+
+AMP_DTYPES: Dict[str, Optional[torch.dtype]] = {
+    "off": None,
+    "bf16": torch.bfloat16,
+    "fp16": torch.float16,
+}
+
+
+def add_precision_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--amp", choices=list(AMP_DTYPES), default="off",
+                        help="Autocast dtype for forward passes (fp16 adds gradient scaling)")
+    parser.add_argument("--channels-last", action="store_true",
+                        help="Use the channels_last (NHWC) memory format for models and inputs")
+
+
+class TrainPrecision:
+    """Autocast, gradient scaling and memory format for one training run."""
+
+    def __init__(self, device: torch.device, amp: str = "off", channels_last: bool = False):
+        if amp not in AMP_DTYPES:
+            raise ValueError(f"Unknown --amp mode {amp!r}; expected one of {sorted(AMP_DTYPES)}")
+        self.device = device
+        self.amp = amp
+        self.dtype = AMP_DTYPES[amp]
+        self.memory_format = torch.channels_last if channels_last else torch.contiguous_format
+        self.scaler = torch.amp.GradScaler(device.type) if amp == "fp16" else None
+        if amp == "fp16" and device.type == "cpu":
+            print("Warning: fp16 autocast has no fast conv kernels on CPU; prefer --amp bf16 there")
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace, device: torch.device) -> "TrainPrecision":
+        return cls(device, amp=args.amp, channels_last=args.channels_last)
+
+    def prepare_model(self, model: nn.Module) -> nn.Module:
+        return model.to(self.device, memory_format=self.memory_format)
+
+    def to_device(self, tensor: torch.Tensor) -> torch.Tensor:
+        if tensor.dim() == 4:
+            return tensor.to(self.device, memory_format=self.memory_format, non_blocking=True)
+        return tensor.to(self.device, non_blocking=True)
+
+    def autocast(self) -> ContextManager:
+        if self.dtype is None:
+            return contextlib.nullcontext()
+        return torch.autocast(device_type=self.device.type, dtype=self.dtype)
+
+    def backward(self, loss: torch.Tensor) -> None:
+        if self.scaler is None:
+            loss.backward()
+        else:
+            self.scaler.scale(loss).backward()
+
+    def step(self, *optimizers: torch.optim.Optimizer) -> None:
+        """Step every optimizer, skipping the update if fp16 gradients overflowed."""
+
+        if self.scaler is None:
+            for optimizer in optimizers:
+                optimizer.step()
+            return
+        for optimizer in optimizers:
+            self.scaler.step(optimizer)
+        self.scaler.update()
+
+    def state_dict(self) -> Dict:
+        return {"scaler": self.scaler.state_dict()} if self.scaler is not None else {}
+
+    def load_state_dict(self, state: Dict) -> None:
+        if self.scaler is not None and state.get("scaler"):
+            self.scaler.load_state_dict(state["scaler"])
+
+    def describe(self) -> str:
+        layout = "channels_last" if self.memory_format is torch.channels_last else "NCHW"
+        return f"amp={self.amp}, {layout}"
@@ -0,0 +1,137 @@
+"""Opt-in graph compilation for the POC UV predictor and renderer.
+
+``compile_models`` compiles the modules in place with ``nn.Module.compile``,
+so state_dict keys, optimizers and checkpoints are unchanged. Inductor
+writes its FX-graph and AOT-autograd caches under ``--compile-cache``, and
+later runs reuse them instead of recompiling. That takes the first
+compiled step on CPU from tens of seconds to a few.
+
+If ``torch.compile`` is unavailable or its toolchain is missing (often the
+case on Windows without a C++ compiler or Triton), the models fall back to
+``torch.jit.trace``. Each (train/eval, shape, dtype, autocast, patched
+submodules) combination is traced once. Traced graphs share parameters
+and buffers with the eager module. Tracing is cheap, so these graphs are
+not cached on disk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import torch
+import torch.nn as nn
+
+DEFAULT_COMPILE_CACHE = Path("poc_results/compile_cache")
+
+
+def add_compile_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--compile", action="store_true",
+                        help="Compile the models with torch.compile (TorchScript tracing as fallback)")
+    parser.add_argument("--compile-cache", type=Path, default=DEFAULT_COMPILE_CACHE,
+                        help="Directory for compiled artefacts reused between runs")
+
+
+def enable_compile_cache(cache_dir: Path) -> None:
+    """Point Inductor's on-disk caches at ``cache_dir`` (unless already overridden)."""
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir.resolve()))
+    try:
+        import torch._functorch.config as functorch_config
+        import torch._inductor.config as inductor_config
+    except ImportError:
+        return
+    inductor_config.fx_graph_cache = True
+    if hasattr(functorch_config, "enable_autograd_cache"):
+        functorch_config.enable_autograd_cache = True
+
+
+def trace_in_place(model: nn.Module) -> nn.Module:
+    """Route ``model.forward`` through TorchScript traces built on first use."""
+
+    traces: Dict[Tuple, Callable] = {}
+    submodules = [module for module in model.modules() if module is not model]
+
+    def forward(x: torch.Tensor) -> torch.Tensor:
+        # Temporarily patched submodules (e.g. split_batch_norm) get their own trace.
+        patched = tuple("forward" in vars(module) for module in submodules)
+        key = (model.training, tuple(x.shape), x.dtype, x.device,
+               torch.is_autocast_enabled(x.device.type), torch.is_grad_enabled(), patched)
+        traced = traces.get(key)
+        if traced is None:
+            # Tracing runs the forward once; restore buffers so BatchNorm
+            # running stats are not updated twice for this batch.
+            buffers = [(buffer, buffer.clone()) for buffer in model.buffers()]
+            del model.forward  # trace the class forward, not this dispatcher
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    traced = torch.jit.trace(model, x, check_trace=False)
+            finally:
+                model.forward = forward
+                for buffer, saved in buffers:
+                    # Via .data so autograd's version check on earlier traced
+                    # calls in this step is unaffected (it does not read them).
+                    buffer.data.copy_(saved)
+            traces[key] = traced
+        return traced(x)
+
+    model.forward = forward
+    return model
+
+
+def _probe(models: Sequence[nn.Module], example: torch.Tensor) -> None:
+    """Run each model once in eval/no_grad so compile errors surface up front."""
+
+    for model in models:
+        was_training = model.training
+        model.eval()
+        try:
+            with torch.no_grad():
+                out = model(example)
+        finally:
+            model.train(was_training)
+        example = out  # UVPredictor output is the Renderer's input
+
+
+def compile_models(models: Sequence[nn.Module], example: torch.Tensor,
+                   cache_dir: Optional[Path] = DEFAULT_COMPILE_CACHE) -> Dict[str, object]:
+    """Compile ``models`` in place; returns the backend used and the setup time.
+
+    ``example`` is a representative input for the first model; each model's
+    output feeds the next for the probe pass, matching the UV -> renderer
+    chain.
+    """
+
+    start = time.perf_counter()
+    backend = "inductor"
+    error: Optional[str] = None
+    if hasattr(torch, "compile") and hasattr(nn.Module, "compile"):
+        if cache_dir is not None:
+            enable_compile_cache(cache_dir)
+        try:
+            for model in models:
+                model.compile()
+            _probe(models, example)
+        except Exception as exc:  # missing compiler/Triton, unsupported Python, ...
+            error = f"{type(exc).__name__}: {exc}".splitlines()[0]
+            for model in models:
+                model._compiled_call_impl = None  # undo nn.Module.compile
+            torch._dynamo.reset()
+            backend = "torchscript"
+    else:
+        backend = "torchscript"
+
+    if backend == "torchscript":
+        if error is not None:
+            print(f"torch.compile unavailable ({error}); falling back to TorchScript tracing")
+        for model in models:
+            trace_in_place(model)
+        _probe(models, example)
+
+    return {"backend": backend, "setup_seconds": time.perf_counter() - start, "error": error}
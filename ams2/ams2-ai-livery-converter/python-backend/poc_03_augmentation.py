@@ -9,7 +9,14 @@ Usage
 python poc_03_augmentation.py \
     --examples-dir "../examples/gt4_skins/Automobilista 2/Vehicles/Textures/CustomLiveries/Overrides/ginetta_g55_gt4_2/GIN" \
     --output-dir poc_results/augmented_dataset \
-    --augmentations-per-pair 64
+    --augmentations-per-pair 64 \
+    --workers 8
+
+Every (pair, augmentation) item gets its own seed drawn up-front from
+``--seed``, so the generated dataset is identical for any ``--workers``
+value. Finished records are appended to ``metadata.jsonl`` as they complete
+and ``metadata.json`` is rewritten periodically; ``--resume`` skips items
+already recorded by an interrupted run.
 """
 
 from __future__ import annotations
@@ -17,16 +24,23 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 from PIL import Image, ImageEnhance
 from tqdm import tqdm
 
 # NOTE: Stick to PIL/Numpy so the script runs inside the lightweight POC env.
+# OpenCV is only used as an optional fast path for filtering.
+try:
+    import cv2
+except ImportError:  # pragma: no cover - optional dependency
+    cv2 = None
 
 
 @dataclass
@@ -155,7 +169,11 @@ def random_perspective(image: Image.Image, rng: random.Random) -> Image.Image:
 def gaussian_noise(image: Image.Image, rng: random.Random, sigma: float = 0.02) -> Image.Image:
     arr = _to_numpy(image)
     noise = rng.normalvariate(0.0, sigma)
-    arr = arr + rng.normalvariate(0.0, sigma) * np.random.standard_normal(arr.shape)
+    scale = rng.normalvariate(0.0, sigma)
+    # Derive the pixel noise from ``rng`` (not the global NumPy state) so each
+    # sample is reproducible regardless of which process generates it.
+    np_rng = np.random.default_rng(rng.getrandbits(64))
+    arr = arr + scale * np_rng.standard_normal(arr.shape, dtype=np.float32)
     return _from_numpy(arr)
 
 
@@ -175,15 +193,101 @@ def blur_or_sharpen(image: Image.Image, rng: random.Random) -> Image.Image:
 
 
 def _convolve(arr: np.ndarray, kernel: np.ndarray) -> np.ndarray:
-    pad = kernel.shape[0] // 2
     kernel = kernel / kernel.sum() if kernel.sum() != 0 else kernel
-    arr_padded = np.pad(arr, ((pad, pad), (pad, pad), (0, 0)), mode="reflect")
-    out = np.zeros_like(arr)
-    for y in range(arr.shape[0]):
-        for x in range(arr.shape[1]):
-            region = arr_padded[y : y + kernel.shape[0], x : x + kernel.shape[1]]
-            out[y, x] = (region * kernel[..., None]).sum(axis=(0, 1))
-    return np.clip(out, 0.0, 1.0)
+    return np.clip(filter2d(arr, kernel), 0.0, 1.0)
+
+
+# ---------------------------------------------------------------------------
+# Filtering backend
+# ---------------------------------------------------------------------------
+#
+# All backends compute the same 2-D cross-correlation with NumPy "reflect"
+# padding (a.k.a. OpenCV BORDER_REFLECT_101) as the original per-pixel loop,
+# but over whole arrays instead of one interpreted iteration per pixel.
+
+FILTER_BACKENDS = ("auto", "cv2", "separable", "taps")
+
+
+def _separable_factors(kernel: np.ndarray, tol: float = 1e-6) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Split a rank-1 kernel into (column, row) 1-D factors, else return None."""
+
+    u, s, vt = np.linalg.svd(kernel.astype(np.float64))
+    if s[0] == 0 or (s.size > 1 and s[1] > tol * s[0]):
+        return None
+    scale = math.sqrt(s[0])
+    return u[:, 0] * scale, vt[0] * scale
+
+
+def _correlate_taps(batch: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """Shift-and-accumulate: one full-array multiply-add per kernel tap."""
+
+    kh, kw = kernel.shape
+    ph, pw = kh // 2, kw // 2
+    height, width = batch.shape[1:3]
+    padded = np.pad(batch, ((0, 0), (ph, ph), (pw, pw), (0, 0)), mode="reflect")
+    out = np.zeros(batch.shape, dtype=np.result_type(batch.dtype, np.float32))
+    for dy in range(kh):
+        for dx in range(kw):
+            weight = kernel[dy, dx]
+            if weight:
+                out += weight * padded[:, dy : dy + height, dx : dx + width]
+    return out
+
+
+def _correlate_separable(batch: np.ndarray, column: np.ndarray, row: np.ndarray) -> np.ndarray:
+    """Vertical then horizontal 1-D passes (2k instead of k^2 taps)."""
+
+    dtype = np.result_type(batch.dtype, np.float32)
+    vertical = _correlate_taps(batch, column.astype(dtype)[:, None])
+    return _correlate_taps(vertical, row.astype(dtype)[None, :])
+
+
+def _correlate_cv2(batch: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    kernel = kernel.astype(np.float32)
+    out = np.empty(batch.shape, dtype=np.float32)
+    for idx, image in enumerate(batch.astype(np.float32, copy=False)):
+        filtered = cv2.filter2D(image, -1, kernel, borderType=cv2.BORDER_REFLECT_101)
+        out[idx] = filtered.reshape(image.shape)
+    return out
+
+
+def filter2d(arr: np.ndarray, kernel: np.ndarray, backend: str = "auto") -> np.ndarray:
+    """Cross-correlate images with an odd-sized kernel using reflect padding.
+
+    ``arr`` may be a single image (``HxW`` / ``HxWxC``) or a batch
+    (``NxHxWxC``); the output has the same shape. ``backend`` selects
+    ``cv2`` (``cv2.filter2D``), ``separable`` (two 1-D passes, rank-1 kernels
+    only), ``taps`` (shift-and-accumulate) or ``auto`` (fastest available).
+    """
+
+    if backend not in FILTER_BACKENDS:
+        raise ValueError(f"Unknown filter backend {backend!r}; expected one of {FILTER_BACKENDS}")
+    kernel = np.asarray(kernel)
+    if kernel.ndim != 2 or kernel.shape[0] % 2 == 0 or kernel.shape[1] % 2 == 0:
+        raise ValueError(f"Kernel must be 2-D with odd dimensions, got shape {kernel.shape}")
+
+    original_shape = arr.shape
+    if arr.ndim == 2:
+        batch = arr[None, ..., None]
+    elif arr.ndim == 3:
+        batch = arr[None]
+    elif arr.ndim == 4:
+        batch = arr
+    else:
+        raise ValueError(f"Expected HxW, HxWxC or NxHxWxC array, got shape {arr.shape}")
+
+    factors = _separable_factors(kernel) if backend in ("auto", "separable") else None
+    if backend == "cv2" or (backend == "auto" and cv2 is not None and batch.shape[-1] <= 4):
+        if cv2 is None:
+            raise RuntimeError("OpenCV is not installed; choose another filter backend")
+        out = _correlate_cv2(batch, kernel)
+    elif factors is not None:
+        out = _correlate_separable(batch, *factors)
+    elif backend == "separable":
+        raise ValueError("Kernel is not separable (rank > 1)")
+    else:
+        out = _correlate_taps(batch, kernel)
+    return out.reshape(original_shape)
 
 
 def _find_perspective_coeffs(src_pts: Iterable[Tuple[float, float]], dst_pts: Iterable[Tuple[float, float]]):
@@ -208,67 +312,204 @@ def _find_perspective_coeffs(src_pts: Iterable[Tuple[float, float]], dst_pts: It
 # ---------------------------------------------------------------------------
 
 
+def load_pair_images(pair: LiveryPair, target_size: int = 512) -> Tuple[Image.Image, Image.Image]:
+    """Decode and resize the UV/view source images of a pair."""
+
+    uv_image = Image.open(pair.uv_path).convert("RGB").resize((target_size, target_size), Image.LANCZOS)
+    view_image = Image.open(pair.view_path).convert("RGB").resize((target_size, target_size), Image.LANCZOS)
+    return uv_image, view_image
+
+
+def augment_sample(uv_image: Image.Image, view_image: Image.Image,
+                   seed: int) -> Tuple[Image.Image, Image.Image, List[str]]:
+    """Apply one seeded random augmentation chain to a UV/view pair."""
+
+    local_rng = random.Random(seed)
+
+    uv_aug = uv_image.copy()
+    view_aug = view_image.copy()
+
+    transforms_applied = []
+
+    if local_rng.random() < 0.9:
+        uv_aug = random_hsv_jitter(uv_aug, local_rng)
+        view_aug = random_hsv_jitter(view_aug, local_rng)
+        transforms_applied.append("hsv_jitter")
+
+    if local_rng.random() < 0.8:
+        uv_aug = random_affine(uv_aug, local_rng)
+        view_aug = random_affine(view_aug, local_rng)
+        transforms_applied.append("affine")
+
+    if local_rng.random() < 0.7:
+        uv_aug = random_perspective(uv_aug, local_rng)
+        view_aug = random_perspective(view_aug, local_rng)
+        transforms_applied.append("perspective")
+
+    if local_rng.random() < 0.3:
+        uv_aug = blur_or_sharpen(uv_aug, local_rng)
+        view_aug = blur_or_sharpen(view_aug, local_rng)
+        transforms_applied.append("filter")
+
+    if local_rng.random() < 0.4:
+        uv_aug = gaussian_noise(uv_aug, local_rng)
+        view_aug = gaussian_noise(view_aug, local_rng)
+        transforms_applied.append("noise")
+
+    return uv_aug, view_aug, transforms_applied
+
+
+def _write_sample(pair: LiveryPair, output_dir: Path, idx: int, aug_idx: int, seed: int,
+                  uv_image: Image.Image, view_image: Image.Image) -> Dict:
+    uv_aug, view_aug, transforms_applied = augment_sample(uv_image, view_image, seed)
+
+    uv_aug_path = output_dir / f"uv_pair{idx:02d}_{aug_idx:03d}.png"
+    view_aug_path = output_dir / f"view_pair{idx:02d}_{aug_idx:03d}.png"
+
+    uv_aug.save(uv_aug_path, format="PNG")
+    view_aug.save(view_aug_path, format="PNG")
+
+    return {
+        "source_uv": str(pair.uv_path.resolve()),
+        "source_view": str(pair.view_path.resolve()),
+        "uv_aug": str(uv_aug_path.resolve()),
+        "view_aug": str(view_aug_path.resolve()),
+        "seed": seed,
+        "transforms": transforms_applied,
+        "pair_index": idx,
+        "aug_index": aug_idx,
+    }
+
+
 def augment_pair(pair: LiveryPair, output_dir: Path, idx: int, count: int, rng: random.Random,
                  target_size: int = 512) -> List[Dict]:
     """Generate augmented samples for a single UV/view pair."""
 
-    uv_image = Image.open(pair.uv_path).convert("RGB").resize((target_size, target_size), Image.LANCZOS)
-    view_image = Image.open(pair.view_path).convert("RGB").resize((target_size, target_size), Image.LANCZOS)
+    uv_image, view_image = load_pair_images(pair, target_size)
+    seeds = [rng.randint(0, 2**31 - 1) for _ in range(count)]
+    return [
+        _write_sample(pair, output_dir, idx, aug_idx, seed, uv_image, view_image)
+        for aug_idx, seed in enumerate(seeds)
+    ]
 
-    metadata_records: List[Dict] = []
-
-    for aug_idx in range(count):
-        seed = rng.randint(0, 2**31 - 1)
-        local_rng = random.Random(seed)
-
-        uv_aug = uv_image.copy()
-        view_aug = view_image.copy()
-
-        transforms_applied = []
-
-        if local_rng.random() < 0.9:
-            uv_aug = random_hsv_jitter(uv_aug, local_rng)
-            view_aug = random_hsv_jitter(view_aug, local_rng)
-            transforms_applied.append("hsv_jitter")
-
-        if local_rng.random() < 0.8:
-            uv_aug = random_affine(uv_aug, local_rng)
-            view_aug = random_affine(view_aug, local_rng)
-            transforms_applied.append("affine")
-
-        if local_rng.random() < 0.7:
-            uv_aug = random_perspective(uv_aug, local_rng)
-            view_aug = random_perspective(view_aug, local_rng)
-            transforms_applied.append("perspective")
-
-        if local_rng.random() < 0.3:
-            uv_aug = blur_or_sharpen(uv_aug, local_rng)
-            view_aug = blur_or_sharpen(view_aug, local_rng)
-            transforms_applied.append("filter")
-
-        if local_rng.random() < 0.4:
-            uv_aug = gaussian_noise(uv_aug, local_rng)
-            view_aug = gaussian_noise(view_aug, local_rng)
-            transforms_applied.append("noise")
-
-        uv_aug_path = output_dir / f"uv_pair{idx:02d}_{aug_idx:03d}.png"
-        view_aug_path = output_dir / f"view_pair{idx:02d}_{aug_idx:03d}.png"
-
-        uv_aug.save(uv_aug_path, format="PNG")
-        view_aug.save(view_aug_path, format="PNG")
-
-        metadata_records.append(
-            {
-                "source_uv": str(pair.uv_path.resolve()),
-                "source_view": str(pair.view_path.resolve()),
-                "uv_aug": str(uv_aug_path.resolve()),
-                "view_aug": str(view_aug_path.resolve()),
-                "seed": seed,
-                "transforms": transforms_applied,
-            }
-        )
 
-    return metadata_records
+# ---------------------------------------------------------------------------
+# On-the-fly augmentation
+# ---------------------------------------------------------------------------
+
+
+def item_seed(base_seed: int, epoch: int, index: int, *extra: int) -> int:
+    """Stable 31-bit seed for one (epoch, index[, ...]) draw, independent of workers."""
+
+    return int(np.random.SeedSequence([base_seed, epoch, index, *extra]).generate_state(1)[0] >> 1)
+
+
+class AugmentationSource:
+    """Source pairs decoded once and kept in memory for on-the-fly augmentation.
+
+    Replaces the materialised PNG dataset for training: every ``sample`` call
+    runs the same transform chain as ``augment_sample`` without touching disk.
+    """
+
+    def __init__(self, examples_dir: Path, target_size: int = 512):
+        self.pairs = list_livery_pairs(examples_dir)
+        self.target_size = target_size
+        self.images = [load_pair_images(pair, target_size) for pair in self.pairs]
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def sample(self, pair_idx: int, seed: int) -> Tuple[Image.Image, Image.Image, List[str]]:
+        """Return an augmented (uv, view, transforms) triple for one source pair."""
+
+        uv_image, view_image = self.images[pair_idx]
+        return augment_sample(uv_image, view_image, seed)
+
+
+# ---------------------------------------------------------------------------
+# Parallel generation
+# ---------------------------------------------------------------------------
+
+# Per-process cache of decoded source pairs, filled by the pool initializer.
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def _init_worker(pairs: List[LiveryPair], output_dir: Path, target_size: int) -> None:
+    # Workers already run in parallel; keep OpenCV from oversubscribing cores.
+    if cv2 is not None:
+        cv2.setNumThreads(1)
+    _WORKER_STATE["pairs"] = pairs
+    _WORKER_STATE["output_dir"] = output_dir
+    _WORKER_STATE["images"] = [load_pair_images(pair, target_size) for pair in pairs]
+
+
+def _augment_item(pair_idx: int, aug_idx: int, seed: int) -> Dict:
+    pairs: List[LiveryPair] = _WORKER_STATE["pairs"]  # type: ignore[assignment]
+    images = _WORKER_STATE["images"][pair_idx]  # type: ignore[index]
+    return _write_sample(pairs[pair_idx], _WORKER_STATE["output_dir"], pair_idx, aug_idx, seed, *images)
+
+
+def plan_items(num_pairs: int, count: int, seed: int) -> List[Tuple[int, int, int]]:
+    """Assign every (pair, augmentation) item its seed, in the legacy serial order."""
+
+    rng = random.Random(seed)
+    return [
+        (pair_idx, aug_idx, rng.randint(0, 2**31 - 1))
+        for pair_idx in range(num_pairs)
+        for aug_idx in range(count)
+    ]
+
+
+class MetadataWriter:
+    """Stream records to ``metadata.jsonl`` and snapshot ``metadata.json``."""
+
+    def __init__(self, output_dir: Path, snapshot_every: int = 32, resume: bool = False):
+        self.stream_path = output_dir / "metadata.jsonl"
+        self.metadata_path = output_dir / "metadata.json"
+        self.snapshot_every = snapshot_every
+        self.records: Dict[Tuple[int, int], Dict] = {}
+        if resume and self.stream_path.exists():
+            with self.stream_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue  # tolerate a torn final line after a crash
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if Path(record["uv_aug"]).exists() and Path(record["view_aug"]).exists():
+                        self.records[(record["pair_index"], record["aug_index"])] = record
+        mode = "a" if resume else "w"
+        self._stream = self.stream_path.open(mode, encoding="utf-8")
+        self._pending = 0
+
+    def done(self, pair_idx: int, aug_idx: int) -> bool:
+        return (pair_idx, aug_idx) in self.records
+
+    def add(self, record: Dict) -> None:
+        self.records[(record["pair_index"], record["aug_index"])] = record
+        self._stream.write(json.dumps(record) + "\n")
+        self._stream.flush()
+        self._pending += 1
+        if self._pending >= self.snapshot_every:
+            self.snapshot()
+
+    def snapshot(self) -> List[Dict]:
+        """Atomically rewrite metadata.json with all records in (pair, aug) order."""
+
+        ordered = [self.records[key] for key in sorted(self.records)]
+        tmp_path = self.metadata_path.with_suffix(".json.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(ordered, f, indent=2)
+        os.replace(tmp_path, self.metadata_path)
+        self._pending = 0
+        return ordered
+
+    def close(self) -> List[Dict]:
+        ordered = self.snapshot()
+        self._stream.close()
+        return ordered
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -303,6 +544,17 @@ def build_parser() -> argparse.ArgumentParser:
         default=1337,
         help="Base random seed for reproducibility.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes generating samples (0 = one per CPU core). Output is identical for any value.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip items already recorded in metadata.jsonl by an interrupted run.",
+    )
     return parser
 
 
@@ -310,8 +562,8 @@ def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
 
-    rng = random.Random(args.seed)
     args.output_dir.mkdir(parents=True, exist_ok=True)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
 
     print("\n=============================================")
     print("POC EXPERIMENT 3: Data Augmentation Pipeline")
@@ -320,31 +572,41 @@ def main() -> None:
     print(f"Output directory   : {args.output_dir}")
     print(f"Augmentations/pair : {args.augmentations_per_pair}")
     print(f"Target size        : {args.target_size}")
-    print(f"Base seed          : {args.seed}\n")
+    print(f"Base seed          : {args.seed}")
+    print(f"Workers            : {workers}\n")
 
     pairs = list_livery_pairs(args.examples_dir)
     print(f"Located {len(pairs)} source pairs. Generating augmented dataset...\n")
 
-    metadata: List[Dict] = []
-    for pair_idx, pair in enumerate(tqdm(pairs, desc="Pairs")):
-        records = augment_pair(
-            pair=pair,
-            output_dir=args.output_dir,
-            idx=pair_idx,
-            count=args.augmentations_per_pair,
-            rng=rng,
-            target_size=args.target_size,
-        )
-        metadata.extend(records)
-
-    metadata_path = args.output_dir / "metadata.json"
-    with metadata_path.open("w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2)
+    writer = MetadataWriter(args.output_dir, resume=args.resume)
+    items = [
+        item for item in plan_items(len(pairs), args.augmentations_per_pair, args.seed)
+        if not writer.done(item[0], item[1])
+    ]
+    if args.resume:
+        print(f"Resuming: {len(writer.records)} samples already present, {len(items)} remaining.\n")
+
+    try:
+        if workers == 1:
+            _init_worker(pairs, args.output_dir, args.target_size)
+            for item in tqdm(items, desc="Samples"):
+                writer.add(_augment_item(*item))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(pairs, args.output_dir, args.target_size),
+            ) as pool:
+                futures = [pool.submit(_augment_item, *item) for item in items]
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Samples"):
+                    writer.add(future.result())
+    finally:
+        metadata = writer.close()
 
     print("\n---------------------------------------------")
     print("Augmentation complete!")
     print(f"Total augmented samples: {len(metadata)}")
-    print(f"Metadata written to   : {metadata_path}")
+    print(f"Metadata written to   : {writer.metadata_path}")
     print("---------------------------------------------\n")
 
 
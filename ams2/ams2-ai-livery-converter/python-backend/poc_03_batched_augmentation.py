@@ -0,0 +1,281 @@
+"""Batched tensor-space version of the POC 3 augmentation chain.
+==============================================================
+``poc_03_augmentation`` augments one PIL image at a time, with several
+PIL <-> NumPy conversions and an HSV mode round trip per transform. This
+module applies the same chain (colour jitter, affine, perspective,
+blur/sharpen, noise) to a whole ``N x 3 x H x W`` float batch at once:
+
+* hue/saturation/brightness/contrast fold into one per-sample 3x3 colour
+  matrix plus bias (a single ``einsum``);
+* affine and perspective compose into one per-sample homography, resampled
+  with a single ``grid_sample`` call (one interpolation instead of two);
+* blur/sharpen is one grouped ``conv2d``.
+
+Parameters are drawn per sample from its seed with the same distributions
+and probabilities as ``augment_sample``, so a sample's augmentation does not
+depend on which batch it lands in. Collate functions below run the chain in
+the DataLoader while keeping UV/view images paired.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# ITU-R 601 luma, as used by PIL's "L" conversion (ImageEnhance degenerates).
+LUMA = (0.299, 0.587, 0.114)
+
+BLUR_KERNEL = torch.tensor([[1, 2, 1], [2, 4, 2], [1, 2, 1]], dtype=torch.float32) / 16.0
+SHARPEN_KERNEL = torch.tensor([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=torch.float32)
+IDENTITY_KERNEL = torch.tensor([[0, 0, 0], [0, 1, 0], [0, 0, 0]], dtype=torch.float32)
+
+
+# ---------------------------------------------------------------------------
+# Per-sample parameter draws
+# ---------------------------------------------------------------------------
+
+
+def _color_matrix(hue_shift: int, saturation: float, brightness: float) -> np.ndarray:
+    """RGB matrix for a hue rotation (``hue_shift``/256 turns), saturation and brightness."""
+
+    angle = 2.0 * math.pi * hue_shift / 256.0
+    c, s = math.cos(angle), math.sin(angle)
+    hue = np.array(
+        [
+            [0.213 + c * 0.787 - s * 0.213, 0.715 - c * 0.715 - s * 0.715, 0.072 - c * 0.072 + s * 0.928],
+            [0.213 - c * 0.213 + s * 0.143, 0.715 + c * 0.285 + s * 0.140, 0.072 - c * 0.072 - s * 0.283],
+            [0.213 - c * 0.213 - s * 0.787, 0.715 - c * 0.715 + s * 0.715, 0.072 + c * 0.928 + s * 0.072],
+        ]
+    )
+    luma = np.tile(np.asarray(LUMA), (3, 1))
+    sat = (1.0 - saturation) * luma + saturation * np.eye(3)
+    return brightness * sat @ hue
+
+
+def _affine_matrix(rng: random.Random, w: int, h: int) -> np.ndarray:
+    """Output -> input pixel mapping with the same draws as ``random_affine``."""
+
+    angle = rng.uniform(-5.0, 5.0)
+    shear_x = rng.uniform(-0.05, 0.05)
+    shear_y = rng.uniform(-0.05, 0.05)
+    translate_x = rng.uniform(-0.05, 0.05) * w
+    translate_y = rng.uniform(-0.05, 0.05) * h
+    return np.array(
+        [
+            [math.cos(math.radians(angle)), -math.sin(math.radians(angle + shear_x)), translate_x],
+            [math.sin(math.radians(angle + shear_y)), math.cos(math.radians(angle)), translate_y],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+
+
+def _perspective_corners(rng: random.Random, w: int, h: int) -> np.ndarray:
+    """Displaced corners with the same draws as ``random_perspective``."""
+
+    margin = 0.08
+    corners = []
+    for x, y in ((0, 0), (w, 0), (w, h), (0, h)):
+        corners.append((x + rng.uniform(-margin, margin) * w, y + rng.uniform(-margin, margin) * h))
+    return np.asarray(corners)
+
+
+def perspective_matrices(dst_corners: torch.Tensor, w: int, h: int) -> torch.Tensor:
+    """Batched ``_find_perspective_coeffs``: ``N x 4 x 2`` corners -> ``N x 3 x 3`` homographies.
+
+    Builds the same 8x8 linear system per sample and solves all of them with
+    one ``torch.linalg.solve``.
+    """
+
+    n = dst_corners.shape[0]
+    src = torch.tensor([[0, 0], [w, 0], [w, h], [0, h]], dtype=torch.float64).expand(n, 4, 2)
+    dst = dst_corners.to(torch.float64)
+    sx, sy = src[..., 0], src[..., 1]
+    dx, dy = dst[..., 0], dst[..., 1]
+    ones, zeros = torch.ones_like(sx), torch.zeros_like(sx)
+    rows_x = torch.stack([sx, sy, ones, zeros, zeros, zeros, -dx * sx, -dx * sy], dim=-1)
+    rows_y = torch.stack([zeros, zeros, zeros, sx, sy, ones, -dy * sx, -dy * sy], dim=-1)
+    matrix = torch.stack([rows_x, rows_y], dim=2).reshape(n, 8, 8)
+    vector = torch.stack([dx, dy], dim=2).reshape(n, 8)
+    coeffs = torch.linalg.solve(matrix, vector)
+    return torch.cat([coeffs, torch.ones(n, 1, dtype=torch.float64)], dim=1).reshape(n, 3, 3)
+
+
+def sample_params(seeds: Sequence[int], group: int, height: int, width: int) -> Dict[str, torch.Tensor]:
+    """Draw augmentation parameters for ``len(seeds) * group`` images.
+
+    The images of one group (e.g. a UV texture and its view) share the
+    per-stage apply decisions but get independent parameters, as in
+    ``augment_sample``. Skipped stages get identity parameters.
+    """
+
+    n = len(seeds) * group
+    color = np.tile(np.eye(3), (n, 1, 1))
+    contrast = np.ones(n)
+    affine = np.tile(np.eye(3), (n, 1, 1))
+    corners = np.tile(np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64), (n, 1, 1))
+    warp = np.zeros(n, dtype=bool)
+    kernel_ids = np.zeros(n, dtype=np.int64)  # 0 = identity, 1 = blur, 2 = sharpen
+    noise_scale = np.zeros(n)
+    noise_seed = np.zeros(n, dtype=np.int64)
+
+    for i, seed in enumerate(seeds):
+        rng = random.Random(seed)
+        members = range(i * group, (i + 1) * group)
+        if rng.random() < 0.9:
+            for j in members:
+                hue_shift = rng.randint(-10, 10)
+                saturation, brightness = rng.uniform(0.85, 1.15), rng.uniform(0.85, 1.15)
+                color[j] = _color_matrix(hue_shift, saturation, brightness)
+                contrast[j] = rng.uniform(0.85, 1.15)
+        if rng.random() < 0.8:
+            for j in members:
+                affine[j] = _affine_matrix(rng, width, height)
+                warp[j] = True
+        if rng.random() < 0.7:
+            for j in members:
+                corners[j] = _perspective_corners(rng, width, height)
+                warp[j] = True
+        if rng.random() < 0.3:
+            for j in members:
+                kernel_ids[j] = {"blur": 1, "sharpen": 2}.get(rng.choice(["blur", "sharpen", "none", "none"]), 0)
+        if rng.random() < 0.4:
+            for j in members:
+                noise_scale[j] = rng.normalvariate(0.0, 0.02)
+                noise_seed[j] = rng.getrandbits(63)
+
+    # Output pixel -> intermediate (perspective) -> input (affine).
+    homography = torch.from_numpy(affine) @ perspective_matrices(torch.from_numpy(corners), width, height)
+    return {
+        "color": torch.from_numpy(color).float(),
+        "contrast": torch.from_numpy(contrast).float(),
+        "homography": homography.float(),
+        "warp": torch.from_numpy(warp),
+        "kernel": torch.from_numpy(kernel_ids),
+        "noise_scale": torch.from_numpy(noise_scale).float(),
+        "noise_seed": torch.from_numpy(noise_seed),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Batched transforms
+# ---------------------------------------------------------------------------
+
+
+def color_jitter(images: torch.Tensor, color: torch.Tensor, contrast: torch.Tensor) -> torch.Tensor:
+    """Fused hue/saturation/brightness matrix plus PIL-style contrast around mean luma."""
+
+    luma = torch.tensor(LUMA, dtype=images.dtype, device=images.device)
+    color = color.to(images)
+    contrast = contrast.to(images)[:, None]
+    # Mean luma of the colour-transformed image, computed from channel means.
+    mean_luma = torch.einsum("c,ncd,nd->n", luma, color, images.mean(dim=(2, 3)))[:, None]
+    out = torch.einsum("ncd,ndhw->nchw", color * contrast[..., None], images)
+    return (out + ((1.0 - contrast) * mean_luma)[..., None, None]).clamp_(0.0, 1.0)
+
+
+def warp_homography(images: torch.Tensor, homography: torch.Tensor, mode: str = "bilinear") -> torch.Tensor:
+    """Resample with per-sample output->input pixel homographies; outside fills black."""
+
+    n, _, h, w = images.shape
+    ys, xs = torch.meshgrid(
+        torch.arange(h, dtype=images.dtype, device=images.device) + 0.5,
+        torch.arange(w, dtype=images.dtype, device=images.device) + 0.5,
+        indexing="ij",
+    )
+    points = torch.stack([xs, ys, torch.ones_like(xs)], dim=-1).reshape(1, -1, 3)
+    mapped = points @ homography.to(images).transpose(1, 2)
+    uv = mapped[..., :2] / mapped[..., 2:3]
+    scale = torch.tensor([2.0 / w, 2.0 / h], dtype=images.dtype, device=images.device)
+    grid = (uv * scale - 1.0).reshape(n, h, w, 2)
+    return grid_sample_images(images, grid, mode)
+
+
+def grid_sample_images(images: torch.Tensor, grid: torch.Tensor, mode: str) -> torch.Tensor:
+    return F.grid_sample(images, grid, mode=mode, padding_mode="zeros", align_corners=False).clamp_(0.0, 1.0)
+
+
+def filter_images(images: torch.Tensor, kernel_ids: torch.Tensor) -> torch.Tensor:
+    """Per-image 3x3 blur/sharpen as one grouped convolution with reflect padding."""
+
+    n, c, h, w = images.shape
+    bank = torch.stack([IDENTITY_KERNEL, BLUR_KERNEL, SHARPEN_KERNEL]).to(images)
+    weight = bank[kernel_ids.to(images.device)].repeat_interleave(c, dim=0)[:, None]
+    padded = F.pad(images.reshape(1, n * c, h, w), (1, 1, 1, 1), mode="reflect")
+    return F.conv2d(padded, weight, groups=n * c).reshape(n, c, h, w).clamp_(0.0, 1.0)
+
+
+def add_noise(images: torch.Tensor, scale: torch.Tensor, seeds: torch.Tensor) -> torch.Tensor:
+    """Per-image Gaussian noise, each drawn from its own generator for reproducibility."""
+
+    noise = torch.stack(
+        [
+            torch.randn(images.shape[1:], generator=torch.Generator().manual_seed(int(seed)))
+            for seed in seeds
+        ]
+    ).to(images)
+    return (images + scale.to(images)[:, None, None, None] * noise).clamp_(0.0, 1.0)
+
+
+def apply_params(images: torch.Tensor, params: Dict[str, torch.Tensor], mode: str = "bilinear") -> torch.Tensor:
+    """Run the full chain on ``N x 3 x H x W`` images in [0, 1]; stages skip untouched images."""
+
+    out = color_jitter(images, params["color"], params["contrast"])
+
+    warp = params["warp"].nonzero().flatten()
+    if len(warp):
+        out[warp] = warp_homography(out[warp], params["homography"][warp], mode)
+
+    filtered = (params["kernel"] != 0).nonzero().flatten()
+    if len(filtered):
+        out[filtered] = filter_images(out[filtered], params["kernel"][filtered])
+
+    noisy = (params["noise_scale"] != 0).nonzero().flatten()
+    if len(noisy):
+        out[noisy] = add_noise(out[noisy], params["noise_scale"][noisy], params["noise_seed"][noisy])
+    return out
+
+
+def augment_batch(images: torch.Tensor, seeds: Sequence[int], group: int = 1,
+                  mode: str = "bilinear") -> torch.Tensor:
+    """Augment ``len(seeds) * group`` images; consecutive ``group`` images form one sample."""
+
+    params = sample_params(seeds, group, images.shape[2], images.shape[3])
+    return apply_params(images, params, mode)
+
+
+def normalize(images: torch.Tensor) -> torch.Tensor:
+    """Map [0, 1] to [-1, 1] (``T.Normalize(0.5, 0.5)``)."""
+
+    return images.mul(2.0).sub_(1.0)
+
+
+# ---------------------------------------------------------------------------
+# DataLoader integration
+# ---------------------------------------------------------------------------
+
+
+class PairedAugmentCollate:
+    """``collate_fn`` that stacks raw UV/view pairs and augments them in one pass.
+
+    Items are dicts with ``uv``/``view`` float tensors in [0, 1] and an int
+    ``seed``. Each pair shares its apply decisions; outputs are normalised to
+    [-1, 1] like the PIL pipeline.
+    """
+
+    def __init__(self, keys: Tuple[str, ...] = ("uv", "view"), mode: str = "bilinear"):
+        self.keys = keys
+        self.mode = mode
+
+    def __call__(self, items: List[Dict]) -> Dict[str, torch.Tensor]:
+        seeds = [int(item["seed"]) for item in items]
+        group = len(self.keys)
+        # Interleave as [uv0, view0, uv1, view1, ...] so pairs stay adjacent.
+        images = torch.stack([item[key] for item in items for key in self.keys])
+        out = normalize(augment_batch(images, seeds, group, self.mode))
+        out = out.reshape(len(items), group, *out.shape[1:])
+        return {key: out[:, k] for k, key in enumerate(self.keys)}
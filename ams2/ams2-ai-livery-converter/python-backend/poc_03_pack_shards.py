@@ -0,0 +1,237 @@
+"""Pack a POC 3 augmented dataset into memory-mappable shards.
+=============================================================
+The PNG dataset is hundreds of small files plus a ``metadata.json`` of
+absolute paths, which is slow to list and decode and breaks once the
+directory moves. This packs it into a few ``.npy`` shards of pre-resized
+uint8 pixels that training can memory-map and slice without decoding:
+
+    <output>/manifest.json             image size, shard files, source names
+    <output>/index.npy                 int32 [shard, row, source] per sample
+    <output>/pairs_00000.npy ...       uint8 N x 2 x H x W x 3 (uv_aug, view_aug)
+    <output>/sources.npy               uint8 S x H x W x 3 source UV textures
+
+All paths in the manifest are relative to the shard directory.
+
+Usage
+-----
+python poc_03_pack_shards.py \
+    --dataset poc_results/augmented_dataset_ginetta \
+    --examples-dir "../examples/gt4_skins/Automobilista 2/Vehicles/Textures/CustomLiveries/Overrides/ginetta_g55_gt4_2/GIN" \
+    --output-dir poc_results/augmented_dataset_ginetta_shards \
+    --image-size 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path, PureWindowsPath
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+from tqdm import tqdm
+
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.npy"
+SOURCES_NAME = "sources.npy"
+FORMAT_VERSION = 1
+
+
+# ---------------------------------------------------------------------------
+# Packing
+# ---------------------------------------------------------------------------
+
+
+def _basename(path: str) -> str:
+    # metadata.json may have been written on Windows.
+    return PureWindowsPath(path).name if "\\" in path else Path(path).name
+
+
+def resolve_path(recorded: str, search_dirs: Sequence[Optional[Path]]) -> Path:
+    """Return the recorded path if it exists, else the same file name in ``search_dirs``."""
+
+    path = Path(recorded)
+    if path.exists():
+        return path
+    name = _basename(recorded)
+    for directory in search_dirs:
+        if directory is not None and (directory / name).exists():
+            return directory / name
+    raise FileNotFoundError(f"Cannot locate {recorded!r}; pass --examples-dir if the sources moved.")
+
+
+def _load_rgb(path: Path, image_size: int) -> np.ndarray:
+    # Same resize as the PNG datasets' T.Resize(..., BICUBIC) on PIL images.
+    image = Image.open(path).convert("RGB").resize((image_size, image_size), Image.BICUBIC)
+    return np.asarray(image, dtype=np.uint8)
+
+
+def pack_dataset(dataset: Path, output_dir: Path, image_size: int = 256, shard_size: int = 256,
+                 examples_dir: Optional[Path] = None) -> Dict:
+    """Convert ``metadata.json`` + PNGs into shards; returns the manifest."""
+
+    metadata_path = dataset / "metadata.json" if dataset.is_dir() else dataset
+    dataset_dir = metadata_path.parent
+    with metadata_path.open("r", encoding="utf-8") as f:
+        records: List[Dict] = json.load(f)
+    if not records:
+        raise ValueError(f"{metadata_path} contains no records")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    source_ids: Dict[str, int] = {}
+    source_paths: List[Path] = []
+    for rec in records:
+        if rec["source_uv"] not in source_ids:
+            source_ids[rec["source_uv"]] = len(source_paths)
+            source_paths.append(resolve_path(rec["source_uv"], [examples_dir, dataset_dir]))
+
+    sources = np.lib.format.open_memmap(
+        output_dir / SOURCES_NAME, mode="w+", dtype=np.uint8,
+        shape=(len(source_paths), image_size, image_size, 3),
+    )
+    for i, path in enumerate(source_paths):
+        sources[i] = _load_rgb(path, image_size)
+    sources.flush()
+    del sources
+
+    index = np.zeros((len(records), 3), dtype=np.int32)
+    shards = []
+    for shard_id, start in enumerate(range(0, len(records), shard_size)):
+        chunk = records[start:start + shard_size]
+        name = f"pairs_{shard_id:05d}.npy"
+        pairs = np.lib.format.open_memmap(
+            output_dir / name, mode="w+", dtype=np.uint8,
+            shape=(len(chunk), 2, image_size, image_size, 3),
+        )
+        for row, rec in enumerate(tqdm(chunk, desc=name, leave=False)):
+            pairs[row, 0] = _load_rgb(resolve_path(rec["uv_aug"], [dataset_dir]), image_size)
+            pairs[row, 1] = _load_rgb(resolve_path(rec["view_aug"], [dataset_dir]), image_size)
+            index[start + row] = (shard_id, row, source_ids[rec["source_uv"]])
+        pairs.flush()
+        del pairs
+        shards.append({"file": name, "count": len(chunk)})
+
+    np.save(output_dir / INDEX_NAME, index)
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "image_size": image_size,
+        "num_samples": len(records),
+        "shards": shards,
+        "sources": [_basename(key) for key in source_ids],
+        "seeds": [rec.get("seed") for rec in records],
+        "transforms": [rec.get("transforms", []) for rec in records],
+    }
+    with (output_dir / MANIFEST_NAME).open("w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+def is_sharded(dataset: Path) -> bool:
+    return dataset.is_dir() and (dataset / MANIFEST_NAME).exists()
+
+
+class ShardReader:
+    """Zero-copy access to a packed dataset.
+
+    Shards are memory-mapped lazily in each process (memmaps are not
+    pickled), so the reader is safe to hand to DataLoader workers.
+    """
+
+    def __init__(self, shard_dir: Path):
+        self.shard_dir = shard_dir
+        with (shard_dir / MANIFEST_NAME).open("r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported shard format in {shard_dir}: {self.manifest.get('version')}")
+        self.image_size: int = self.manifest["image_size"]
+        self.index = np.load(shard_dir / INDEX_NAME)
+        self._pairs: Optional[List[np.ndarray]] = None
+        self._sources: Optional[np.ndarray] = None
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state["_pairs"] = None
+        state["_sources"] = None
+        return state
+
+    def _open(self) -> None:
+        self._pairs = [
+            np.load(self.shard_dir / shard["file"], mmap_mode="r") for shard in self.manifest["shards"]
+        ]
+        self._sources = np.load(self.shard_dir / SOURCES_NAME, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def pair(self, idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(uv_aug, view_aug) as read-only H x W x 3 uint8 views into the shard."""
+
+        if self._pairs is None:
+            self._open()
+        shard, row, _ = self.index[idx]
+        sample = self._pairs[shard][row]
+        return sample[0], sample[1]
+
+    def source(self, idx: int) -> np.ndarray:
+        """Source UV texture for sample ``idx`` (H x W x 3 uint8 view)."""
+
+        if self._sources is None:
+            self._open()
+        return self._sources[self.index[idx, 2]]
+
+    def source_ids(self) -> np.ndarray:
+        return self.index[:, 2]
+
+
+def normalized_tensor(pixels: np.ndarray) -> torch.Tensor:
+    """H x W x 3 uint8 -> 3 x H x W in [-1, 1] (ToTensor + Normalize(0.5, 0.5)).
+
+    Turns ``ShardReader`` arrays into model inputs. torch is imported here so
+    that packing shards does not need it.
+    """
+    import torch
+
+    return torch.from_numpy(pixels.transpose(2, 0, 1).astype(np.float32)).div_(127.5).sub_(1.0)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pack an augmented dataset into memory-mappable shards")
+    parser.add_argument("--dataset", type=Path, default=Path("poc_results/augmented_dataset_ginetta"),
+                        help="Augmented dataset directory or metadata.json file")
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help="Shard directory (defaults to <dataset>_shards)")
+    parser.add_argument("--examples-dir", type=Path, default=None,
+                        help="Where to find source UV textures if their recorded paths no longer exist")
+    parser.add_argument("--image-size", type=int, default=256,
+                        help="Resolution stored in the shards (match training --image-size)")
+    parser.add_argument("--shard-size", type=int, default=256, help="Samples per shard file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    dataset_dir = args.dataset if args.dataset.is_dir() else args.dataset.parent
+    output_dir = args.output_dir or dataset_dir.with_name(dataset_dir.name + "_shards")
+
+    manifest = pack_dataset(args.dataset, output_dir, args.image_size, args.shard_size, args.examples_dir)
+
+    total_bytes = sum(path.stat().st_size for path in output_dir.glob("*.npy"))
+    print(f"Packed {manifest['num_samples']} samples from {len(manifest['sources'])} sources "
+          f"into {len(manifest['shards'])} shards ({total_bytes / 1e6:.1f} MB) at {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ import argparse
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -21,6 +21,14 @@ from tqdm import tqdm
 from PIL import Image
 from torch.utils.data import DataLoader, Dataset, random_split
 
+from poc_03_augmentation import AugmentationSource, item_seed
+from poc_03_batched_augmentation import PairedAugmentCollate
+from poc_03_pack_shards import ShardReader, is_sharded, normalized_tensor
+from loader_utils import EpochRandomSampler, SharedEpoch, loader_options
+from mixed_precision import TrainPrecision, add_precision_args
+from model_compile import add_compile_args, compile_models
+from tensor_cache import TensorCache
+
 try:
     from pytorch_msssim import ssim as ms_ssim
 except ImportError:
@@ -44,9 +52,13 @@ class AugmentedSample:
 
 
 class AugmentedLiveryDataset(Dataset):
-    """Loads augmented UV/view image pairs."""
+    """Loads augmented UV/view image pairs.
+
+    Decoded, resized and normalised tensors are kept in a per-process
+    ``TensorCache`` capped at ``cache_bytes`` (0 disables it).
+    """
 
-    def __init__(self, metadata_path: Path, image_size: int = 256):
+    def __init__(self, metadata_path: Path, image_size: int = 256, cache_bytes: int = 0):
         metadata = metadata_path
         if metadata.is_dir():
             metadata = metadata / "metadata.json"
@@ -68,14 +80,88 @@ class AugmentedLiveryDataset(Dataset):
                 T.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5]),
             ]
         )
+        self.cache = TensorCache(cache_bytes)
 
     def __len__(self) -> int:
         return len(self.samples)
 
+    def _load(self, path: Path) -> torch.Tensor:
+        key = (str(path), self.image_size, "mean=0.5,std=0.5")
+        return self.cache.get_or_create(key, lambda: self.transform(Image.open(path).convert("RGB")))
+
     def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
         sample = self.samples[idx]
-        uv = Image.open(sample.uv_path).convert("RGB")
-        view = Image.open(sample.view_path).convert("RGB")
+        return {"uv": self._load(sample.uv_path), "view": self._load(sample.view_path)}
+
+
+class ShardedLiveryDataset(Dataset):
+    """Reads UV/view pairs from ``poc_03_pack_shards`` output by slicing memory-mapped shards."""
+
+    def __init__(self, shard_dir: Path, image_size: int = 256):
+        self.reader = ShardReader(shard_dir)
+        if self.reader.image_size != image_size:
+            raise ValueError(
+                f"{shard_dir} was packed at {self.reader.image_size}px; "
+                f"repack with --image-size {image_size}"
+            )
+        self.image_size = image_size
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        uv, view = self.reader.pair(idx)
+        return {"uv": normalized_tensor(uv), "view": normalized_tensor(view)}
+
+
+class OnTheFlyLiveryDataset(Dataset):
+    """Augments the in-memory source pairs per ``__getitem__`` instead of reading PNGs.
+
+    Each sample is seeded from (seed, epoch, index), so a given epoch is
+    reproducible for any number of loader workers while every epoch sees
+    fresh augmentations. Call ``set_epoch`` before iterating; the epoch
+    lives in shared memory so persistent workers see it too.
+
+    With ``batched_augment`` the dataset only returns the resized source
+    tensors plus the sample seed; ``PairedAugmentCollate`` then augments
+    the whole batch in tensor space.
+    """
+
+    def __init__(self, source: AugmentationSource, length: int, image_size: int = 256,
+                 seed: int = 1337, epoch: int = 0, batched_augment: bool = False):
+        self.source = source
+        self.length = length
+        self.image_size = image_size
+        self.seed = seed
+        self.epoch = SharedEpoch(epoch)
+        self.batched_augment = batched_augment
+
+        self.transform = T.Compose(
+            [
+                T.Resize((image_size, image_size), interpolation=Image.BICUBIC),
+                T.ToTensor(),
+                T.Normalize(mean=[0.5, 0.5, 0.5], std=[0.5, 0.5, 0.5]),
+            ]
+        )
+
+        self.raw: List[Dict[str, torch.Tensor]] = []
+        if batched_augment:
+            resize = T.Compose(
+                [T.Resize((image_size, image_size), interpolation=Image.BICUBIC), T.ToTensor()]
+            )
+            self.raw = [{"uv": resize(uv), "view": resize(view)} for uv, view in source.images]
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch.set(epoch)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        seed = item_seed(self.seed, self.epoch.get(), idx)
+        if self.batched_augment:
+            return {**self.raw[idx % len(self.source)], "seed": seed}
+        uv, view, _ = self.source.sample(idx % len(self.source), seed)
         return {"uv": self.transform(uv), "view": self.transform(view)}
 
 
@@ -154,33 +240,35 @@ def compute_lpips(img1: torch.Tensor, img2: torch.Tensor, net) -> float:
 
 def train_epoch(model_uv: UVPredictor, model_renderer: Renderer, loader: DataLoader,
                 optim_uv: torch.optim.Optimizer, optim_renderer: torch.optim.Optimizer,
-                device: torch.device) -> Dict[str, float]:
+                device: torch.device, precision: Optional[TrainPrecision] = None) -> Dict[str, float]:
     model_uv.train()
     model_renderer.train()
+    precision = precision or TrainPrecision(device)
 
     epoch_loss = {"cycle": 0.0, "uv_recon": 0.0, "direct": 0.0, "total": 0.0}
 
     for batch in tqdm(loader, desc="Train", leave=False):
-        uv_real = batch["uv"].to(device)
-        view_real = batch["view"].to(device)
+        uv_real = precision.to_device(batch["uv"])
+        view_real = precision.to_device(batch["view"])
 
-        uv_pred = model_uv(view_real)
-        view_recon = model_renderer(uv_pred)
-        L_cycle = F.l1_loss(view_recon, view_real)
+        with precision.autocast():
+            uv_pred = model_uv(view_real)
+            view_recon = model_renderer(uv_pred)
+            view_from_uv = model_renderer(uv_real)
+            uv_recon = model_uv(view_from_uv)
 
-        view_from_uv = model_renderer(uv_real)
-        uv_recon = model_uv(view_from_uv)
+        # Losses in fp32 whatever the autocast dtype.
+        uv_pred, view_recon, uv_recon = uv_pred.float(), view_recon.float(), uv_recon.float()
+        L_cycle = F.l1_loss(view_recon, view_real)
         L_uv_recon = F.l1_loss(uv_recon, uv_real)
-
         L_direct = F.l1_loss(uv_pred, uv_real)
 
         loss = 0.3 * L_cycle + 0.3 * L_uv_recon + 0.4 * L_direct
 
         optim_uv.zero_grad()
         optim_renderer.zero_grad()
-        loss.backward()
-        optim_uv.step()
-        optim_renderer.step()
+        precision.backward(loss)
+        precision.step(optim_uv, optim_renderer)
 
         epoch_loss["cycle"] += L_cycle.item()
         epoch_loss["uv_recon"] += L_uv_recon.item()
@@ -231,13 +319,30 @@ def evaluate(model_uv: UVPredictor, model_renderer: Renderer, loader: DataLoader
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Cycle-consistency training on augmented dataset")
     parser.add_argument("--dataset", type=Path, default=Path("poc_results/augmented_dataset_ginetta"),
-                        help="Path to augmented dataset directory or metadata.json file")
+                        help="Augmented dataset directory, metadata.json file, or packed shard directory")
     parser.add_argument("--epochs", type=int, default=60)
     parser.add_argument("--batch-size", type=int, default=8)
     parser.add_argument("--lr", type=float, default=2e-4)
     parser.add_argument("--image-size", type=int, default=256)
     parser.add_argument("--val-split", type=float, default=0.1)
     parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--num-workers", type=int, default=0)
+    parser.add_argument("--prefetch-factor", type=int, default=2,
+                        help="Batches prefetched per loader worker")
+    parser.add_argument("--no-persistent-workers", action="store_true",
+                        help="Re-create loader workers every epoch (drops their tensor caches)")
+    parser.add_argument("--cache-mb", type=int, default=1024,
+                        help="Per-process cap for cached preprocessed tensors (0 disables the cache)")
+    parser.add_argument("--examples-dir", type=Path, default=None,
+                        help="Augment these source pairs on the fly instead of reading --dataset PNGs")
+    parser.add_argument("--samples-per-epoch", type=int, default=512,
+                        help="Training samples drawn per epoch in --examples-dir mode")
+    parser.add_argument("--augment-size", type=int, default=512,
+                        help="Resolution the source pairs are augmented at in --examples-dir mode")
+    parser.add_argument("--batched-augment", action="store_true",
+                        help="With --examples-dir, augment whole batches in tensor space in the collate step")
+    add_precision_args(parser)
+    add_compile_args(parser)
     return parser.parse_args()
 
 
@@ -248,16 +353,48 @@ def main() -> None:
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Using device: {device}")
 
-    dataset = AugmentedLiveryDataset(args.dataset, image_size=args.image_size)
-    val_size = max(1, int(len(dataset) * args.val_split))
-    train_size = len(dataset) - val_size
-    train_set, val_set = random_split(dataset, [train_size, val_size])
-
-    train_loader = DataLoader(train_set, batch_size=args.batch_size, shuffle=True, num_workers=0)
-    val_loader = DataLoader(val_set, batch_size=args.batch_size, shuffle=False, num_workers=0)
-
-    model_uv = UVPredictor().to(device)
-    model_renderer = Renderer().to(device)
+    collate_fn = None
+    if args.examples_dir is not None:
+        source = AugmentationSource(args.examples_dir, target_size=args.augment_size)
+        val_size = max(1, int(args.samples_per_epoch * args.val_split))
+        train_set = OnTheFlyLiveryDataset(source, args.samples_per_epoch, args.image_size, args.seed,
+                                          batched_augment=args.batched_augment)
+        # Separate seed stream, never advanced, so validation is fixed across epochs.
+        val_set = OnTheFlyLiveryDataset(source, val_size, args.image_size, args.seed + 1,
+                                        batched_augment=args.batched_augment)
+        if args.batched_augment:
+            collate_fn = PairedAugmentCollate()
+    else:
+        if is_sharded(args.dataset):
+            dataset = ShardedLiveryDataset(args.dataset, image_size=args.image_size)
+        else:
+            dataset = AugmentedLiveryDataset(args.dataset, image_size=args.image_size,
+                                             cache_bytes=args.cache_mb * 1024 * 1024)
+        val_size = max(1, int(len(dataset) * args.val_split))
+        train_size = len(dataset) - val_size
+        train_set, val_set = random_split(dataset, [train_size, val_size])
+
+    options = loader_options(
+        args.num_workers,
+        args.seed,
+        persistent_workers=not args.no_persistent_workers,
+        prefetch_factor=args.prefetch_factor,
+        pin_memory=device.type == "cuda",
+    )
+    train_sampler = EpochRandomSampler(len(train_set), seed=args.seed)
+    train_loader = DataLoader(train_set, batch_size=args.batch_size, sampler=train_sampler,
+                              collate_fn=collate_fn, **options)
+    val_loader = DataLoader(val_set, batch_size=args.batch_size, shuffle=False,
+                            collate_fn=collate_fn, **options)
+
+    precision = TrainPrecision.from_args(args, device)
+    print(f"Precision: {precision.describe()}")
+    model_uv = precision.prepare_model(UVPredictor())
+    model_renderer = precision.prepare_model(Renderer())
+    if args.compile:
+        example = precision.to_device(torch.zeros(args.batch_size, 3, args.image_size, args.image_size))
+        compiled = compile_models([model_uv, model_renderer], example, args.compile_cache)
+        print(f"Compiled models with {compiled['backend']} in {compiled['setup_seconds']:.1f}s")
 
     optim_uv = torch.optim.Adam(model_uv.parameters(), lr=args.lr, betas=(0.5, 0.999))
     optim_renderer = torch.optim.Adam(model_renderer.parameters(), lr=args.lr, betas=(0.5, 0.999))
@@ -270,7 +407,11 @@ def main() -> None:
     best_state = None
 
     for epoch in range(1, args.epochs + 1):
-        train_metrics = train_epoch(model_uv, model_renderer, train_loader, optim_uv, optim_renderer, device)
+        train_sampler.set_epoch(epoch)
+        if isinstance(train_set, OnTheFlyLiveryDataset):
+            train_set.set_epoch(epoch)
+        train_metrics = train_epoch(model_uv, model_renderer, train_loader, optim_uv, optim_renderer, device,
+                                    precision)
         val_metrics = evaluate(model_uv, model_renderer, val_loader, device, lpips_net)
 
         history["train"].append(train_metrics)
@@ -9,6 +9,10 @@ Usage example (run from repository root):
 
     python poc_05_autorunner.py --max-hours 5 --run-tag overnight_20251111
 
+    # Two independent branches side by side, 8 pinned cores each
+    python poc_05_autorunner.py --start direct_decay_probe directsteady_full \
+        --parallel 2 --threads-per-job 8
+
 Key ideas:
 - Start with short 20-epoch probe runs.
 - Promote to a longer 40-epoch schedule only when SSIM(UV) and LPIPS(View)
@@ -16,6 +20,17 @@ Key ideas:
 - Update the remaining-time estimate using the measured runtime of each
   completed training.
 - Stop early if the remaining time cannot accommodate the next queued run.
+- With ``--parallel N``, up to N templates run at once, each pinned to its
+  own core set with matching OMP/MKL thread counts. Each child's output
+  goes to ``<run_dir>/<template>.log``, with epoch lines echoed live.
+  Follow-up templates are queued as soon as their parent finishes.
+- ``--prune median|halving`` watches each run's per-epoch validation
+  metrics, streamed via ``--metrics-stream``. Runs that trail the others
+  are stopped early, and their slot and budget pass to the next queued
+  template (a pruned probe follows its ``failure_next``).
+- Sample grids for finished runs are rendered in this process: the
+  dataset and networks are built once, and each checkpoint only costs a
+  weight load and one batched forward, with PNG encoding in the background.
 
 The script expects the existing virtual environment dependencies to be
 installed and will invoke `poc_05_training_multiview.py` directly.
@@ -25,19 +40,21 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import shutil
+import statistics
 import subprocess
 import sys
+import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import torch
-
 TRAIN_SCRIPT = Path(__file__).with_name("poc_05_training_multiview.py")
-VIS_SCRIPT = Path(__file__).with_name("poc_05_visualize_predictions.py")
 POC_RESULTS = Path("poc_results")
+DATASET = POC_RESULTS / "augmented_dataset_ginetta"
+METRICS_SUFFIX = ".metrics.json"  # sidecar written next to every checkpoint by poc_05 training
 
 
 @dataclass
@@ -74,7 +91,7 @@ class ExperimentTemplate:
             sys.executable,
             str(TRAIN_SCRIPT),
             "--dataset",
-            "poc_results/augmented_dataset_ginetta",
+            str(DATASET),
             "--epochs",
             str(self.epochs),
             "--batch-size",
@@ -102,20 +119,196 @@ class ExperimentTemplate:
         return self.success_next
 
 
-def run_subprocess(cmd: List[str]) -> Tuple[int, float]:
-    start = time.time()
-    print(f"\n[autorunner] Executing: {' '.join(cmd)}")
-    result = subprocess.run(cmd, check=False)
-    duration = time.time() - start
-    return result.returncode, duration
+# Which direction is better for each validation metric the pruner can watch.
+METRIC_GOALS = {
+    "ssim_uv": "max",
+    "ssim_view": "max",
+    "lpips_view": "min",
+    "total": "min",
+    "cycle": "min",
+    "uv_recon": "min",
+    "direct": "min",
+    "cross": "min",
+}
+
+
+@dataclass
+class PruningPolicy:
+    """Stops runs whose validation curve trails the other runs of this session.
+
+    ``median``: after ``grace_epochs``, stop a run whose best value so far
+    is worse than the median of the other runs' best-so-far at the same
+    epoch (needs ``min_peers`` such runs).
+    ``halving``: asynchronous successive halving with rungs at
+    ``grace_epochs * eta**k``. A run reaching a rung continues only if it is
+    in the top ``1/eta`` of all runs recorded there (once ``eta`` have).
+    """
+
+    rule: str
+    metric: str
+    grace_epochs: int = 3
+    min_peers: int = 2
+    eta: int = 3
+    curves: Dict[str, Dict[int, float]] = field(default_factory=dict)
+
+    def record(self, run: str, epoch: int, value: float) -> None:
+        """Store the best-so-far score (higher is better) for ``run`` at ``epoch``."""
+
+        if value != value:  # NaN, e.g. SSIM without pytorch_msssim
+            return
+        score = value if METRIC_GOALS.get(self.metric, "min") == "max" else -value
+        curve = self.curves.setdefault(run, {})
+        previous = [curve[e] for e in curve if e < epoch]
+        curve[epoch] = max([score] + previous)
+
+    def should_prune(self, run: str, epoch: int) -> Optional[str]:
+        score = self.curves.get(run, {}).get(epoch)
+        if score is None or epoch < self.grace_epochs:
+            return None
+        if self.rule == "median":
+            peers = [curve[epoch] for name, curve in self.curves.items() if name != run and epoch in curve]
+            if len(peers) < self.min_peers:
+                return None
+            median = statistics.median(peers)
+            if score < median:
+                return f"best {self.metric} trails the median of {len(peers)} runs at epoch {epoch}"
+        elif self.rule == "halving":
+            rung = self.grace_epochs
+            while rung < epoch:
+                rung *= self.eta
+            if rung != epoch:
+                return None
+            scores = sorted((curve[epoch] for curve in self.curves.values() if epoch in curve), reverse=True)
+            if len(scores) < self.eta:
+                return None
+            cutoff = scores[max(1, len(scores) // self.eta) - 1]
+            if score < cutoff:
+                return f"{self.metric} outside the top 1/{self.eta} of {len(scores)} runs at rung epoch {epoch}"
+        return None
+
+
+def available_cores() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_slots(parallel: int, threads_per_job: int) -> List[List[int]]:
+    """Disjoint core sets, one per concurrent job (wrapping if oversubscribed)."""
+
+    cores = available_cores()
+    if parallel * threads_per_job > len(cores):
+        print(
+            f"[autorunner] {parallel} jobs x {threads_per_job} threads exceeds {len(cores)} cores; "
+            "core sets will overlap"
+        )
+    return [
+        [cores[(slot * threads_per_job + k) % len(cores)] for k in range(threads_per_job)]
+        for slot in range(parallel)
+    ]
+
+
+@dataclass
+class RunningJob:
+    template: ExperimentTemplate
+    process: subprocess.Popen
+    checkpoint_path: Path
+    slot: int
+    cores: List[int]
+    started: float
+    log_path: Path
+    reader: threading.Thread
+    metrics_stream: Path
+    stream_offset: int = 0
+    last_epoch: Optional[Dict] = None
+    pruned: Optional[str] = None
+
+    def read_new_epochs(self) -> List[Dict]:
+        """Per-epoch records appended to the child's ``--metrics-stream`` since the last call."""
+
+        if not self.metrics_stream.exists():
+            return []
+        with self.metrics_stream.open("rb") as f:
+            f.seek(self.stream_offset)
+            chunk = f.read()
+        complete = chunk[: chunk.rfind(b"\n") + 1]  # leave a half-written line for next time
+        self.stream_offset += len(complete)
+        records = [json.loads(line) for line in complete.decode("utf-8").splitlines() if line.strip()]
+        if records:
+            self.last_epoch = records[-1]
+        return records
+
+
+def _stream_output(job_name: str, stream, log_path: Path) -> None:
+    """Copy a child's output to its log, echoing epoch/checkpoint lines to the console."""
+
+    with log_path.open("w", encoding="utf-8") as log:
+        for line in stream:
+            log.write(line)
+            log.flush()
+            visible = line.rsplit("\r", 1)[-1].strip()  # drop tqdm redraws
+            if visible.startswith(("Epoch", "Saved", "Resumed", "Traceback")) or "Error" in visible:
+                print(f"[{job_name}] {visible}", flush=True)
+
+
+def launch_job(template: ExperimentTemplate, run_tag: str, run_dir: Path, slot: int,
+               cores: List[int]) -> RunningJob:
+    cmd, checkpoint_path = template.build_command(run_tag)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    metrics_stream = run_dir / f"{template.name}.epochs.jsonl"
+    metrics_stream.unlink(missing_ok=True)
+    cmd.extend(["--metrics-stream", str(metrics_stream)])
+    threads = str(len(cores))
+    env = dict(os.environ, OMP_NUM_THREADS=threads, MKL_NUM_THREADS=threads, PYTHONUNBUFFERED="1")
+
+    print(f"\n[autorunner] Launching {template.name} on cores {cores}: {' '.join(cmd)}")
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        env=env,
+    )
+    # Pin from the parent right after spawning (preexec_fn is unsafe here: this
+    # process already runs reader/render threads). The child is still importing
+    # torch, so its compute threads and DataLoader workers inherit the core set.
+    try:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(process.pid, cores)
+        else:
+            import psutil
+
+            psutil.Process(process.pid).cpu_affinity(cores)
+    except (ImportError, AttributeError, OSError) as exc:  # macOS has no affinity API
+        print(f"[autorunner] Could not pin {template.name} to cores {cores}: {exc}")
+
+    log_path = run_dir / f"{template.name}.log"
+    reader = threading.Thread(target=_stream_output, args=(template.name, process.stdout, log_path), daemon=True)
+    reader.start()
+    return RunningJob(template, process, checkpoint_path, slot, cores, time.time(), log_path, reader, metrics_stream)
+
+
+def load_sidecar(checkpoint_path: Path) -> Optional[Dict]:
+    sidecar = checkpoint_path.with_suffix(METRICS_SUFFIX)
+    if not sidecar.exists():
+        return None
+    with sidecar.open("r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def load_metrics(checkpoint_path: Path) -> Dict[str, float]:
-    state = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
-    metrics = state.get("metrics", {})
-    # Normalize key casing
-    normalized = {k.replace("lpips_view", "lpips_view"): float(v) for k, v in metrics.items()}
-    return normalized
+    sidecar = load_sidecar(checkpoint_path)
+    if sidecar is not None:
+        metrics = sidecar.get("metrics", {})
+    else:
+        # Checkpoints from before sidecars existed: unpickle the whole file.
+        import torch
+
+        print(f"[autorunner] No {METRICS_SUFFIX} for {checkpoint_path.name}; loading the checkpoint")
+        state = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
+        metrics = state.get("metrics", {})
+    return {k: float(v) for k, v in metrics.items()}
 
 
 def maybe_move_checkpoint(checkpoint_path: Path, run_dir: Path) -> Path:
@@ -123,28 +316,61 @@ def maybe_move_checkpoint(checkpoint_path: Path, run_dir: Path) -> Path:
     target = run_dir / checkpoint_path.name
     if checkpoint_path.exists():
         shutil.move(str(checkpoint_path), target)
+    sidecar = checkpoint_path.with_suffix(METRICS_SUFFIX)
+    if sidecar.exists():
+        shutil.move(str(sidecar), target.with_suffix(METRICS_SUFFIX))
     return target
 
 
-def visualize_checkpoint(checkpoint: Path, output_dir: Path) -> None:
-    if not VIS_SCRIPT.exists():
-        print("[autorunner] Visualization script missing, skipping.")
-        return
-    output_dir.mkdir(parents=True, exist_ok=True)
-    cmd = [
-        sys.executable,
-        str(VIS_SCRIPT),
-        "--checkpoint",
-        str(checkpoint),
-        "--dataset",
-        "poc_results/augmented_dataset_ginetta",
-        "--output",
-        str(output_dir),
-        "--num-samples",
-        "12",
-    ]
-    print(f"[autorunner] Rendering samples for {checkpoint.name}")
-    subprocess.run(cmd, check=False)
+class CheckpointVisualizer:
+    """In-process sample grids for finished checkpoints.
+
+    Imports torch and builds the dataset and both networks once, on first
+    use. Each checkpoint then only needs a ``load_state_dict``, one batched
+    forward for all samples, and background grid rendering
+    (``poc_05_visualize_predictions.visualize``).
+    """
+
+    def __init__(self, dataset_path: Path, num_samples: int = 12, image_size: int = 256, seed: int = 1337):
+        self.dataset_path = dataset_path
+        self.num_samples = num_samples
+        self.image_size = image_size
+        self.seed = seed
+        self._loaded = None
+        self._futures: List[Tuple[str, object]] = []
+
+    def _load(self):
+        if self._loaded is None:
+            import torch
+
+            import poc_05_visualize_predictions as vis
+
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            dataset = vis.open_dataset(self.dataset_path, self.image_size, self.seed)
+            self._loaded = (vis, device, dataset, vis.UVPredictor().to(device), vis.Renderer().to(device))
+        return self._loaded
+
+    def submit(self, checkpoint: Path, output_dir: Path) -> None:
+        print(f"[autorunner] Rendering samples for {checkpoint.name}")
+        try:
+            vis, device, dataset, model_uv, model_renderer = self._load()
+            vis.load_checkpoint_into(model_uv, model_renderer, checkpoint, device)
+            future = vis.visualize(model_uv, model_renderer, dataset, output_dir, self.num_samples,
+                                   device, self.image_size)
+        except Exception as exc:  # a broken visual must not stop the sweep
+            print(f"[autorunner] Visualization for {checkpoint.name} failed: {exc}")
+            return
+        self._futures.append((checkpoint.name, future))
+
+    def wait(self) -> None:
+        for name, future in self._futures:
+            try:
+                paths = future.result()
+            except Exception as exc:
+                print(f"[autorunner] Visualization for {name} failed: {exc}")
+            else:
+                print(f"[autorunner] Wrote {len(paths)} sample grids for {name}")
+        self._futures = []
 
 
 def build_templates() -> Dict[str, ExperimentTemplate]:
@@ -241,84 +467,173 @@ def parse_args() -> argparse.Namespace:
         default=180.0,
         help="Initial runtime estimate per epoch before measurements are available",
     )
-    parser.add_argument("--start", type=str, default="direct_decay_probe", help="Template name to launch first")
+    parser.add_argument("--start", type=str, nargs="+", default=["direct_decay_probe"],
+                        help="Template name(s) to launch first; several start independent branches")
+    parser.add_argument("--parallel", type=int, default=1, help="Experiments to run concurrently")
+    parser.add_argument("--threads-per-job", type=int, default=0,
+                        help="Cores pinned to each experiment (0 = split available cores evenly)")
+    parser.add_argument("--poll-seconds", type=float, default=2.0, help="How often to check running jobs")
+    parser.add_argument("--prune", choices=["none", "median", "halving"], default="none",
+                        help="Stop runs whose per-epoch validation metric trails the others")
+    parser.add_argument("--prune-metric", choices=sorted(METRIC_GOALS), default="ssim_uv",
+                        help="Validation metric the pruning rule compares")
+    parser.add_argument("--prune-grace-epochs", type=int, default=3,
+                        help="Never prune before this epoch (also the first halving rung)")
+    parser.add_argument("--prune-min-peers", type=int, default=2,
+                        help="Median rule: other runs needed at the same epoch before pruning")
+    parser.add_argument("--halving-eta", type=int, default=3, help="Successive halving reduction factor")
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
     templates = build_templates()
-    if args.start not in templates:
-        raise SystemExit(f"Unknown start template: {args.start}")
+    for name in args.start:
+        if name not in templates:
+            raise SystemExit(f"Unknown start template: {name}")
+
+    policy = None
+    if args.prune != "none":
+        policy = PruningPolicy(args.prune, args.prune_metric, grace_epochs=args.prune_grace_epochs,
+                               min_peers=args.prune_min_peers, eta=args.halving_eta)
+
+    parallel = max(1, args.parallel)
+    threads_per_job = args.threads_per_job or max(1, len(available_cores()) // parallel)
+    slots = core_slots(parallel, threads_per_job)
+    free_slots = list(range(parallel))
 
     run_dir = POC_RESULTS / args.run_tag
     summary: List[Dict[str, object]] = []
-    queue: List[str] = [args.start]
+    queue: List[str] = list(args.start)
+    scheduled: set = set()
+    running: List[RunningJob] = []
+    visualizer = CheckpointVisualizer(DATASET)
     start_time = time.time()
-    elapsed = 0.0
     est_seconds_per_epoch = args.initial_seconds_per_epoch
-    remaining_budget = args.max_hours * 3600.0
-
-    while queue:
-        template_name = queue.pop(0)
-        template = templates[template_name]
-        predicted = est_seconds_per_epoch * template.epochs
-        elapsed = time.time() - start_time
-        remaining_budget = args.max_hours * 3600.0 - elapsed
-
-        if predicted > remaining_budget:
-            print(
-                f"[autorunner] Skipping {template.name}: predicted {predicted/3600:.2f}h exceeds remaining budget {remaining_budget/3600:.2f}h"
-            )
-            continue
-
-        cmd, checkpoint_path = template.build_command(args.run_tag)
-        returncode, duration = run_subprocess(cmd)
-        elapsed = time.time() - start_time
-        est_seconds_per_epoch = 0.5 * est_seconds_per_epoch + 0.5 * (duration / template.epochs)
 
-        if returncode != 0:
-            print(f"[autorunner] Run {template.name} failed with code {returncode}")
+    while queue or running:
+        # Fill free slots with queued templates that fit the remaining budget.
+        while queue and free_slots:
+            template = templates[queue.pop(0)]
+            if template.name in scheduled:
+                print(f"[autorunner] {template.name} already scheduled in this run, skipping")
+                continue
+            predicted = est_seconds_per_epoch * template.epochs
+            remaining_budget = args.max_hours * 3600.0 - (time.time() - start_time)
+            if predicted > remaining_budget:
+                print(
+                    f"[autorunner] Skipping {template.name}: predicted {predicted/3600:.2f}h exceeds remaining budget {remaining_budget/3600:.2f}h"
+                )
+                continue
+            slot = free_slots.pop(0)
+            scheduled.add(template.name)
+            running.append(launch_job(template, args.run_tag, run_dir, slot, slots[slot]))
+
+        if not running:
+            break
+        time.sleep(args.poll_seconds)
+
+        for job in running:
+            for record in job.read_new_epochs():
+                if policy is None or job.pruned is not None:
+                    continue
+                name = job.template.name
+                policy.record(name, record["epoch"], float(record["val"].get(policy.metric, float("nan"))))
+                reason = policy.should_prune(name, record["epoch"])
+                if reason is not None and job.process.poll() is None:
+                    print(f"[autorunner] Pruning {name}: {reason}")
+                    job.pruned = reason
+                    job.process.terminate()
+
+        for job in [job for job in running if job.process.poll() is not None]:
+            running.remove(job)
+            free_slots.append(job.slot)
+            job.reader.join()
+            template = job.template
+            returncode = job.process.returncode
+            duration = time.time() - job.started
+            epochs_run = job.last_epoch["epoch"] if job.last_epoch else template.epochs
+            est_seconds_per_epoch = 0.5 * est_seconds_per_epoch + 0.5 * (duration / max(1, epochs_run))
+
+            if job.pruned is not None:
+                relocated = maybe_move_checkpoint(job.checkpoint_path, run_dir)
+                summary.append(
+                    {
+                        "experiment": template.name,
+                        "status": "pruned",
+                        "reason": job.pruned,
+                        "duration_seconds": duration,
+                        "epochs_run": epochs_run,
+                        "last_val_metrics": job.last_epoch["val"] if job.last_epoch else None,
+                        "checkpoint": str(relocated) if relocated.exists() else None,
+                        "cores": job.cores,
+                        "log": str(job.log_path),
+                    }
+                )
+                if template.failure_next:
+                    queue.append(template.failure_next)
+                continue
+
+            if returncode != 0:
+                print(f"[autorunner] Run {template.name} failed with code {returncode} (log: {job.log_path})")
+                summary.append(
+                    {
+                        "experiment": template.name,
+                        "status": "failed",
+                        "duration_seconds": duration,
+                        "returncode": returncode,
+                        "log": str(job.log_path),
+                    }
+                )
+                continue
+
+            relocated = maybe_move_checkpoint(job.checkpoint_path, run_dir)
+            metrics = load_metrics(relocated)
             summary.append(
                 {
                     "experiment": template.name,
-                    "status": "failed",
+                    "status": "completed",
                     "duration_seconds": duration,
-                    "returncode": returncode,
+                    "metrics": metrics,
+                    "checkpoint": str(relocated),
+                    "cores": job.cores,
+                    "log": str(job.log_path),
                 }
             )
-            continue
-
-        relocated = maybe_move_checkpoint(checkpoint_path, run_dir)
-        metrics = load_metrics(relocated)
-        summary.append(
-            {
-                "experiment": template.name,
-                "status": "completed",
-                "duration_seconds": duration,
-                "metrics": metrics,
-                "checkpoint": str(relocated),
-            }
-        )
-        print(f"[autorunner] Completed {template.name} in {duration/60:.1f} min | metrics: {metrics}")
-
-        next_template = template.decide_next(metrics)
-        if next_template:
-            if next_template not in templates:
-                print(f"[autorunner] Unknown follow-up template: {next_template}")
-            else:
-                queue.append(next_template)
-
-        if template.run_visuals:
-            viz_dir = run_dir / f"visuals_{template.name}"
-            visualize_checkpoint(relocated, viz_dir)
-
+            print(f"[autorunner] Completed {template.name} in {duration/60:.1f} min | metrics: {metrics}")
+
+            next_template = template.decide_next(metrics)
+            if next_template:
+                if next_template not in templates:
+                    print(f"[autorunner] Unknown follow-up template: {next_template}")
+                else:
+                    queue.append(next_template)
+
+            if template.run_visuals:
+                viz_dir = run_dir / f"visuals_{template.name}"
+                visualizer.submit(relocated, viz_dir)
+
+    visualizer.wait()
+
+    elapsed_hours = (time.time() - start_time) / 3600.0
+    completed = sum(1 for entry in summary if entry["status"] == "completed")
+    report = {
+        "parallel": parallel,
+        "threads_per_job": threads_per_job,
+        "elapsed_hours": elapsed_hours,
+        "experiments_completed": completed,
+        "experiments_pruned": sum(1 for entry in summary if entry["status"] == "pruned"),
+        "experiments_per_hour": completed / elapsed_hours if elapsed_hours > 0 else 0.0,
+        "runs": summary,
+    }
     summary_path = run_dir / "summary.json"
     summary_path.parent.mkdir(parents=True, exist_ok=True)
     with summary_path.open("w", encoding="utf-8") as f:
-        json.dump(summary, f, indent=2)
-    print(f"[autorunner] Finished. Summary written to {summary_path}")
-
+        json.dump(report, f, indent=2)
+    print(
+        f"[autorunner] Finished {completed} experiments in {elapsed_hours:.2f}h "
+        f"({report['experiments_per_hour']:.2f}/h). Summary written to {summary_path}"
+    )
 
 if __name__ == "__main__":
     main()
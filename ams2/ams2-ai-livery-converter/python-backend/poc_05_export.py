@@ -0,0 +1,266 @@
+"""Export a POC 05 checkpoint as a frozen, CPU-optimised inference artefact.
+
+The UV predictor and renderer are wrapped into one ``UVRenderPipeline``.
+Every BatchNorm is folded into the (transposed) convolution before it, and
+the result is traced and frozen into a single TorchScript ``.ts`` file.
+``poc_05_inference.py --checkpoint`` loads that file directly, with no
+training state to unpickle.
+
+``--quantize int8`` adds static post-training quantisation. Activation
+ranges are calibrated on ``--calibration-samples`` dataset views, and the
+weights are stored as int8. PyTorch's dynamic quantisation only covers
+Linear/LSTM layers, and these networks are convolutions only, so the
+activations are quantised statically. The fbgemm engine is used because
+the x86/onednn quantised ConvTranspose2d kernels give wrong results for the
+decoder's channel counts.
+
+Example usage:
+
+    python poc_05_export.py \\
+        --checkpoint poc_results/poc_05_best_model.pt \\
+        --dataset poc_results/augmented_dataset_ginetta \\
+        --quantize int8
+
+Next to the artefact, ``<artefact>.report.json`` compares the eager fp32
+checkpoint with the folded fp32 and (optionally) int8 exports on held-out
+samples. It reports SSIM and L1 against the fp32 outputs, SSIM(UV) against
+ground truth, latency per batch, and serialised weight size. SSIM needs the
+optional ``pytorch_msssim``; without it the SSIM fields are ``null`` and a
+warning is printed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import io
+import json
+import statistics
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import torch
+import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+
+from poc_05_inference import EXPORT_METADATA, EXPORT_SUFFIX, UVRenderPipeline, load_exported, load_models
+from poc_05_training_multiview import compute_ssim, ms_ssim
+from poc_05_visualize_predictions import open_dataset
+
+QUANTIZED_ENGINE = "fbgemm"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export a POC 05 checkpoint as a frozen CPU inference artefact")
+    parser.add_argument("--checkpoint", type=Path, default=Path("poc_results/poc_05_best_model.pt"))
+    parser.add_argument("--dataset", type=Path, default=Path("poc_results/augmented_dataset_ginetta"),
+                        help="PNG or sharded dataset used for calibration and the accuracy report")
+    parser.add_argument("--output", type=Path, default=None,
+                        help=f"Artefact path (default: <checkpoint stem>_<precision>{EXPORT_SUFFIX} next to the checkpoint)")
+    parser.add_argument("--quantize", choices=["none", "int8"], default="none",
+                        help="Static int8 post-training quantisation calibrated on dataset samples")
+    parser.add_argument("--image-size", type=int, default=256)
+    parser.add_argument("--calibration-samples", type=int, default=64)
+    parser.add_argument("--eval-samples", type=int, default=32, help="Held-out samples for the accuracy report")
+    parser.add_argument("--batch-size", type=int, default=8, help="Batch size for calibration, evaluation and latency")
+    parser.add_argument("--latency-iters", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads for the latency measurement")
+    parser.add_argument("--seed", type=int, default=1337)
+    return parser.parse_args()
+
+
+def fold_batch_norm(model: nn.Module) -> nn.Module:
+    """Fold each eval-mode BatchNorm into the conv directly before it (in place)."""
+
+    for module in model.modules():
+        if not isinstance(module, nn.Sequential):
+            continue
+        for idx in range(1, len(module)):
+            conv, bn = module[idx - 1], module[idx]
+            if isinstance(bn, nn.BatchNorm2d) and isinstance(conv, (nn.Conv2d, nn.ConvTranspose2d)):
+                module[idx - 1] = fuse_conv_bn_eval(conv, bn, transpose=isinstance(conv, nn.ConvTranspose2d))
+                module[idx] = nn.Identity()
+    return model
+
+
+def quantize_int8(model: nn.Module, calibration: List[torch.Tensor]) -> nn.Module:
+    """Static int8 quantisation of ``model`` with activation ranges observed on ``calibration``."""
+
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    torch.backends.quantized.engine = QUANTIZED_ENGINE
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # torch.ao.quantization deprecation notices
+        prepared = prepare_fx(copy.deepcopy(model), get_default_qconfig_mapping(QUANTIZED_ENGINE),
+                              (calibration[0],))
+        with torch.no_grad():
+            for batch in calibration:
+                prepared(batch)
+        return convert_fx(prepared)
+
+
+def freeze(model: nn.Module, example: torch.Tensor) -> torch.jit.ScriptModule:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        traced = torch.jit.trace(model.eval(), example, check_trace=False)
+        return torch.jit.freeze(traced)
+
+
+def sample_batches(dataset, start: int, count: int, batch_size: int) -> List[Dict[str, torch.Tensor]]:
+    indices = list(range(start, min(start + count, len(dataset))))
+    batches = []
+    for offset in range(0, len(indices), batch_size):
+        samples = [dataset[idx] for idx in indices[offset:offset + batch_size]]
+        batches.append({key: torch.stack([sample[key] for sample in samples]) for key in ("view_a", "uv_gt")})
+    return batches
+
+
+def serialized_megabytes(model: nn.Module) -> float:
+    buffer = io.BytesIO()
+    if isinstance(model, torch.jit.ScriptModule):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            torch.jit.save(model, buffer)
+    else:
+        torch.save(model.state_dict(), buffer)
+    return len(buffer.getvalue()) / 1e6
+
+
+def latency_ms(model: nn.Module, example: torch.Tensor, iters: int) -> float:
+    """Median wall time of one forward over ``example`` after two warm-up calls."""
+
+    timings = []
+    with torch.no_grad():
+        for _ in range(2):
+            model(example)
+        for _ in range(iters):
+            start = time.perf_counter()
+            model(example)
+            timings.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(timings)
+
+
+@torch.no_grad()
+def collect_outputs(model: nn.Module, batches: List[Dict[str, torch.Tensor]]) -> Tuple[torch.Tensor, torch.Tensor]:
+    uv_parts, view_parts = [], []
+    for batch in batches:
+        uv, view = model(batch["view_a"])
+        uv_parts.append(uv.float())
+        view_parts.append(view.float())
+    return torch.cat(uv_parts), torch.cat(view_parts)
+
+
+def _ssim(img1: torch.Tensor, img2: torch.Tensor) -> Optional[float]:
+    return compute_ssim(img1, img2) if ms_ssim is not None else None
+
+
+def _format(value: Optional[float], width: int, spec: str = ".4f") -> str:
+    return f"{value:>{width}{spec}}" if value is not None else f"{'n/a':>{width}}"
+
+
+def evaluate_variant(model: nn.Module, batches: List[Dict[str, torch.Tensor]],
+                     reference: Optional[Tuple[torch.Tensor, torch.Tensor]], iters: int) -> Dict[str, Optional[float]]:
+    uv, view = collect_outputs(model, batches)
+    uv_gt = torch.cat([batch["uv_gt"] for batch in batches])
+    result: Dict[str, Optional[float]] = {
+        "latency_ms_per_batch": latency_ms(model, batches[0]["view_a"], iters),
+        "weights_mb": serialized_megabytes(model),
+        "ssim_uv_vs_gt": _ssim(uv, uv_gt),
+    }
+    if reference is not None:
+        ref_uv, ref_view = reference
+        result.update({
+            "ssim_uv_vs_fp32": _ssim(uv, ref_uv),
+            "ssim_view_vs_fp32": _ssim(view, ref_view),
+            "l1_uv_vs_fp32": float((uv - ref_uv).abs().mean()),
+            "l1_view_vs_fp32": float((view - ref_view).abs().mean()),
+        })
+    return result
+
+
+def default_output(checkpoint: Path, quantize: str) -> Path:
+    precision = "int8" if quantize == "int8" else "fp32"
+    return checkpoint.with_name(f"{checkpoint.stem}_{precision}{EXPORT_SUFFIX}")
+
+
+def main() -> None:
+    args = parse_args()
+    if ms_ssim is None:
+        print("Warning: pytorch_msssim is not installed; SSIM fields will be null and only "
+              "L1 against fp32 measures the accuracy delta (pip install pytorch-msssim)")
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    device = torch.device("cpu")
+    output = args.output or default_output(args.checkpoint, args.quantize)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    dataset = open_dataset(args.dataset, args.image_size, args.seed)
+    calibration = sample_batches(dataset, 0, args.calibration_samples, args.batch_size)
+    held_out = sample_batches(dataset, args.calibration_samples, args.eval_samples, args.batch_size)
+    if not held_out:
+        raise SystemExit(f"{args.dataset} has no samples beyond the {args.calibration_samples} used for calibration")
+    example = held_out[0]["view_a"]
+
+    model_uv, model_renderer = load_models(args.checkpoint, device)
+    eager = UVRenderPipeline(model_uv, model_renderer).eval()
+    folded = fold_batch_norm(copy.deepcopy(eager))
+
+    variants: Dict[str, nn.Module] = {"eager_fp32": eager, "folded_fp32": freeze(folded, example)}
+    if args.quantize == "int8":
+        print(f"Calibrating int8 ranges on {sum(len(batch['view_a']) for batch in calibration)} samples...")
+        variants["int8"] = freeze(quantize_int8(folded, [batch["view_a"] for batch in calibration]), example)
+    exported_name = "int8" if args.quantize == "int8" else "folded_fp32"
+
+    metadata = {
+        "checkpoint": str(args.checkpoint),
+        "precision": "int8" if args.quantize == "int8" else "fp32",
+        "quantized_engine": QUANTIZED_ENGINE if args.quantize == "int8" else None,
+        "image_size": args.image_size,
+        "outputs": ["uv", "view"],
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # TorchScript deprecation notices
+        torch.jit.save(variants[exported_name], str(output), _extra_files={EXPORT_METADATA: json.dumps(metadata)})
+    # Report on the artefact as reloaded from disk, exactly as inference will see it.
+    variants[exported_name], _ = load_exported(output, device)
+
+    reference = collect_outputs(eager, held_out)
+    report_variants = {
+        name: evaluate_variant(model, held_out, None if name == "eager_fp32" else reference, args.latency_iters)
+        for name, model in variants.items()
+    }
+    baseline = report_variants["eager_fp32"]
+    for name, result in report_variants.items():
+        result["speedup_vs_fp32"] = baseline["latency_ms_per_batch"] / result["latency_ms_per_batch"]
+        result["size_ratio_vs_fp32"] = result["weights_mb"] / baseline["weights_mb"]
+        if name != "eager_fp32":
+            result["ssim_uv_vs_gt_delta"] = (
+                result["ssim_uv_vs_gt"] - baseline["ssim_uv_vs_gt"]
+                if result["ssim_uv_vs_gt"] is not None and baseline["ssim_uv_vs_gt"] is not None else None
+            )
+
+    report = {
+        "artefact": str(output),
+        **metadata,
+        "batch_size": args.batch_size,
+        "eval_samples": sum(len(batch["view_a"]) for batch in held_out),
+        "threads": torch.get_num_threads(),
+        "variants": report_variants,
+    }
+    report_path = output.with_name(output.name + ".report.json")
+    report_path.write_text(json.dumps(report, indent=2, allow_nan=False), encoding="utf-8")
+
+    print(f"\nExported {metadata['precision']} artefact to {output}")
+    print(f"{'variant':<12} {'ms/batch':>9} {'speedup':>8} {'MB':>7} {'L1(UV)':>8} {'SSIM(UV) vs fp32':>17} {'dSSIM(UV,GT)':>13}")
+    for name, result in report_variants.items():
+        print(f"{name:<12} {result['latency_ms_per_batch']:>9.1f} {result['speedup_vs_fp32']:>7.2f}x "
+              f"{result['weights_mb']:>7.1f} {result.get('l1_uv_vs_fp32', 0.0):>8.4f} "
+              f"{_format(result.get('ssim_uv_vs_fp32', 1.0), 17)} {_format(result.get('ssim_uv_vs_gt_delta', 0.0), 13)}")
+    print(f"Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
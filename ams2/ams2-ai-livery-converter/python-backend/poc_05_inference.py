@@ -11,32 +11,182 @@ Example usage:
         --image path/to/car_view.png \
         --output-dir poc_results/poc_05_inference_run
 
+``--checkpoint`` also accepts a frozen ``.ts`` artefact written by
+``poc_05_export.py``. Such an artefact is loaded without unpickling the training
+state and may be int8-quantised for CPU-only nodes.
+
 The script writes a PNG pair per input consisting of the predicted UV texture
 and the renderer's reprojection back into a view frame. Use multiple
 ``--image`` flags to process several pictures in one pass.
+
+For whole folders, pass directories or glob patterns to ``--input``:
+
+    python poc_05_inference.py \
+        --checkpoint poc_results/poc_05_directsteady_cosine.pt \
+        --input showroom_shots/ --input "more_shots/**/*.jpg" \
+        --batch-size 32 --decode-workers 4 --writer-workers 2
+
+Images are decoded and resized on a thread pool a few batches ahead of the
+model, run through both networks in batches of ``--batch-size``, and their
+PNGs are encoded on a separate writer pool while the next batch runs. PIL
+and libpng release the GIL, so threads are enough to keep the model busy.
+Outputs mirror each image's path below its directory (or the fixed part of
+its glob), so ``a/front.png`` becomes ``<output-dir>/a/front_uv.png``; names
+that would still clash get a ``_1``, ``_2``, ... suffix.
 """
 
 from __future__ import annotations
 
 import argparse
+import glob
+import json
+import os
+import time
+import warnings
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List
+from typing import Deque, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import torch
+import torch.nn as nn
 from PIL import Image
+from tqdm import tqdm
 
+from model_compile import add_compile_args, compile_models
 from poc_05_training_multiview import Renderer, UVPredictor, to_tensor
 from poc_05_visualize_predictions import tensor_to_image
 
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+EXPORT_SUFFIX = ".ts"
+EXPORT_METADATA = "export.json"  # extra file stored inside exported artefacts
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run UV predictor inference on arbitrary car photos")
-    parser.add_argument("--checkpoint", type=Path, required=True, help="Trained checkpoint containing UV/render weights")
-    parser.add_argument("--image", type=Path, action="append", required=True, help="Path to an input showroom/view image")
+    parser.add_argument("--checkpoint", type=Path, required=True, help="Trained checkpoint containing UV/render weights, or a .ts artefact from poc_05_export.py")
+    parser.add_argument("--image", type=Path, action="append", default=[], help="Path to an input showroom/view image")
+    parser.add_argument("--input", type=str, action="append", default=[],
+                        help="Directory (searched recursively) or glob pattern of input images")
     parser.add_argument("--output-dir", type=Path, default=Path("poc_results/poc_05_inference"), help="Directory for predicted assets")
     parser.add_argument("--image-size", type=int, default=256, help="Resize edge for inputs/outputs")
+    parser.add_argument("--batch-size", type=int, default=16, help="Images per forward pass")
+    parser.add_argument("--decode-workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Threads decoding and resizing inputs")
+    parser.add_argument("--writer-workers", type=int, default=2, help="Threads encoding output PNGs")
     parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu", help="Device to run inference on")
-    return parser.parse_args()
+    add_compile_args(parser)
+    args = parser.parse_args()
+    if not args.image and not args.input:
+        parser.error("pass at least one --image or --input")
+    return args
+
+
+def _glob_root(pattern: str) -> Path:
+    """Leading directories of ``pattern`` that contain no wildcards."""
+
+    parts = Path(pattern).parts
+    for idx, part in enumerate(parts):
+        if glob.has_magic(part):
+            return Path(*parts[:idx]) if idx else Path(".")
+    return Path(pattern).parent
+
+
+def collect_inputs(images: Sequence[Path], inputs: Sequence[str]) -> List[Tuple[Path, Path]]:
+    """``(image, output_stem)`` for explicit ``images`` and each directory/glob in ``inputs``.
+
+    Order is stable (explicit images first, then each input sorted);
+    duplicates and missing files are dropped. Output stems mirror each
+    image's path below its directory or glob root, and a ``_<n>`` suffix
+    keeps them unique (``front.png`` and ``front.jpg`` in one folder).
+    """
+
+    candidates: List[Tuple[Path, Path]] = [(path, Path(path.stem)) for path in images]
+    for spec in inputs:
+        root = Path(spec)
+        if root.is_dir():
+            found = [path for path in root.rglob("*") if path.suffix.lower() in IMAGE_EXTENSIONS]
+        else:
+            found = [Path(match) for match in glob.glob(spec, recursive=True)]
+            found = [path for path in found if path.is_file()]
+            if not found:
+                print(f"[warn] No images match {spec}")
+            root = _glob_root(spec)
+        candidates.extend((path, path.relative_to(root).with_suffix("")) for path in sorted(found))
+
+    selected: List[Tuple[Path, Path]] = []
+    seen_paths = set()
+    used_stems = set()
+    for path, stem in candidates:
+        if path in seen_paths:
+            continue
+        seen_paths.add(path)
+        if not path.exists():
+            print(f"[warn] Skipping missing image: {path}")
+            continue
+        unique, counter = stem, 1
+        while unique in used_stems:
+            unique = stem.with_name(f"{stem.name}_{counter}")
+            counter += 1
+        used_stems.add(unique)
+        selected.append((path, unique))
+    return selected
+
+
+def _load_image(image_path: Path, image_size: int) -> Optional[torch.Tensor]:
+    try:
+        with Image.open(image_path) as raw_image:
+            return to_tensor(raw_image.convert("RGB"), image_size)
+    except OSError as exc:
+        print(f"[warn] Skipping unreadable image {image_path}: {exc}")
+        return None
+
+
+def decoded_batches(
+    inputs: Sequence[Tuple[Path, Path]],
+    image_size: int,
+    batch_size: int,
+    pool: ThreadPoolExecutor,
+    prefetch_batches: int = 2,
+) -> Iterator[Tuple[List[Tuple[Path, Path]], torch.Tensor]]:
+    """Yield ``(inputs, batch)`` while later images decode on ``pool``.
+
+    Images that fail to decode are left out of both.
+
+    At most ``prefetch_batches`` batches beyond the current one are in
+    flight, so memory stays bounded for folders of any size.
+    """
+
+    window = batch_size * (prefetch_batches + 1)
+    pending: Deque[Tuple[Tuple[Path, Path], Future]] = deque()
+    remaining = iter(inputs)
+    items: List[Tuple[Path, Path]] = []
+    tensors: List[torch.Tensor] = []
+    while True:
+        while len(pending) < window:
+            item = next(remaining, None)
+            if item is None:
+                break
+            pending.append((item, pool.submit(_load_image, item[0], image_size)))
+        if not pending:
+            break
+        item, future = pending.popleft()
+        tensor = future.result()
+        if tensor is None:
+            continue
+        items.append(item)
+        tensors.append(tensor)
+        if len(tensors) == batch_size:
+            yield items, torch.stack(tensors)
+            items, tensors = [], []
+    if tensors:
+        yield items, torch.stack(tensors)
+
+
+def _save_pair(uv_pred: torch.Tensor, view_reproj: torch.Tensor, uv_path: Path, view_path: Path) -> None:
+    tensor_to_image(uv_pred).save(uv_path)
+    tensor_to_image(view_reproj).save(view_path)
 
 
 def load_models(checkpoint_path: Path, device: torch.device) -> tuple[UVPredictor, Renderer]:
@@ -50,43 +200,112 @@ def load_models(checkpoint_path: Path, device: torch.device) -> tuple[UVPredicto
     return model_uv, model_renderer
 
 
+class UVRenderPipeline(nn.Module):
+    """UV predictor followed by the renderer; returns ``(uv, reprojected_view)``."""
+
+    def __init__(self, model_uv: nn.Module, model_renderer: nn.Module):
+        super().__init__()
+        self.uv = model_uv
+        self.renderer = model_renderer
+
+    def forward(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        uv = self.uv(x)
+        return uv, self.renderer(uv)
+
+
+def load_exported(artefact_path: Path, device: torch.device) -> Tuple[torch.jit.ScriptModule, dict]:
+    """Load a ``poc_05_export`` artefact and the metadata stored inside it."""
+
+    # Read the metadata before loading: quantised weights are repacked for the
+    # active engine as the artefact is deserialised.
+    with zipfile.ZipFile(artefact_path) as archive:
+        names = [name for name in archive.namelist() if name.endswith(f"/extra/{EXPORT_METADATA}")]
+        metadata = json.loads(archive.read(names[0])) if names else {}
+    engine = metadata.get("quantized_engine")
+    if engine:
+        if device.type != "cpu":
+            raise ValueError(f"{artefact_path} is int8-quantised and only runs on the CPU")
+        torch.backends.quantized.engine = engine
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # TorchScript deprecation notice
+        pipeline = torch.jit.load(str(artefact_path), map_location=device)
+    pipeline.eval()
+    return pipeline, metadata
+
+
 def run_inference(
-    model_uv: UVPredictor,
-    model_renderer: Renderer,
-    image_paths: Iterable[Path],
+    pipeline: nn.Module,
+    inputs: Iterable[Tuple[Path, Path]],
     output_dir: Path,
     image_size: int,
     device: torch.device,
-) -> None:
-    output_dir.mkdir(parents=True, exist_ok=True)
+    batch_size: int = 16,
+    decode_workers: int = 4,
+    writer_workers: int = 2,
+) -> int:
+    """Predict UV/reprojection PNG pairs for ``(image, output_stem)`` inputs.
 
-    for image_path in image_paths:
-        if not image_path.exists():
-            print(f"[warn] Skipping missing image: {image_path}")
-            continue
-        raw_image = Image.open(image_path).convert("RGB")
-        tensor = to_tensor(raw_image, image_size).unsqueeze(0).to(device)
+    Pairs are written to ``output_dir / <output_stem>_uv.png`` and
+    ``_reproj.png`` (see ``collect_inputs``); returns the number written.
+    """
+
+    inputs = list(inputs)
+    for parent in {(output_dir / stem).parent for _, stem in inputs} | {output_dir}:
+        parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    start = time.perf_counter()
 
-        with torch.no_grad():
-            uv_pred = model_uv(tensor)
-            view_reproj = model_renderer(uv_pred)
+    with ThreadPoolExecutor(max_workers=max(1, decode_workers), thread_name_prefix="decode") as decode_pool, \
+            ThreadPoolExecutor(max_workers=max(1, writer_workers), thread_name_prefix="writer") as writer_pool:
+        writes: Deque[Future] = deque()
+        progress = tqdm(total=len(inputs), desc="Infer", unit="img")
+        for items, batch in decoded_batches(inputs, image_size, batch_size, decode_pool):
+            with torch.no_grad():
+                uv_pred, view_reproj = pipeline(batch.to(device, non_blocking=True))
+            uv_pred, view_reproj = uv_pred.float().cpu(), view_reproj.float().cpu()
 
-        uv_image = tensor_to_image(uv_pred.squeeze(0))
-        view_image = tensor_to_image(view_reproj.squeeze(0))
+            for (_, stem), uv, view in zip(items, uv_pred, view_reproj):
+                base = output_dir / stem
+                writes.append(writer_pool.submit(
+                    _save_pair, uv, view, base.with_name(f"{base.name}_uv.png"),
+                    base.with_name(f"{base.name}_reproj.png")
+                ))
+            # Keep at most two batches of encodes queued so outputs do not pile up in memory.
+            while len(writes) > 2 * batch_size:
+                writes.popleft().result()
+                written += 1
+            progress.update(len(items))
+        while writes:
+            writes.popleft().result()
+            written += 1
+        progress.close()
 
-        stem = image_path.stem
-        uv_path = output_dir / f"{stem}_uv.png"
-        view_path = output_dir / f"{stem}_reproj.png"
-        uv_image.save(uv_path)
-        view_image.save(view_path)
-        print(f"[info] Saved {uv_path} and {view_path}")
+    elapsed = time.perf_counter() - start
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"[info] Wrote {written} UV/reprojection pairs to {output_dir} in {elapsed:.1f}s ({rate:.1f} img/s)")
+    return written
 
 
 def main() -> None:
     args = parse_args()
     device = torch.device(args.device)
-    model_uv, model_renderer = load_models(args.checkpoint, device)
-    run_inference(model_uv, model_renderer, args.image, args.output_dir, args.image_size, device)
+    inputs = collect_inputs(args.image, args.input)
+    print(f"[info] {len(inputs)} input images")
+    if args.checkpoint.suffix == EXPORT_SUFFIX:
+        pipeline, metadata = load_exported(args.checkpoint, device)
+        print(f"[info] Loaded exported {metadata.get('precision', 'fp32')} artefact {args.checkpoint}")
+        if args.compile:
+            print("[info] Ignoring --compile: exported artefacts are already frozen TorchScript")
+    else:
+        model_uv, model_renderer = load_models(args.checkpoint, device)
+        if args.compile:
+            example = torch.zeros(min(args.batch_size, max(1, len(inputs))), 3, args.image_size, args.image_size, device=device)
+            compiled = compile_models([model_uv, model_renderer], example, args.compile_cache)
+            print(f"[info] Compiled models with {compiled['backend']} in {compiled['setup_seconds']:.1f}s")
+        pipeline = UVRenderPipeline(model_uv, model_renderer)
+    run_inference(pipeline, inputs, args.output_dir, args.image_size, device,
+                  batch_size=args.batch_size, decode_workers=args.decode_workers,
+                  writer_workers=args.writer_workers)
 
 
 if __name__ == "__main__":
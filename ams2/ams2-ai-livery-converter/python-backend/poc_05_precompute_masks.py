@@ -0,0 +1,66 @@
+"""Precompute bit-packed visibility masks for multi-view training.
+
+Runs ``visibility_mask_bits`` once per augmented view and stores the result
+next to the dataset (see ``MaskStore``), so ``MultiViewDataset`` and
+``ShardedMultiViewDataset`` skip the HSV/morphology work on every load. The
+store records a hash of the mask thresholds; training ignores it once they
+change, and rerunning this script rebuilds it.
+
+Usage
+-----
+python poc_05_precompute_masks.py --dataset poc_results/augmented_dataset_ginetta --image-size 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+from PIL import Image
+from tqdm import tqdm
+
+from poc_03_pack_shards import ShardReader, is_sharded, resolve_path
+from poc_05_training_multiview import MaskStore, visibility_mask_bits
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompute visibility masks for multi-view training")
+    parser.add_argument("--dataset", type=Path, default=Path("poc_results/augmented_dataset_ginetta"),
+                        help="Augmented dataset directory, metadata.json file, or packed shard directory")
+    parser.add_argument("--image-size", type=int, default=256, help="Must match training --image-size")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    size = args.image_size
+
+    if is_sharded(args.dataset):
+        reader = ShardReader(args.dataset)
+        directory = args.dataset
+        names = [str(idx) for idx in range(len(reader))]
+
+        def masks() -> Iterator[np.ndarray]:
+            for idx in tqdm(range(len(reader)), desc="Masks"):
+                yield visibility_mask_bits(Image.fromarray(reader.pair(idx)[1]), size)
+    else:
+        metadata_path = args.dataset / "metadata.json" if args.dataset.is_dir() else args.dataset
+        directory = metadata_path.parent
+        with metadata_path.open("r", encoding="utf-8") as f:
+            records: List[Dict] = json.load(f)
+        views = [resolve_path(rec["view_aug"], [directory]) for rec in records]
+        names = [view.name for view in views]
+
+        def masks() -> Iterator[np.ndarray]:
+            for view in tqdm(views, desc="Masks"):
+                yield visibility_mask_bits(Image.open(view).convert("RGB"), size)
+
+    store = MaskStore.write(directory, size, names, masks())
+    print(f"Wrote {len(names)} masks ({store.bits_path.stat().st_size / 1e6:.2f} MB) to {store.bits_path}")
+
+
+if __name__ == "__main__":
+    main()
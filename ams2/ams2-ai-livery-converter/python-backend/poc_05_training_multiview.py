@@ -8,12 +8,15 @@ focus on pixels that actually belong to the car body.
 from __future__ import annotations
 
 import argparse
+import contextlib
+import hashlib
 import json
 import math
 import random
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
@@ -22,9 +25,23 @@ import torch.nn as nn
 import torch.nn.functional as F
 import torchvision.transforms as T
 from PIL import Image
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader, Dataset, Subset
 from tqdm import tqdm
 
+from poc_03_augmentation import AugmentationSource, item_seed
+from poc_03_batched_augmentation import augment_batch, normalize
+from poc_03_pack_shards import ShardReader, is_sharded, normalized_tensor
+from checkpoint_manager import (
+    CheckpointManager,
+    capture_rng_state,
+    restore_rng_state,
+    write_metrics_sidecar,
+)
+from loader_utils import EpochRandomSampler, SharedEpoch, loader_options
+from mixed_precision import TrainPrecision, add_precision_args
+from model_compile import add_compile_args, compile_models
+from tensor_cache import TensorCache
+
 try:
     from pytorch_msssim import ssim as ms_ssim
 except ImportError:  # pragma: no cover
@@ -41,6 +58,10 @@ except ImportError:  # pragma: no cover
 # ---------------------------------------------------------------------------
 
 
+# Cache-key tag for the ``to_tensor`` normalisation below.
+TENSOR_NORMALIZATION = "mean=0.5,std=0.5"
+
+
 def to_tensor(image: Image.Image, size: int) -> torch.Tensor:
     transform = T.Compose(
         [
@@ -52,25 +73,139 @@ def to_tensor(image: Image.Image, size: int) -> torch.Tensor:
     return transform(image)
 
 
-def compute_visibility_mask(image: Image.Image, size: int) -> torch.Tensor:
-    """Segment car body from showroom background using HSV heuristics."""
+# Visibility heuristic parameters; any change invalidates precomputed mask stores.
+MASK_SATURATION_MIN = 32
+MASK_VALUE_MAX = 200
+MASK_MORPH_KERNEL = 5
+MASK_ALGORITHM_VERSION = 1
+
+
+def visibility_mask_bits(image: Image.Image, size: int) -> np.ndarray:
+    """Binary (0/1 uint8) car-body mask from HSV heuristics, before normalisation."""
 
     array = np.array(image.resize((size, size), Image.BICUBIC))
     hsv = cv2.cvtColor(array, cv2.COLOR_RGB2HSV)
     h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
 
     # High saturation or darker value tends to belong to the car body
-    mask = ((s > 32) | (v < 200)).astype(np.uint8)
+    mask = ((s > MASK_SATURATION_MIN) | (v < MASK_VALUE_MAX)).astype(np.uint8)
 
     # Remove tiny speckles and fill holes
-    kernel = np.ones((5, 5), np.uint8)
+    kernel = np.ones((MASK_MORPH_KERNEL, MASK_MORPH_KERNEL), np.uint8)
     mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
     mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    return mask
+
 
+def mask_bits_to_tensor(mask: np.ndarray) -> torch.Tensor:
     mask = mask.astype(np.float32)
     mask /= mask.max() + 1e-6
-    mask = torch.from_numpy(mask).unsqueeze(0)  # 1 x H x W
-    return mask
+    return torch.from_numpy(mask).unsqueeze(0)  # 1 x H x W
+
+
+def compute_visibility_mask(image: Image.Image, size: int) -> torch.Tensor:
+    """Segment car body from showroom background using HSV heuristics."""
+
+    return mask_bits_to_tensor(visibility_mask_bits(image, size))
+
+
+def visibility_mask_hash(size: int) -> str:
+    """Fingerprint of everything that determines a stored mask."""
+
+    params = {
+        "version": MASK_ALGORITHM_VERSION,
+        "saturation_min": MASK_SATURATION_MIN,
+        "value_max": MASK_VALUE_MAX,
+        "morph_kernel": MASK_MORPH_KERNEL,
+        "size": size,
+    }
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class MaskStore:
+    """Bit-packed precomputed visibility masks stored next to a dataset.
+
+    ``visibility_masks_<size>.npy`` holds one ``np.packbits`` row per view and
+    ``visibility_masks_<size>.json`` maps view names to rows together with
+    the ``visibility_mask_hash`` they were built with. Rows are memory-mapped
+    lazily per process and unpacked on lookup.
+    """
+
+    def __init__(self, directory: Path, size: int):
+        self.size = size
+        self.bits_path, self.index_path = self.paths(directory, size)
+        with self.index_path.open("r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.params_hash: str = index["params_hash"]
+        self.rows: Dict[str, int] = {name: row for row, name in enumerate(index["names"])}
+        self._bits: Optional[np.ndarray] = None
+
+    @staticmethod
+    def paths(directory: Path, size: int) -> Tuple[Path, Path]:
+        return directory / f"visibility_masks_{size}.npy", directory / f"visibility_masks_{size}.json"
+
+    @classmethod
+    def open(cls, directory: Path, size: int) -> Optional["MaskStore"]:
+        """Return the store if present and built with the current parameters."""
+
+        bits_path, index_path = cls.paths(directory, size)
+        if not (bits_path.exists() and index_path.exists()):
+            return None
+        store = cls(directory, size)
+        if store.params_hash != visibility_mask_hash(size):
+            print(f"Ignoring stale visibility masks in {directory} (thresholds changed); "
+                  f"rerun poc_05_precompute_masks.py")
+            return None
+        return store
+
+    @classmethod
+    def write(cls, directory: Path, size: int, names: List[str], masks: Iterable[np.ndarray]) -> "MaskStore":
+        bits_path, index_path = cls.paths(directory, size)
+        row_bytes = (size * size + 7) // 8
+        bits = np.lib.format.open_memmap(bits_path, mode="w+", dtype=np.uint8, shape=(len(names), row_bytes))
+        for row, mask in enumerate(masks):
+            bits[row] = np.packbits(mask.reshape(-1).astype(bool))
+        bits.flush()
+        del bits
+        # Index last, so an interrupted run never pairs a new index with old bits.
+        with index_path.open("w", encoding="utf-8") as f:
+            json.dump({"params_hash": visibility_mask_hash(size), "size": size, "names": names}, f)
+        return cls(directory, size)
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state["_bits"] = None
+        return state
+
+    def get(self, name: str) -> Optional[torch.Tensor]:
+        row = self.rows.get(name)
+        if row is None:
+            return None
+        if self._bits is None:
+            self._bits = np.load(self.bits_path, mmap_mode="r")
+        mask = np.unpackbits(self._bits[row], count=self.size * self.size).reshape(self.size, self.size)
+        return mask_bits_to_tensor(mask)
+
+
+def visibility_mask_batch(images: torch.Tensor) -> torch.Tensor:
+    """Tensor version of ``compute_visibility_mask`` for ``N x 3 x H x W`` images in [0, 1]."""
+
+    value = images.amax(dim=1, keepdim=True)
+    chroma = value - images.amin(dim=1, keepdim=True)
+    saturation = torch.where(value > 0, chroma / value.clamp_min(1e-6), torch.zeros_like(value))
+    mask = ((saturation * 255.0 > MASK_SATURATION_MIN) | (value * 255.0 < MASK_VALUE_MAX)).float()
+
+    # Open then close; max-pool padding is -inf, like OpenCV's default morphology border.
+    pad = MASK_MORPH_KERNEL // 2
+
+    def dilate(x: torch.Tensor) -> torch.Tensor:
+        return F.max_pool2d(x, MASK_MORPH_KERNEL, stride=1, padding=pad)
+
+    def erode(x: torch.Tensor) -> torch.Tensor:
+        return -F.max_pool2d(-x, MASK_MORPH_KERNEL, stride=1, padding=pad)
+
+    mask = erode(dilate(dilate(erode(mask))))
+    return mask / (mask.amax(dim=(2, 3), keepdim=True) + 1e-6)
 
 
 def masked_l1(pred: torch.Tensor, target: torch.Tensor, mask: Optional[torch.Tensor]) -> torch.Tensor:
@@ -107,9 +242,23 @@ class AugRecord:
 
 
 class MultiViewDataset(Dataset):
-    """Yield paired augmented views sharing the same underlying UV texture."""
+    """Yield paired augmented views sharing the same underlying UV texture.
+
+    Samples are stored flat in group order, so ``sample_group`` and the
+    cumulative ``offsets`` resolve an index in O(1). ``batch_with_partners``
+    picks partners from within a batch and decodes each view once per batch;
+    wrap the training split in ``InBatchPartnerSubset`` (used together with
+    ``GroupedBatchSampler``) to fetch batches that way.
+
+    Preprocessed source UVs, views and visibility masks are kept in a
+    per-process ``TensorCache`` capped at ``cache_bytes`` (0 disables it).
+
+    Partner draws are seeded from (seed, epoch, index), so they are the same
+    for any number of loader workers; call ``set_epoch`` each epoch.
+    """
 
-    def __init__(self, metadata_path: Path, image_size: int = 256, seed: int = 1337):
+    def __init__(self, metadata_path: Path, image_size: int = 256, seed: int = 1337,
+                 cache_bytes: int = 0):
         if metadata_path.is_dir():
             metadata_path = metadata_path / "metadata.json"
         with metadata_path.open("r", encoding="utf-8") as f:
@@ -124,54 +273,287 @@ class MultiViewDataset(Dataset):
 
         # Flatten into sample indices but keep grouping info for pairing
         self.groups: List[Tuple[str, List[AugRecord]]] = sorted(grouped.items())
+        self.records: List[AugRecord] = [rec for _, group in self.groups for rec in group]
+        sizes = np.array([len(group) for _, group in self.groups], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+        self.sample_group = np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
         self.image_size = image_size
-        self.rng = random.Random(seed)
+        self.seed = seed
+        self.epoch = SharedEpoch()
+        self.cache = TensorCache(cache_bytes)
+        self.masks = MaskStore.open(metadata_path.parent, image_size)
 
     def __len__(self) -> int:
-        return sum(len(group[1]) for group in self.groups)
+        return len(self.records)
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch.set(epoch)
+
+    def _sample_rng(self, idx: int) -> random.Random:
+        return random.Random(item_seed(self.seed, self.epoch.get(), idx))
+
+    def _pick_partner(self, idx: int) -> AugRecord:
+        group = self.sample_group[idx]
+        start, stop = self.offsets[group], self.offsets[group + 1]
+        if stop - start < 2:
+            return self.records[idx]
+        # Draw a different augmented view of the same UV texture.
+        local = self._sample_rng(idx).randrange(start, stop - 1)
+        return self.records[local + 1 if local >= idx else local]
 
     def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
-        # Locate group and local index
-        cumulative = 0
-        for _, records in self.groups:
-            if idx < cumulative + len(records):
-                primary = records[idx - cumulative]
-                if len(records) > 1:
-                    partner = primary
-                    # Reselect until we pick a different augmented view when possible.
-                    while partner is primary:
-                        partner = self.rng.choice(records)
-                else:
-                    partner = primary
-                return self._build_sample(primary, partner)
-            cumulative += len(records)
-
-        # Fallback (shouldn't happen)
-        key, records = self.groups[-1]
-        primary = records[idx % len(records)]
-        if len(records) > 1:
-            partner = primary
-            while partner is primary:
-                partner = self.rng.choice(records)
-        else:
-            partner = primary
-        return self._build_sample(primary, partner)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"sample {idx} out of range for {len(self)} samples")
+        return self._build_sample(self.records[idx], self._pick_partner(idx))
+
+    def batch_with_partners(self, indices: List[int]) -> List[Dict[str, torch.Tensor]]:
+        """Fetch ``indices`` as one batch, drawing partners from the same batch where possible."""
+
+        in_batch: Dict[int, List[int]] = {}
+        for idx in indices:
+            in_batch.setdefault(int(self.sample_group[idx]), []).append(idx)
+
+        decoded: Dict[Path, Tuple[torch.Tensor, Optional[torch.Tensor]]] = {}
+        samples = []
+        for idx in indices:
+            others = [other for other in in_batch[int(self.sample_group[idx])] if other != idx]
+            partner = self.records[self._sample_rng(idx).choice(others)] if others else self._pick_partner(idx)
+            samples.append(self._build_sample(self.records[idx], partner, decoded))
+        return samples
+
+    def _load(self, path: Path, with_mask: bool,
+              decoded: Optional[Dict[Path, Tuple[torch.Tensor, Optional[torch.Tensor]]]]):
+        if decoded is not None and path in decoded:
+            return decoded[path]
+        size = self.image_size
+        tensor_key = ("tensor", str(path), size, TENSOR_NORMALIZATION)
+        mask_key = ("mask", str(path), size)
+        tensor = self.cache.get(tensor_key)
+        mask = self.cache.get(mask_key) if with_mask else None
+        if with_mask and mask is None and self.masks is not None:
+            stored = self.masks.get(path.name)
+            mask = None if stored is None else self.cache.put(mask_key, stored)
+        if tensor is None or (with_mask and mask is None):
+            image = Image.open(path).convert("RGB")
+            if tensor is None:
+                tensor = self.cache.put(tensor_key, to_tensor(image, size))
+            if with_mask and mask is None:
+                mask = self.cache.put(mask_key, compute_visibility_mask(image, size))
+        entry = (tensor, mask)
+        if decoded is not None:
+            decoded[path] = entry
+        return entry
+
+    def _build_sample(self, primary: AugRecord, partner: AugRecord,
+                      decoded: Optional[Dict] = None) -> Dict[str, torch.Tensor]:
+        uv_gt, _ = self._load(primary.source_uv, False, decoded)
+        view_a, mask_a = self._load(primary.view_path, True, decoded)
+        view_b, mask_b = self._load(partner.view_path, True, decoded)
+
+        data = {
+            "uv_gt": uv_gt,
+            "view_a": view_a,
+            "view_b": view_b,
+            "mask_a": mask_a,
+            "mask_b": mask_b,
+        }
+        return data
+
+
+class InBatchPartnerSubset(Subset):
+    """Training split whose batched fetches use ``batch_with_partners``.
+
+    Only the wrapped split changes; other subsets of the same dataset (the
+    validation split) keep their per-index partner draws.
+    """
 
-    def _build_sample(self, primary: AugRecord, partner: AugRecord) -> Dict[str, torch.Tensor]:
+    def __getitems__(self, indices: List[int]) -> List[Dict[str, torch.Tensor]]:
+        return self.dataset.batch_with_partners([self.indices[idx] for idx in indices])
+
+
+class GroupedBatchSampler:
+    """Batch sampler that keeps samples of the same UV texture together.
+
+    Each epoch shuffles samples within their group, cuts groups into runs of
+    ``pairs_per_group`` samples and shuffles the runs, so every batch holds
+    same-UV neighbours that can serve as each other's partner view.
+    """
+
+    def __init__(self, sample_groups: Sequence[int], batch_size: int, pairs_per_group: int = 2,
+                 shuffle: bool = True, drop_last: bool = False, seed: int = 1337):
+        self.sample_groups = np.asarray(sample_groups)
+        self.batch_size = batch_size
+        self.run_length = max(1, pairs_per_group)
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        n = len(self.sample_groups)
+        return n // self.batch_size if self.drop_last else math.ceil(n / self.batch_size)
+
+    def __iter__(self):
+        rng = np.random.default_rng([self.seed, self.epoch])
+        runs: List[np.ndarray] = []
+        for group in np.unique(self.sample_groups):
+            members = np.flatnonzero(self.sample_groups == group)
+            if self.shuffle:
+                members = rng.permutation(members)
+            runs.extend(np.array_split(members, math.ceil(len(members) / self.run_length)))
+        order = rng.permutation(len(runs)) if self.shuffle else range(len(runs))
+        flat = np.concatenate([runs[i] for i in order]) if runs else np.array([], dtype=np.int64)
+
+        for start in range(0, len(flat), self.batch_size):
+            batch = flat[start:start + self.batch_size]
+            if self.drop_last and len(batch) < self.batch_size:
+                break
+            yield batch.tolist()
+
+
+class ShardedMultiViewDataset(Dataset):
+    """``MultiViewDataset`` over ``poc_03_pack_shards`` output (memory-mapped, no PNG decode)."""
+
+    def __init__(self, shard_dir: Path, image_size: int = 256, seed: int = 1337):
+        self.reader = ShardReader(shard_dir)
+        if self.reader.image_size != image_size:
+            raise ValueError(
+                f"{shard_dir} was packed at {self.reader.image_size}px; "
+                f"repack with --image-size {image_size}"
+            )
+        self.image_size = image_size
+        self.seed = seed
+        self.epoch = SharedEpoch()
+
+        source_ids = self.reader.source_ids()
+        self.sample_group = source_ids
+        self.masks = MaskStore.open(shard_dir, image_size)
+        groups: Dict[int, np.ndarray] = {
+            int(source): np.flatnonzero(source_ids == source) for source in np.unique(source_ids)
+        }
+        self.partners = [groups[int(source)] for source in source_ids]
+
+    def __len__(self) -> int:
+        return len(self.reader)
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch.set(epoch)
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        candidates = self.partners[idx]
+        partner = idx
+        rng = random.Random(item_seed(self.seed, self.epoch.get(), idx))
+        # Pick a different augmented view of the same UV texture when possible.
+        while len(candidates) > 1 and partner == idx:
+            partner = int(rng.choice(candidates))
+
+        _, view_primary = self.reader.pair(idx)
+        _, view_partner = self.reader.pair(partner)
+
+        return {
+            "uv_gt": normalized_tensor(self.reader.source(idx)),
+            "view_a": normalized_tensor(view_primary),
+            "view_b": normalized_tensor(view_partner),
+            "mask_a": self._mask(idx, view_primary),
+            "mask_b": self._mask(partner, view_partner),
+        }
+
+    def _mask(self, idx: int, view: np.ndarray) -> torch.Tensor:
+        stored = self.masks.get(str(idx)) if self.masks is not None else None
+        return stored if stored is not None else compute_visibility_mask(Image.fromarray(view), self.image_size)
+
+
+class OnTheFlyMultiViewDataset(Dataset):
+    """Multi-view samples augmented on the fly from in-memory source pairs.
+
+    Mirrors ``MultiViewDataset`` without the PNG round trip: the two views
+    are independent augmentations of source pairs sharing one UV texture,
+    seeded from (seed, epoch, index).
+
+    With ``batched_augment`` only resized source tensors and per-view seeds
+    are returned; ``MultiViewAugmentCollate`` augments the batch and builds
+    the visibility masks in tensor space.
+    """
+
+    def __init__(self, source: AugmentationSource, length: int, image_size: int = 256,
+                 seed: int = 1337, epoch: int = 0, batched_augment: bool = False):
+        self.source = source
+        self.length = length
+        self.image_size = image_size
+        self.seed = seed
+        self.epoch = SharedEpoch(epoch)
+        self.batched_augment = batched_augment
+
+        grouped: Dict[Path, List[int]] = {}
+        for pair_idx, pair in enumerate(source.pairs):
+            grouped.setdefault(pair.uv_path, []).append(pair_idx)
+        self.partners = [grouped[pair.uv_path] for pair in source.pairs]
+
+        self.raw: List[Tuple[torch.Tensor, torch.Tensor]] = []
+        if batched_augment:
+            resize = T.Compose(
+                [T.Resize((image_size, image_size), interpolation=T.InterpolationMode.BICUBIC), T.ToTensor()]
+            )
+            self.raw = [(resize(uv), resize(view)) for uv, view in source.images]
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch.set(epoch)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
         size = self.image_size
+        primary = idx % len(self.source)
+        rng = random.Random(item_seed(self.seed, self.epoch.get(), idx))
+        partner = rng.choice(self.partners[primary])
+
+        seed_a, seed_b = rng.getrandbits(31), rng.getrandbits(31)
+
+        if self.batched_augment:
+            return {
+                "uv_gt": self.raw[primary][0],
+                "view_a": self.raw[primary][1],
+                "view_b": self.raw[partner][1],
+                "seed_a": seed_a,
+                "seed_b": seed_b,
+            }
 
-        uv_gt = Image.open(primary.source_uv).convert("RGB")
-        view_primary = Image.open(primary.view_path).convert("RGB")
-        view_partner = Image.open(partner.view_path).convert("RGB")
+        uv_gt = self.source.images[primary][0]
+        _, view_primary, _ = self.source.sample(primary, seed_a)
+        _, view_partner, _ = self.source.sample(partner, seed_b)
 
-        data = {
+        return {
             "uv_gt": to_tensor(uv_gt, size),
             "view_a": to_tensor(view_primary, size),
             "view_b": to_tensor(view_partner, size),
             "mask_a": compute_visibility_mask(view_primary, size),
             "mask_b": compute_visibility_mask(view_partner, size),
         }
-        return data
+
+
+class MultiViewAugmentCollate:
+    """``collate_fn`` augmenting both views of a batch in one pass, then masking them."""
+
+    def __call__(self, items: List[Dict]) -> Dict[str, torch.Tensor]:
+        n = len(items)
+        views = torch.stack([item["view_a"] for item in items] + [item["view_b"] for item in items])
+        seeds = [int(item["seed_a"]) for item in items] + [int(item["seed_b"]) for item in items]
+        views = augment_batch(views, seeds)
+        masks = visibility_mask_batch(views)
+        views = normalize(views)
+        return {
+            "uv_gt": normalize(torch.stack([item["uv_gt"] for item in items])),
+            "view_a": views[:n],
+            "view_b": views[n:],
+            "mask_a": masks[:n],
+            "mask_b": masks[n:],
+        }
 
 
 # ---------------------------------------------------------------------------
@@ -235,55 +617,110 @@ class Renderer(nn.Module):
 # ---------------------------------------------------------------------------
 
 
-def train_epoch(loader, model_uv, model_renderer, optim_uv, optim_renderer, device, weights):
-    model_uv.train()
-    model_renderer.train()
+@contextlib.contextmanager
+def split_batch_norm(model: nn.Module, sizes: Sequence[int]):
+    """Normalise each ``sizes`` slice of the batch on its own inside ``model``.
+
+    While active, every training-mode BatchNorm computes statistics per
+    slice and updates its running stats once per slice, in order -- exactly
+    as if the slices had gone through the model as separate calls. Eval-mode
+    BatchNorm is per-sample anyway and is left alone.
+    """
+
+    sizes = list(sizes)
+    patched = []
+    for module in model.modules():
+        if isinstance(module, nn.modules.batchnorm._BatchNorm) and module.training:
+            def forward(x: torch.Tensor, bn: nn.Module = module) -> torch.Tensor:
+                return torch.cat([type(bn).forward(bn, part) for part in x.split(sizes)])
+
+            module.forward = forward
+            patched.append(module)
+    try:
+        yield model
+    finally:
+        for module in patched:
+            del module.forward
+
+
+def compute_losses(batch: Dict[str, torch.Tensor], model_uv, model_renderer, device,
+                   weights: Dict[str, float],
+                   precision: Optional[TrainPrecision] = None,
+                   fused: bool = False) -> Dict[str, torch.Tensor]:
+    """Forward pass and weighted loss terms for one training batch.
+
+    With ``precision`` the forwards run under its autocast and the outputs
+    are upcast, so the loss terms are always reduced in fp32. ``fused`` runs
+    view_a/view_b through UVPredictor as one batch and the three renderer
+    inputs as another; BatchNorm keeps per-view statistics (see
+    ``split_batch_norm``), so the losses match the unfused step.
+    """
+
+    precision = precision or TrainPrecision(torch.device(device))
+    uv_gt = precision.to_device(batch["uv_gt"])
+    view_a = precision.to_device(batch["view_a"])
+    view_b = precision.to_device(batch["view_b"])
+    mask_a = precision.to_device(batch["mask_a"])
+    mask_b = precision.to_device(batch["mask_b"])
+
+    with precision.autocast():
+        if fused:
+            size = view_a.shape[0]
+            with split_batch_norm(model_uv, [size, size]):
+                uv_pred_a, uv_pred_b = model_uv(torch.cat([view_a, view_b])).split(size)
+            view_recon_a, view_recon_b, view_from_uv = model_renderer(
+                torch.cat([uv_pred_a, uv_pred_b, uv_gt])
+            ).split(size)
+        else:
+            uv_pred_a = model_uv(view_a)
+            uv_pred_b = model_uv(view_b)
 
-    totals = {"cycle": 0.0, "uv_recon": 0.0, "direct": 0.0, "cross": 0.0, "total": 0.0}
+            view_recon_a = model_renderer(uv_pred_a)
+            view_recon_b = model_renderer(uv_pred_b)
 
-    for batch in tqdm(loader, desc="Train", leave=False):
-        uv_gt = batch["uv_gt"].to(device)
-        view_a = batch["view_a"].to(device)
-        view_b = batch["view_b"].to(device)
-        mask_a = batch["mask_a"].to(device)
-        mask_b = batch["mask_b"].to(device)
+            view_from_uv = model_renderer(uv_gt)
+        uv_recon = model_uv(view_from_uv)
 
-        uv_pred_a = model_uv(view_a)
-        uv_pred_b = model_uv(view_b)
+    uv_pred_a, uv_pred_b = uv_pred_a.float(), uv_pred_b.float()
+    view_recon_a, view_recon_b = view_recon_a.float(), view_recon_b.float()
+    uv_recon = uv_recon.float()
 
-        view_recon_a = model_renderer(uv_pred_a)
-        view_recon_b = model_renderer(uv_pred_b)
+    L_cycle = masked_l1(view_recon_a, view_a, mask_a) + masked_l1(view_recon_b, view_b, mask_b)
+    L_cycle /= 2.0
 
-        view_from_uv = model_renderer(uv_gt)
-        uv_recon = model_uv(view_from_uv)
+    L_uv_recon = masked_l1(uv_recon, uv_gt, None)
 
-        L_cycle = masked_l1(view_recon_a, view_a, mask_a) + masked_l1(view_recon_b, view_b, mask_b)
-        L_cycle /= 2.0
+    L_direct = (masked_l1(uv_pred_a, uv_gt, None) + masked_l1(uv_pred_b, uv_gt, None)) / 2.0
 
-        L_uv_recon = masked_l1(uv_recon, uv_gt, None)
+    L_cross = masked_l1(uv_pred_a, uv_pred_b, None)
 
-        L_direct = (masked_l1(uv_pred_a, uv_gt, None) + masked_l1(uv_pred_b, uv_gt, None)) / 2.0
+    loss = (
+        weights["cycle"] * L_cycle
+        + weights["uv_recon"] * L_uv_recon
+        + weights["direct"] * L_direct
+        + weights["cross"] * L_cross
+    )
+    return {"cycle": L_cycle, "uv_recon": L_uv_recon, "direct": L_direct, "cross": L_cross, "total": loss}
 
-        L_cross = masked_l1(uv_pred_a, uv_pred_b, None)
 
-        loss = (
-            weights["cycle"] * L_cycle
-            + weights["uv_recon"] * L_uv_recon
-            + weights["direct"] * L_direct
-            + weights["cross"] * L_cross
-        )
+def train_epoch(loader, model_uv, model_renderer, optim_uv, optim_renderer, device, weights,
+                precision: Optional[TrainPrecision] = None, fused: bool = False):
+    model_uv.train()
+    model_renderer.train()
+    precision = precision or TrainPrecision(torch.device(device))
+
+    totals = {"cycle": 0.0, "uv_recon": 0.0, "direct": 0.0, "cross": 0.0, "total": 0.0}
+
+    for batch in tqdm(loader, desc="Train", leave=False):
+        losses = compute_losses(batch, model_uv, model_renderer, device, weights, precision, fused)
 
         optim_uv.zero_grad()
         optim_renderer.zero_grad()
-        loss.backward()
-        optim_uv.step()
-        optim_renderer.step()
+        precision.backward(losses["total"])
+        precision.step(optim_uv, optim_renderer)
 
-        totals["cycle"] += float(L_cycle.item())
-        totals["uv_recon"] += float(L_uv_recon.item())
-        totals["direct"] += float(L_direct.item())
-        totals["cross"] += float(L_cross.item())
-        totals["total"] += float(loss.item())
+        for key in totals:
+            totals[key] += float(losses[key].item())
 
     for key in totals:
         totals[key] /= len(loader)
@@ -364,7 +801,8 @@ def evaluate(loader, model_uv, model_renderer, device, lpips_net=None, weights=N
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Multi-view cycle consistency training")
-    parser.add_argument("--dataset", type=Path, default=Path("poc_results/augmented_dataset_ginetta"))
+    parser.add_argument("--dataset", type=Path, default=Path("poc_results/augmented_dataset_ginetta"),
+                        help="Augmented dataset directory, metadata.json file, or packed shard directory")
     parser.add_argument("--epochs", type=int, default=50)
     parser.add_argument("--batch-size", type=int, default=6)
     parser.add_argument("--lr", type=float, default=2e-4)
@@ -375,6 +813,26 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--val-split", type=float, default=0.1)
     parser.add_argument("--seed", type=int, default=1337)
     parser.add_argument("--num-workers", type=int, default=0)
+    parser.add_argument("--prefetch-factor", type=int, default=2,
+                        help="Batches prefetched per loader worker")
+    parser.add_argument("--no-persistent-workers", action="store_true",
+                        help="Re-create loader workers every epoch (drops their tensor caches)")
+    parser.add_argument("--cache-mb", type=int, default=1024,
+                        help="Per-process cap for cached preprocessed tensors (0 disables the cache)")
+    parser.add_argument("--group-batches", action="store_true",
+                        help="Batch same-UV samples together and reuse in-batch views as partners")
+    parser.add_argument("--examples-dir", type=Path, default=None,
+                        help="Augment these source pairs on the fly instead of reading --dataset PNGs")
+    parser.add_argument("--samples-per-epoch", type=int, default=512,
+                        help="Training samples drawn per epoch in --examples-dir mode")
+    parser.add_argument("--augment-size", type=int, default=512,
+                        help="Resolution the source pairs are augmented at in --examples-dir mode")
+    parser.add_argument("--batched-augment", action="store_true",
+                        help="With --examples-dir, augment whole batches in tensor space in the collate step")
+    parser.add_argument("--fused-step", action="store_true",
+                        help="Batch view_a/view_b through UVPredictor and all renderer inputs together")
+    add_precision_args(parser)
+    add_compile_args(parser)
     parser.add_argument("--w-cycle", type=float, default=0.30)
     parser.add_argument("--w-uv", type=float, default=0.25)
     parser.add_argument("--w-direct", type=float, default=0.30)
@@ -386,6 +844,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--checkpoint-name", type=str, default="poc_05_best_model.pt")
     parser.add_argument("--checkpoint-every", type=int, default=0,
                         help="Optional frequency (epochs) to snapshot additional checkpoints")
+    parser.add_argument("--keep-checkpoints", type=int, default=3,
+                        help="Periodic snapshots to keep on disk (0 keeps all)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the latest --checkpoint-every snapshot of --checkpoint-name")
+    parser.add_argument("--metrics-stream", type=Path, default=None,
+                        help="Append one JSON line of train/val metrics per epoch (read live by the autorunner)")
     return parser.parse_args()
 
 
@@ -396,28 +860,76 @@ def main() -> None:
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     print(f"Using device: {device}")
 
-    dataset = MultiViewDataset(args.dataset, image_size=args.image_size, seed=args.seed)
-    val_size = max(1, int(len(dataset) * args.val_split))
-    train_size = len(dataset) - val_size
-    train_set, val_set = torch.utils.data.random_split(dataset, [train_size, val_size])
-
-    train_loader = DataLoader(
-        train_set,
-        batch_size=args.batch_size,
-        shuffle=True,
-        num_workers=args.num_workers,
-        drop_last=False,
+    collate_fn = None
+    if args.examples_dir is not None:
+        source = AugmentationSource(args.examples_dir, target_size=args.augment_size)
+        val_size = max(1, int(args.samples_per_epoch * args.val_split))
+        train_set = OnTheFlyMultiViewDataset(source, args.samples_per_epoch, args.image_size, args.seed,
+                                             batched_augment=args.batched_augment)
+        # Separate seed stream, never advanced, so validation is fixed across epochs.
+        val_set = OnTheFlyMultiViewDataset(source, val_size, args.image_size, args.seed + 1,
+                                           batched_augment=args.batched_augment)
+        if args.batched_augment:
+            collate_fn = MultiViewAugmentCollate()
+    else:
+        if is_sharded(args.dataset):
+            dataset = ShardedMultiViewDataset(args.dataset, image_size=args.image_size, seed=args.seed)
+        else:
+            dataset = MultiViewDataset(args.dataset, image_size=args.image_size, seed=args.seed,
+                                       cache_bytes=args.cache_mb * 1024 * 1024)
+        val_size = max(1, int(len(dataset) * args.val_split))
+        train_size = len(dataset) - val_size
+        train_set, val_set = torch.utils.data.random_split(dataset, [train_size, val_size])
+        if args.group_batches and isinstance(dataset, MultiViewDataset):
+            train_set = InBatchPartnerSubset(dataset, train_set.indices)
+
+    options = loader_options(
+        args.num_workers,
+        args.seed,
+        persistent_workers=not args.no_persistent_workers,
+        prefetch_factor=args.prefetch_factor,
+        pin_memory=device.type == "cuda",
     )
+    batch_sampler = None
+    train_sampler = EpochRandomSampler(len(train_set), seed=args.seed)
+    if args.group_batches and hasattr(getattr(train_set, "dataset", None), "sample_group"):
+        batch_sampler = GroupedBatchSampler(
+            train_set.dataset.sample_group[train_set.indices], args.batch_size, seed=args.seed
+        )
+        train_loader = DataLoader(
+            train_set,
+            batch_sampler=batch_sampler,
+            collate_fn=collate_fn,
+            **options,
+        )
+    else:
+        train_loader = DataLoader(
+            train_set,
+            batch_size=args.batch_size,
+            sampler=train_sampler,
+            drop_last=False,
+            collate_fn=collate_fn,
+            **options,
+        )
     val_loader = DataLoader(
         val_set,
         batch_size=args.batch_size,
         shuffle=False,
-        num_workers=args.num_workers,
         drop_last=False,
+        collate_fn=collate_fn,
+        **options,
     )
-
-    model_uv = UVPredictor().to(device)
-    model_renderer = Renderer().to(device)
+    train_source = getattr(train_set, "dataset", train_set)
+    val_source = getattr(val_set, "dataset", val_set)
+
+    precision = TrainPrecision.from_args(args, device)
+    print(f"Precision: {precision.describe()}")
+    model_uv = precision.prepare_model(UVPredictor())
+    model_renderer = precision.prepare_model(Renderer())
+    if args.compile:
+        example = precision.to_device(torch.zeros(args.batch_size, 3, args.image_size, args.image_size))
+        compiled = compile_models([model_uv, model_renderer], example, args.compile_cache)
+        print(f"Compiled models with {compiled['backend']} in {compiled['setup_seconds']:.1f}s")
 
     optim_uv = torch.optim.Adam(model_uv.parameters(), lr=args.lr, betas=(0.5, 0.999))
     optim_renderer = torch.optim.Adam(model_renderer.parameters(), lr=args.lr, betas=(0.5, 0.999))
@@ -431,9 +943,6 @@ def main() -> None:
 
     lpips_net = lpips.LPIPS(net="alex").to(device) if lpips is not None else None
 
-    best_val = float("inf")
-    best_state = None
-
     def build_weights(epoch: int) -> Dict[str, float]:
         def interp(start: float, end: Optional[float]) -> float:
             target = start if end is None else end
@@ -451,64 +960,145 @@ def main() -> None:
             "cross": interp(args.w_cross, args.w_cross_end),
         }
 
-    for epoch in range(1, args.epochs + 1):
-        epoch_weights = build_weights(epoch)
-        metrics_train = train_epoch(
-            train_loader, model_uv, model_renderer, optim_uv, optim_renderer, device, epoch_weights
-        )
-        metrics_val = evaluate(val_loader, model_uv, model_renderer, device, lpips_net, epoch_weights)
+    output_dir = Path("poc_results")
+    checkpoints = CheckpointManager(output_dir, Path(args.checkpoint_name).stem, keep_last=args.keep_checkpoints)
+    best_val = float("inf")
+    best_record: Optional[Dict] = None
+    history: List[Dict] = []
+    start_epoch = 1
 
-        if args.lr_scheduler != "none":
-            for scheduler in schedulers:
-                scheduler.step()
+    def training_state(epoch: int, metrics: Dict[str, float], weights: Dict[str, float]) -> Dict:
+        """Everything needed to continue bit-exactly after ``epoch``."""
 
-        val_score = metrics_val["total"]
+        return {
+            "uv": model_uv.state_dict(),
+            "renderer": model_renderer.state_dict(),
+            "metrics": metrics,
+            "weights": weights,
+            "epoch": epoch,
+            "args": vars(args),
+            "optimizers": {"uv": optim_uv.state_dict(), "renderer": optim_renderer.state_dict()},
+            "schedulers": [scheduler.state_dict() for scheduler in schedulers],
+            "precision": precision.state_dict(),
+            "rng": capture_rng_state(),
+            "loader_generators": {"train": train_loader.generator.get_state(),
+                                  "val": val_loader.generator.get_state()},
+            "best_val": best_val,
+            "best_record": best_record,
+            "history": history,
+        }
 
-        print(
-            f"Epoch {epoch:03d}/{args.epochs} | "
-            f"Train L_total: {metrics_train['total']:.4f} | "
-            f"Val L_total: {val_score:.4f} | "
-            f"Val SSIM(View): {metrics_val['ssim_view']:.3f} | "
-            f"Val SSIM(UV): {metrics_val['ssim_uv']:.3f} | "
-            f"Val LPIPS(View): {metrics_val['lpips_view']:.3f}"
-        )
+    def metrics_sidecar(epoch: int, metrics: Dict[str, float], weights: Dict[str, float]) -> Dict:
+        """``.metrics.json`` contents: this checkpoint's metrics plus the run so far."""
 
-        if val_score < best_val:
-            best_val = val_score
-            best_state = {
-                "uv": model_uv.state_dict(),
-                "renderer": model_renderer.state_dict(),
-                "metrics": metrics_val,
-                "weights": epoch_weights,
-                "epoch": epoch,
-                "args": vars(args),
-            }
+        return {
+            "epoch": epoch,
+            "metrics": metrics,
+            "weights": weights,
+            "best_val": best_val,
+            "history": history,
+            "args": vars(args),
+        }
 
-        if args.checkpoint_every and epoch % args.checkpoint_every == 0:
-            output_dir = Path("poc_results")
-            output_dir.mkdir(exist_ok=True)
-            snapshot_path = output_dir / f"{Path(args.checkpoint_name).stem}_epoch{epoch:03d}.pt"
-            torch.save(
-                {
-                    "uv": model_uv.state_dict(),
-                    "renderer": model_renderer.state_dict(),
-                    "metrics": metrics_val,
-                    "weights": epoch_weights,
-                    "epoch": epoch,
-                    "args": vars(args),
-                },
-                snapshot_path,
+    if args.resume:
+        snapshot_path = checkpoints.latest_snapshot()
+        if snapshot_path is None:
+            print(f"No {checkpoints.stem}_epochNNN.pt snapshot in {output_dir}; starting from scratch")
+        else:
+            state = torch.load(snapshot_path, map_location=device, weights_only=False)
+            model_uv.load_state_dict(state["uv"])
+            model_renderer.load_state_dict(state["renderer"])
+            optim_uv.load_state_dict(state["optimizers"]["uv"])
+            optim_renderer.load_state_dict(state["optimizers"]["renderer"])
+            for scheduler, scheduler_state in zip(schedulers, state["schedulers"]):
+                scheduler.load_state_dict(scheduler_state)
+            precision.load_state_dict(state["precision"])
+            restore_rng_state(state["rng"])
+            train_loader.generator.set_state(state["loader_generators"]["train"])
+            val_loader.generator.set_state(state["loader_generators"]["val"])
+            best_val = state["best_val"]
+            best_record = state.get("best_record")
+            history = state.get("history", [])
+            start_epoch = state["epoch"] + 1
+            print(f"Resumed from {snapshot_path} (epoch {state['epoch']})")
+
+    try:
+        for epoch in range(start_epoch, args.epochs + 1):
+            epoch_start = time.time()
+            epoch_weights = build_weights(epoch)
+            epoch_lr = optim_uv.param_groups[0]["lr"]
+            train_sampler.set_epoch(epoch)
+            if batch_sampler is not None:
+                batch_sampler.set_epoch(epoch)
+            train_source.set_epoch(epoch)
+            metrics_train = train_epoch(
+                train_loader, model_uv, model_renderer, optim_uv, optim_renderer, device, epoch_weights,
+                precision, fused=args.fused_step,
             )
-            print(f"Saved periodic checkpoint to {snapshot_path}")
+            if val_source is train_source:
+                # Same draws every epoch so validation scores stay comparable.
+                val_source.set_epoch(0)
+            metrics_val = evaluate(val_loader, model_uv, model_renderer, device, lpips_net, epoch_weights)
 
-    if best_state is not None:
-        output_dir = Path("poc_results")
-        output_dir.mkdir(exist_ok=True)
-        checkpoint_path = output_dir / args.checkpoint_name
-        torch.save(best_state, checkpoint_path)
-        print(f"Saved best checkpoint to {checkpoint_path}")
-        print(f"Best Val Metrics: {best_state['metrics']}")
+            if args.lr_scheduler != "none":
+                for scheduler in schedulers:
+                    scheduler.step()
+
+            val_score = metrics_val["total"]
+            history.append({
+                "epoch": epoch,
+                "train": metrics_train,
+                "val": metrics_val,
+                "weights": epoch_weights,
+                "lr": epoch_lr,
+                "seconds": time.time() - epoch_start,
+            })
+            if args.metrics_stream is not None:
+                args.metrics_stream.parent.mkdir(parents=True, exist_ok=True)
+                with args.metrics_stream.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(history[-1]) + "\n")
+
+            print(
+                f"Epoch {epoch:03d}/{args.epochs} | "
+                f"Train L_total: {metrics_train['total']:.4f} | "
+                f"Val L_total: {val_score:.4f} | "
+                f"Val SSIM(View): {metrics_val['ssim_view']:.3f} | "
+                f"Val SSIM(UV): {metrics_val['ssim_uv']:.3f} | "
+                f"Val LPIPS(View): {metrics_val['lpips_view']:.3f}"
+            )
 
+            if val_score < best_val:
+                best_val = val_score
+                best_record = {"epoch": epoch, "metrics": metrics_val, "weights": epoch_weights}
+                checkpoints.save(
+                    {
+                        "uv": model_uv.state_dict(),
+                        "renderer": model_renderer.state_dict(),
+                        "metrics": metrics_val,
+                        "weights": epoch_weights,
+                        "epoch": epoch,
+                        "args": vars(args),
+                    },
+                    output_dir / args.checkpoint_name,
+                    metrics=metrics_sidecar(epoch, metrics_val, epoch_weights),
+                )
+
+            if args.checkpoint_every and epoch % args.checkpoint_every == 0:
+                snapshot_path = checkpoints.save_snapshot(
+                    training_state(epoch, metrics_val, epoch_weights), epoch,
+                    metrics=metrics_sidecar(epoch, metrics_val, epoch_weights),
+                )
+                print(f"Queued periodic checkpoint {snapshot_path}")
+    finally:
+        checkpoints.close()
+
+    if best_record is not None:
+        # Re-point the best checkpoint's sidecar at the full run history.
+        best_path = output_dir / args.checkpoint_name
+        sidecar = metrics_sidecar(best_record["epoch"], best_record["metrics"], best_record["weights"])
+        write_metrics_sidecar(best_path, json.dumps(dict(sidecar, completed=True), indent=2, default=str))
+        print(f"Saved best checkpoint to {best_path}")
+        print(f"Best Val Metrics: {best_record['metrics']}")
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,34 @@
-"""POC 5 Visualization: Inspect multi-view checkpoint predictions."""
+"""POC 5 Visualization: Inspect multi-view checkpoint predictions.
+
+``visualize`` is also the in-process API used by the autorunner. It takes
+already-built models and dataset, runs all samples in one batched forward,
+and renders the grids on a background thread.
+"""
 
 from __future__ import annotations
 
 import argparse
 from pathlib import Path
-from typing import List
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 import numpy as np
 import torch
 from PIL import Image, ImageDraw, ImageFont
+from torch.utils.data import Dataset, default_collate
+
+from poc_03_pack_shards import is_sharded
+from poc_05_training_multiview import MultiViewDataset, Renderer, ShardedMultiViewDataset, UVPredictor
 
-from poc_05_training_multiview import MultiViewDataset, Renderer, UVPredictor
+LABELS = [
+    "Input View",
+    "Reproj (Pred)",
+    "Reproj (GT)",
+    "Pred UV",
+    "GT UV",
+    "Partner View",
+]
+GRID_KEYS = ["view_a", "view_pred", "view_from_gt", "uv_pred", "uv_gt", "view_b"]
 
 
 def parse_args() -> argparse.Namespace:
@@ -58,59 +76,100 @@ def build_grid(images: List[Image.Image], labels: List[str], size: int) -> Image
     return canvas
 
 
-def main() -> None:
-    args = parse_args()
+def open_dataset(dataset_path: Path, image_size: int, seed: int) -> Dataset:
+    """PNG or sharded multi-view dataset with the epoch-0 partner draws."""
 
-    checkpoint = torch.load(args.checkpoint, map_location=args.device, weights_only=False)
+    if is_sharded(dataset_path):
+        dataset = ShardedMultiViewDataset(dataset_path, image_size=image_size, seed=seed)
+    else:
+        dataset = MultiViewDataset(dataset_path, image_size=image_size, seed=seed)
+    dataset.set_epoch(0)
+    return dataset
 
-    model_uv = UVPredictor().to(args.device)
-    model_renderer = Renderer().to(args.device)
+
+def load_checkpoint_into(model_uv: UVPredictor, model_renderer: Renderer, checkpoint_path: Path,
+                         device: torch.device) -> Dict:
+    checkpoint = torch.load(checkpoint_path, map_location=device, weights_only=False)
     model_uv.load_state_dict(checkpoint["uv"])
     model_renderer.load_state_dict(checkpoint["renderer"])
+    return checkpoint
+
+
+@torch.no_grad()
+def predict_samples(model_uv: UVPredictor, model_renderer: Renderer, dataset: Dataset, num_samples: int,
+                    device: torch.device) -> Dict[str, torch.Tensor]:
+    """Run the first ``num_samples`` samples through both models as one batch."""
+
+    count = min(num_samples, len(dataset))
+    batch = default_collate([dataset[index] for index in range(count)])
+    view_a = batch["view_a"].to(device)
+    uv_gt = batch["uv_gt"].to(device)
+
+    was_training = model_uv.training, model_renderer.training
     model_uv.eval()
     model_renderer.eval()
+    try:
+        uv_pred = model_uv(view_a)
+        view_pred, view_from_gt = model_renderer(torch.cat([uv_pred, uv_gt])).split(count)
+    finally:
+        model_uv.train(was_training[0])
+        model_renderer.train(was_training[1])
+
+    outputs = {
+        "view_a": view_a,
+        "view_pred": view_pred,
+        "view_from_gt": view_from_gt,
+        "uv_pred": uv_pred,
+        "uv_gt": uv_gt,
+        "view_b": batch["view_b"],
+    }
+    return {key: value.cpu() for key, value in outputs.items()}
+
+
+def render_grids(outputs: Dict[str, torch.Tensor], output_dir: Path, size: int) -> List[Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index in range(outputs["view_a"].shape[0]):
+        images = [tensor_to_image(outputs[key][index]) for key in GRID_KEYS]
+        output_path = output_dir / f"sample_{index:03d}.png"
+        build_grid(images, LABELS, size).save(output_path)
+        paths.append(output_path)
+    return paths
+
+
+_render_pool: Optional[ThreadPoolExecutor] = None
+
+
+def visualize(model_uv: UVPredictor, model_renderer: Renderer, dataset: Dataset, output_dir: Path,
+              num_samples: int, device: torch.device, image_size: int,
+              executor: Optional[Executor] = None) -> Future:
+    """Batched forward on the calling thread; grids render and save in the background.
+
+    Returns a future for the written paths. The outputs are already on the
+    CPU, so the caller can go on to load the next checkpoint at once.
+    """
+
+    global _render_pool
+    outputs = predict_samples(model_uv, model_renderer, dataset, num_samples, device)
+    if executor is None:
+        if _render_pool is None:
+            _render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        executor = _render_pool
+    return executor.submit(render_grids, outputs, output_dir, image_size)
+
+
+def main() -> None:
+    args = parse_args()
+    device = torch.device(args.device)
 
-    dataset = MultiViewDataset(args.dataset, image_size=args.image_size, seed=args.seed)
-    dataset.rng.seed(args.seed)
-
-    args.output.mkdir(parents=True, exist_ok=True)
-
-    labels = [
-        "Input View",
-        "Reproj (Pred)",
-        "Reproj (GT)",
-        "Pred UV",
-        "GT UV",
-        "Partner View",
-    ]
-
-    max_idx = min(args.num_samples, len(dataset))
-
-    with torch.no_grad():
-        for index in range(max_idx):
-            sample = dataset[index]
-            view_a = sample["view_a"].unsqueeze(0).to(args.device)
-            uv_gt = sample["uv_gt"].unsqueeze(0).to(args.device)
-            view_b = sample["view_b"]
-
-            uv_pred = model_uv(view_a)
-            view_pred = model_renderer(uv_pred)
-            view_from_gt = model_renderer(uv_gt)
-
-            images = [
-                tensor_to_image(view_a.squeeze(0)),
-                tensor_to_image(view_pred.squeeze(0)),
-                tensor_to_image(view_from_gt.squeeze(0)),
-                tensor_to_image(uv_pred.squeeze(0)),
-                tensor_to_image(uv_gt.squeeze(0)),
-                tensor_to_image(view_b),
-            ]
-
-            grid = build_grid(images, labels, args.image_size)
-            output_path = args.output / f"sample_{index:03d}.png"
-            grid.save(output_path)
-            print(f"Saved visualization to {output_path}")
+    model_uv = UVPredictor().to(device)
+    model_renderer = Renderer().to(device)
+    load_checkpoint_into(model_uv, model_renderer, args.checkpoint, device)
+    dataset = open_dataset(args.dataset, args.image_size, args.seed)
 
+    for output_path in visualize(model_uv, model_renderer, dataset, args.output, args.num_samples,
+                                 device, args.image_size).result():
+        print(f"Saved visualization to {output_path}")
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,36 @@
 """
 AMS2 AI Livery Designer - Python Backend Services
+
+Services are imported lazily so that importing the package (e.g. for the
+device probe) does not pull in torch, cv2 or diffusers at startup.
 """
 
-from .image_processor import ImageProcessor
-from .ai_generator import AIGenerator
-from .dds_exporter import DDSExporter
+import importlib
+
+_SERVICE_MODULES = {
+    "ImageProcessor": ".image_processor",
+    "AIGenerator": ".ai_generator",
+    "DDSExporter": ".dds_exporter",
+    "DeviceProbe": ".device_probe",
+    "MetricsRegistry": ".metrics",
+    "AdmissionController": ".admission",
+}
 
 __all__ = [
     "ImageProcessor",
     "AIGenerator", 
-    "DDSExporter"
+    "DDSExporter",
+    "DeviceProbe",
+    "MetricsRegistry",
+    "AdmissionController"
 ]
+
+
+def __getattr__(name):
+    """Import service classes on first access (PEP 562)"""
+    if name in _SERVICE_MODULES:
+        module = importlib.import_module(_SERVICE_MODULES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
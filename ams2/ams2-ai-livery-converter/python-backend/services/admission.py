@@ -0,0 +1,257 @@
+"""
+Admission Control Service
+Per-route concurrency limits and a memory-budget-aware queue for the
+generation endpoints; overload is shed with 429 + Retry-After
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+from .metrics import MetricsRegistry, registry as default_registry
+
+
+@dataclass
+class RoutePolicy:
+    """Limits for one guarded route.
+
+    ``working_set_bytes`` is the estimated peak memory of one job; uploads add
+    ``bytes_per_request_byte`` times their ``Content-Length`` on top, since a
+    compressed photo expands several-fold once decoded into float buffers.
+    """
+
+    max_concurrency: int
+    max_queue: int = 8
+    queue_timeout_seconds: float = 30.0
+    working_set_bytes: int = 256 * 1024 * 1024
+    bytes_per_request_byte: float = 0.0
+    default_job_seconds: float = 10.0
+
+    def estimate_bytes(self, content_length: int) -> int:
+        return int(self.working_set_bytes + content_length * self.bytes_per_request_byte)
+
+
+@dataclass
+class _RouteState:
+    policy: RoutePolicy
+    active: int = 0
+    queued: int = 0
+    avg_job_seconds: Optional[float] = None
+    shed: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _Waiter:
+    route: str
+    cost: int
+    future: asyncio.Future
+
+
+class AdmissionRejected(Exception):
+    """Raised when a job cannot be admitted; carries the suggested retry delay."""
+
+    def __init__(self, route: str, reason: str, retry_after: int):
+        super().__init__(f"{route}: {reason}")
+        self.route = route
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Per-route concurrency limits plus a shared memory budget.
+
+    Each route queues FIFO on its own: a job waiting for budget on one route
+    never holds up an idle route whose job fits.
+    """
+
+    def __init__(
+        self,
+        policies: Dict[str, RoutePolicy],
+        memory_budget_bytes: int,
+        registry: Optional[MetricsRegistry] = None,
+        ewma_alpha: float = 0.2,
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ewma_alpha = ewma_alpha
+        self.registry = registry or default_registry
+        self._routes = {route: _RouteState(policy) for route, policy in policies.items()}
+        self._reserved_bytes = 0
+        self._waiters: Deque[_Waiter] = deque()
+
+    def guards(self, route: str) -> bool:
+        return route in self._routes
+
+    def estimate_bytes(self, route: str, content_length: int) -> int:
+        return self._routes[route].policy.estimate_bytes(content_length)
+
+    def _fits(self, state: _RouteState, cost: int) -> bool:
+        return (
+            state.active < state.policy.max_concurrency
+            and self._reserved_bytes + cost <= self.memory_budget_bytes
+        )
+
+    def _has_waiters(self, route: str) -> bool:
+        return any(waiter.route == route and not waiter.future.done() for waiter in self._waiters)
+
+    def _grant(self, route: str, cost: int) -> None:
+        self._routes[route].active += 1
+        self._reserved_bytes += cost
+        self._publish(route)
+
+    def retry_after(self, route: str) -> int:
+        """Estimate seconds until a new job could start, from observed throughput."""
+        state = self._routes[route]
+        job_seconds = state.avg_job_seconds or state.policy.default_job_seconds
+        waves = (state.queued + 1) / state.policy.max_concurrency
+        return max(1, math.ceil(waves * job_seconds))
+
+    def _shed(self, route: str, reason: str) -> AdmissionRejected:
+        state = self._routes[route]
+        state.shed[reason] = state.shed.get(reason, 0) + 1
+        self.registry.inc("admission_shed_total", (("route", route), ("reason", reason)))
+        return AdmissionRejected(route, reason, self.retry_after(route))
+
+    async def acquire(self, route: str, cost: int) -> None:
+        """Reserve a slot and ``cost`` bytes, waiting in the queue if allowed."""
+        state = self._routes[route]
+        if cost > self.memory_budget_bytes:
+            raise self._shed(route, "too_large")
+        if not self._has_waiters(route) and self._fits(state, cost):
+            self._grant(route, cost)
+            return
+        if state.queued >= state.policy.max_queue:
+            raise self._shed(route, "queue_full")
+
+        waiter = _Waiter(route, cost, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        state.queued += 1
+        self._publish(route)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), state.policy.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            if waiter.future.done():  # granted just as the timeout fired
+                return
+            self._waiters.remove(waiter)
+            self._wake()  # waiters queued behind this one may fit now
+            raise self._shed(route, "queue_timeout") from None
+        except asyncio.CancelledError:  # client went away while queued
+            if waiter.future.done():
+                self._free(route, cost)
+            else:
+                self._waiters.remove(waiter)
+                self._wake()
+            raise
+        finally:
+            state.queued -= 1
+            self._publish(route)
+
+    def release(self, route: str, cost: int, elapsed_seconds: float) -> None:
+        """Return a slot, update the throughput estimate and wake queued jobs."""
+        state = self._routes[route]
+        if state.avg_job_seconds is None:
+            state.avg_job_seconds = elapsed_seconds
+        else:
+            state.avg_job_seconds += self.ewma_alpha * (elapsed_seconds - state.avg_job_seconds)
+        self._free(route, cost)
+
+    def _free(self, route: str, cost: int) -> None:
+        self._routes[route].active -= 1
+        self._reserved_bytes -= cost
+        self._wake()
+        self._publish(route)
+
+    def _wake(self) -> None:
+        """Grant every route's queue head that fits.
+
+        A head that does not fit keeps its own route's later waiters behind
+        it, but never those of other routes.
+        """
+        blocked = set()
+        for waiter in list(self._waiters):
+            if waiter.future.done():
+                self._waiters.remove(waiter)
+            elif waiter.route in blocked:
+                continue
+            elif self._fits(self._routes[waiter.route], waiter.cost):
+                self._waiters.remove(waiter)
+                self._grant(waiter.route, waiter.cost)
+                waiter.future.set_result(None)
+            else:
+                blocked.add(waiter.route)
+
+    def _publish(self, route: str) -> None:
+        state = self._routes[route]
+        labels = (("route", route),)
+        self.registry.set_gauge("admission_active_jobs", state.active, labels)
+        self.registry.set_gauge("admission_queued_jobs", state.queued, labels)
+        self.registry.set_gauge("admission_reserved_bytes", self._reserved_bytes)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "reserved_bytes": self._reserved_bytes,
+            "routes": {
+                route: {
+                    "active": state.active,
+                    "queued": state.queued,
+                    "avg_job_seconds": state.avg_job_seconds,
+                    "shed": dict(state.shed),
+                }
+                for route, state in self._routes.items()
+            },
+        }
+
+
+class AdmissionMiddleware:
+    """Gate guarded routes before the request body is read; fast-fail with 429."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        route = scope.get("path", "")
+        if scope["type"] != "http" or scope["method"] != "POST" or not self.controller.guards(route):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = 0
+        for key, value in scope["headers"]:
+            if key == b"content-length":
+                content_length = int(value) if value.isdigit() else 0
+                break
+        cost = self.controller.estimate_bytes(route, content_length)
+
+        try:
+            await self.controller.acquire(route, cost)
+        except AdmissionRejected as exc:
+            await self._reject(send, exc)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route, cost, time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(send, exc: AdmissionRejected) -> None:
+        body = json.dumps(
+            {"error": "Server busy", "reason": exc.reason, "retry_after_seconds": exc.retry_after}
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(exc.retry_after).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -3,11 +3,12 @@ AI Generation Service
 Handles SDXL + ControlNet livery generation
 """
 
-import torch
 import numpy as np
 from typing import Optional, List, Dict
 from PIL import Image
 
+from .metrics import stage_timer
+
 
 class AIGenerator:
     """
@@ -28,6 +29,8 @@ class AIGenerator:
         Args:
             device: "cuda" or "cpu"
         """
+        import torch  # Lazy: keeps torch out of backend cold start
+
         self.device = device if torch.cuda.is_available() else "cpu"
         self.sdxl_pipeline = None
         self.controlnet = None
@@ -38,6 +41,8 @@ class AIGenerator:
     def load_models(self):
         """Load SDXL, ControlNet, and IPAdapter models"""
         # TODO: Implement in Week 2
+        # Import diffusers here, not at module level, so only the
+        # generation path pays its import cost.
         # from diffusers import StableDiffusionXLPipeline, ControlNetModel
         # 
         # # Load SDXL base model
@@ -84,11 +89,12 @@ class AIGenerator:
         """
         # TODO: Implement SDXL + ControlNet generation in Week 5
         # For now, return placeholder
-        print(f"Generating with prompt: {prompt}")
-        print(f"Steps: {num_inference_steps}, Guidance: {guidance_scale}")
-        
-        # Return dummy 1024x1024 image
-        return np.zeros((1024, 1024, 3), dtype=np.uint8)
+        with stage_timer("inference"):
+            print(f"Generating with prompt: {prompt}")
+            print(f"Steps: {num_inference_steps}, Guidance: {guidance_scale}")
+
+            # Return dummy 1024x1024 image
+            return np.zeros((1024, 1024, 3), dtype=np.uint8)
     
     def project_to_uv_space(
         self,
@@ -7,6 +7,8 @@ import numpy as np
 from PIL import Image
 from typing import Optional, Literal
 
+from .metrics import stage_timer
+
 
 class DDSExporter:
     """
@@ -52,9 +54,10 @@ class DDSExporter:
         # TODO: Implement DDS export in Week 6
         # For now, save as PNG
         try:
-            img = Image.fromarray(texture)
-            png_path = output_path.replace('.dds', '.png')
-            img.save(png_path)
+            with stage_timer("encode"):
+                img = Image.fromarray(texture)
+                png_path = output_path.replace('.dds', '.png')
+                img.save(png_path)
             print(f"Saved as PNG (DDS export coming in Week 6): {png_path}")
             return True
         except Exception as e:
@@ -0,0 +1,229 @@
+"""
+Device Probe Service
+Caches GPU/CPU capability information so request handlers never touch torch
+"""
+
+import os
+import platform
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# CPU instruction sets that matter for CPU-only inference sizing
+ISA_FEATURES = ["SSE4_2", "AVX", "AVX2", "FMA3", "AVX512F", "AVX512BW", "AVX512_VNNI", "AVX512_BF16"]
+
+# /proc/cpuinfo spells a few flags differently from NumPy's feature table
+_CPUINFO_FLAGS = {
+    "SSE4_2": "sse4_2",
+    "AVX": "avx",
+    "AVX2": "avx2",
+    "FMA3": "fma",
+    "AVX512F": "avx512f",
+    "AVX512BW": "avx512bw",
+    "AVX512_VNNI": "avx512_vnni",
+    "AVX512_BF16": "avx512_bf16",
+}
+
+
+def _cpu_flags_from_proc() -> Optional[set]:
+    """Read CPU flags from /proc/cpuinfo (Linux only)"""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return None
+
+
+def _cpu_flags_from_numpy() -> Optional[Dict[str, bool]]:
+    """Read runtime CPU dispatch features detected by NumPy (all platforms)"""
+    try:
+        from numpy._core._multiarray_umath import __cpu_features__
+    except ImportError:
+        try:
+            from numpy.core._multiarray_umath import __cpu_features__
+        except ImportError:
+            return None
+    return dict(__cpu_features__)
+
+
+def detect_isa_features() -> List[str]:
+    """
+    Detect supported SIMD instruction sets
+
+    Returns:
+        Feature names from ISA_FEATURES supported by this CPU, in ISA_FEATURES order
+    """
+    proc_flags = _cpu_flags_from_proc()
+    if proc_flags is not None:
+        return [name for name in ISA_FEATURES if _CPUINFO_FLAGS[name] in proc_flags]
+
+    numpy_flags = _cpu_flags_from_numpy()
+    if numpy_flags is not None:
+        aliases = {"FMA3": "FMA3", "AVX512_VNNI": "AVX512VNNI", "AVX512_BF16": "AVX512BF16"}
+        return [name for name in ISA_FEATURES if numpy_flags.get(aliases.get(name, name), False)]
+
+    return []
+
+
+def _memory_from_proc() -> Optional[Tuple[float, float]]:
+    """Read (total, available) bytes from /proc/meminfo (Linux only)"""
+    fields: Dict[str, float] = {}
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                fields[key] = float(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    if "MemTotal" not in fields or "MemAvailable" not in fields:
+        return None
+    return fields["MemTotal"], fields["MemAvailable"]
+
+
+def probe_cpu() -> Dict[str, Any]:
+    """
+    Probe CPU core count, memory and instruction set support
+
+    Returns:
+        CPU capability dict
+    """
+    logical_cores = os.cpu_count() or 1
+    try:
+        usable_cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # Windows/macOS
+        usable_cores = logical_cores
+
+    total_ram_gb = None
+    available_ram_gb = None
+    try:
+        import psutil
+
+        memory = psutil.virtual_memory()
+        total_ram_gb = round(memory.total / 1e9, 2)
+        available_ram_gb = round(memory.available / 1e9, 2)
+    except ImportError:
+        memory = _memory_from_proc()
+        if memory is not None:
+            total_ram_gb = round(memory[0] / 1e9, 2)
+            available_ram_gb = round(memory[1] / 1e9, 2)
+        elif hasattr(os, "sysconf"):
+            # SC_AVPHYS_PAGES is missing on macOS; leave whatever is unknown as None
+            try:
+                page_size = os.sysconf("SC_PAGE_SIZE")
+                total_ram_gb = round(os.sysconf("SC_PHYS_PAGES") * page_size / 1e9, 2)
+                available_ram_gb = round(os.sysconf("SC_AVPHYS_PAGES") * page_size / 1e9, 2)
+            except (ValueError, OSError):
+                pass
+
+    return {
+        "architecture": platform.machine(),
+        "logical_cores": logical_cores,
+        "usable_cores": usable_cores,
+        "total_ram_gb": total_ram_gb,
+        "available_ram_gb": available_ram_gb,
+        "isa_features": detect_isa_features(),
+    }
+
+
+def probe_gpu() -> Dict[str, Any]:
+    """
+    Probe CUDA GPU availability (imports torch, so keep off the request path)
+
+    Returns:
+        GPU capability dict, same shape as the legacy check_gpu() payload
+    """
+    try:
+        import torch
+    except ImportError:
+        return {"available": False, "error": "PyTorch not installed"}
+
+    if torch.cuda.is_available():
+        props = torch.cuda.get_device_properties(0)
+        return {
+            "available": True,
+            "name": torch.cuda.get_device_name(0),
+            "memory_gb": round(props.total_memory / 1e9, 2),  # GB
+            "cuda_version": torch.version.cuda,
+            "device_count": torch.cuda.device_count(),
+        }
+    return {"available": False}
+
+
+class DeviceProbe:
+    """
+    Background device-capability service
+
+    Probes once in a daemon thread, caches the result and refreshes it on a
+    timer. snapshot() only reads the cache, so /health stays cheap no matter
+    how often a load balancer polls it.
+    """
+
+    def __init__(self, refresh_seconds: float = 300.0):
+        """
+        Initialize device probe
+
+        Args:
+            refresh_seconds: Interval between background re-probes (0 = probe once)
+        """
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: Dict[str, Any] = {
+            "status": "pending",
+            "probed_at": None,
+            "gpu": {"available": False},
+            "cpu": None,
+        }
+
+    def refresh(self) -> Dict[str, Any]:
+        """Run a synchronous probe and update the cache"""
+        snapshot = {
+            "status": "ready",
+            "probed_at": time.time(),
+            "gpu": probe_gpu(),
+            "cpu": probe_cpu(),
+        }
+        with self._lock:
+            self._snapshot = snapshot
+        self._ready.set()
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cached capability record without probing"""
+        with self._lock:
+            return self._snapshot
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first probe has completed"""
+        return self._ready.wait(timeout)
+
+    def start(self) -> None:
+        """Start the background probe thread (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="device-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the refresh loop"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Device probe failed: {e}")
+            if not self.refresh_seconds:
+                break
+            self._stop.wait(self.refresh_seconds)
@@ -5,9 +5,10 @@ Handles photo preprocessing, background removal, and image transformations
 
 import numpy as np
 from PIL import Image
-import cv2
 from typing import Optional, Tuple
 
+from .metrics import stage_timer
+
 
 class ImageProcessor:
     """
@@ -56,6 +57,8 @@ class ImageProcessor:
         Returns:
             Normalized image
         """
+        import cv2  # Lazy: keeps OpenCV out of backend cold start
+
         # Basic normalization
         image = cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX)
         return image
@@ -110,10 +113,13 @@ class ImageProcessor:
         Returns:
             Preprocessed image ready for SDXL/ControlNet
         """
-        # Resize to target size
-        image = cv2.resize(image, target_size, interpolation=cv2.INTER_LANCZOS4)
-        
-        # Normalize to [0, 1] range
-        image = image.astype(np.float32) / 255.0
+        import cv2
+
+        with stage_timer("preprocess"):
+            # Resize to target size
+            image = cv2.resize(image, target_size, interpolation=cv2.INTER_LANCZOS4)
+
+            # Normalize to [0, 1] range
+            image = image.astype(np.float32) / 255.0
         
         return image
@@ -0,0 +1,200 @@
+"""
+Metrics Service
+Per-route latency histograms, in-flight counts, request/response sizes and
+pipeline stage timings, exposed in Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+SIZE_BUCKETS = (256, 1024, 16_384, 131_072, 1_048_576, 8_388_608, 33_554_432, 134_217_728)
+UNMATCHED_ROUTE = "<unmatched>"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram (observe = one bisect + two adds)"""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _format_number(value: float) -> str:
+    """Exact exposition formatting (``:g`` would round byte-sized bounds)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: Labels, extra: Optional[str] = None) -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process metrics store
+
+    Services push stage timings with stage_timer(); the request middleware
+    records per-route latency and sizes. render() produces the /metrics body.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def observe(self, name: str, value: float, labels: Labels = (),
+                bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(bounds)
+            histogram.observe(value)
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def add_gauge(self, name: str, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: Labels = ()) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[labels] = value
+
+    def render(self) -> str:
+        """Serialise all series in Prometheus text exposition format"""
+        lines: List[str] = []
+        le_inf = 'le="+Inf"'
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, series in sorted(store.items()):
+                    self._header(lines, name, kind)
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, "histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds, histogram.counts):
+                        cumulative += count
+                        le = f'le="{_format_number(bound)}"'
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, le_inf)} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str, kind: str) -> None:
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+registry = MetricsRegistry()
+registry.describe("http_request_duration_seconds", "Request latency by route.")
+registry.describe("http_request_size_bytes", "Request body size by route.")
+registry.describe("http_response_size_bytes", "Response body size by route.")
+registry.describe("http_requests_total", "Completed requests by route and status.")
+registry.describe("http_requests_in_flight", "Requests currently being handled.")
+registry.describe("pipeline_stage_duration_seconds", "Service pipeline stage latency.")
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a pipeline stage timing (decode, preprocess, inference, encode)"""
+    registry.observe("pipeline_stage_duration_seconds", seconds, (("stage", stage),))
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time the enclosed block as a pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def _route_template(scope) -> str:
+    """Matched route path template, so labels stay bounded for 404 floods"""
+    route = scope.get("route")
+    if route is None:
+        endpoint = scope.get("endpoint")
+        for candidate in getattr(scope.get("app"), "routes", ()):
+            if endpoint is not None and getattr(candidate, "endpoint", None) is endpoint:
+                route = candidate
+                break
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware recording request metrics
+
+    Avoids BaseHTTPMiddleware so responses are not buffered; per-request cost
+    is a few dict operations under one lock.
+    """
+
+    def __init__(self, app, metrics_registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = metrics_registry or registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.registry
+        state = {"status": 500, "request_bytes": 0, "response_bytes": 0}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["request_bytes"] += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["response_bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.add_gauge("http_requests_in_flight")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.add_gauge("http_requests_in_flight", amount=-1.0)
+            labels = (("method", scope["method"]), ("route", _route_template(scope)))
+            metrics.observe("http_request_duration_seconds", elapsed, labels)
+            metrics.observe("http_request_size_bytes", state["request_bytes"], labels, SIZE_BUCKETS)
+            metrics.observe("http_response_size_bytes", state["response_bytes"], labels, SIZE_BUCKETS)
+            metrics.inc("http_requests_total", labels + (("status", str(state["status"])),))
@@ -8,7 +8,6 @@ Downloads AI models and prepares the environment
 
 import os
 import sys
-import torch
 from pathlib import Path
 
 def check_environment():
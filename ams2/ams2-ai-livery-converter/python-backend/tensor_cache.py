@@ -0,0 +1,57 @@
+"""Byte-capped LRU cache for decoded/resized training tensors.
+
+The POC training datasets decode the same handful of source UV textures
+(and, across epochs, the same views) over and over. Datasets keep one
+``TensorCache`` per process -- each DataLoader worker gets its own copy, so
+use ``persistent_workers`` to keep it warm across epochs -- keyed by
+(kind, path, size, normalisation) so entries never mix preprocessing
+variants.
+
+Cached tensors are shared: callers must not modify them in place.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import torch
+
+
+class TensorCache:
+    """LRU of tensors bounded by total ``nbytes`` (``max_bytes <= 0`` disables it)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, torch.Tensor]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[torch.Tensor]:
+        tensor = self._entries.get(key)
+        if tensor is not None:
+            self._entries.move_to_end(key)
+        return tensor
+
+    def put(self, key: Hashable, tensor: torch.Tensor) -> torch.Tensor:
+        size = tensor.element_size() * tensor.nelement()
+        if self.max_bytes <= 0 or size > self.max_bytes:
+            return tensor
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous.element_size() * previous.nelement()
+        while self._entries and self.bytes + size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.element_size() * evicted.nelement()
+        self._entries[key] = tensor
+        self.bytes += size
+        return tensor
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], torch.Tensor]) -> torch.Tensor:
+        tensor = self.get(key)
+        if tensor is None:
+            tensor = self.put(key, factory())
+        return tensor
+